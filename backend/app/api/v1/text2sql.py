@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import json
 from app.services.text2sql_service import Text2SQLService
 
 router = APIRouter()
@@ -14,6 +16,10 @@ class PromptEnhancementRequest(BaseModel):
     question: str
     enhancement_type: Optional[str] = "financial"
 
+class BatchPromptEnhancementRequest(BaseModel):
+    questions: List[str]
+    enhancement_type: Optional[str] = "medical"
+
 class PromptEnhancementResponse(BaseModel):
     original_question: str
     enhanced_question: str
@@ -25,6 +31,7 @@ class EnhancedText2SQLRequest(BaseModel):
     enhancement_type: Optional[str] = "financial"
     include_explanation: bool = True
     auto_execute: bool = True
+    page_size: int = 100
 
 class EnhancedText2SQLResponse(BaseModel):
     original_question: str
@@ -155,122 +162,24 @@ async def get_example_questions():
     }
 
 @router.get("/schema")
-async def get_database_schema():
-    """Get K-Bank database schema information for Text2SQL context"""
-    return {
-        "database_info": {
-            "name": "K-Bank 합성데이터베이스",
-            "description": "케이뱅크 300만 고객 실제 합성데이터 (2018년 8-12월 기준)",
-            "total_records": "5,848,553개 레코드",
-            "last_updated": "2024-11-24"
-        },
-        "tables": [
-            {
-                "name": "dim_customer_real",
-                "alias": "dim_customer", 
-                "description": "고객 차원 테이블 (300만 고객)",
-                "record_count": "3,000,000",
-                "columns": [
-                    {"name": "customer_key", "type": "integer", "description": "고객 키 (PK)"},
-                    {"name": "customer_id", "type": "varchar", "description": "발급회원번호 (SYN_0~SYN_2999999)"},
-                    {"name": "customer_name", "type": "varchar", "description": "고객명 (익명화)"},
-                    {"name": "age_group", "type": "varchar", "description": "연령대 (20대,30대,40대,50대,60대)"},
-                    {"name": "gender", "type": "varchar", "description": "성별 (남,여)"},
-                    {"name": "region", "type": "varchar", "description": "거주지역 (서울,경기,부산,대구,인천,광주,대전,울산 등)"},
-                    {"name": "customer_grade", "type": "varchar", "description": "VIP등급 (일반,실버,골드,플래티넘,VIP,VVIP,프리미엄)"},
-                    {"name": "join_date", "type": "date", "description": "가입일자"}
-                ]
-            },
-            {
-                "name": "fact_transaction_real",
-                "alias": "fact_transaction",
-                "description": "거래 사실 테이블 (141만 거래)",
-                "record_count": "1,412,553",
-                "columns": [
-                    {"name": "transaction_key", "type": "integer", "description": "거래 키 (PK)"},
-                    {"name": "customer_key", "type": "integer", "description": "고객 키 (FK)"},
-                    {"name": "product_type", "type": "varchar", "description": "상품타입 (신용카드,체크카드,기타)"},
-                    {"name": "transaction_amount", "type": "decimal", "description": "거래금액"},
-                    {"name": "transaction_type", "type": "varchar", "description": "거래유형 (카드결제)"},
-                    {"name": "transaction_date", "type": "date", "description": "거래일자"},
-                    {"name": "shopping_amount", "type": "decimal", "description": "쇼핑 이용금액"},
-                    {"name": "dining_amount", "type": "decimal", "description": "요식 이용금액"},
-                    {"name": "transport_amount", "type": "decimal", "description": "교통 이용금액"},
-                    {"name": "merchant_count", "type": "integer", "description": "이용가맹점수"},
-                    {"name": "primary_category", "type": "varchar", "description": "주요카테고리 (쇼핑,요식,교통)"}
-                ]
-            },
-            {
-                "name": "dim_product_real", 
-                "alias": "dim_product",
-                "description": "금융상품 차원 테이블 (펀드상품)",
-                "record_count": "24,181",
-                "columns": [
-                    {"name": "product_key", "type": "integer", "description": "상품 키 (PK)"},
-                    {"name": "product_code", "type": "varchar", "description": "펀드코드"},
-                    {"name": "product_name", "type": "varchar", "description": "펀드명"},
-                    {"name": "product_type", "type": "varchar", "description": "대유형 (주식형,채권형,혼합형,MMF,기타)"},
-                    {"name": "risk_level", "type": "varchar", "description": "투자위험등급 (1-6등급)"},
-                    {"name": "annual_return", "type": "decimal", "description": "1년 수익률"},
-                    {"name": "net_assets", "type": "decimal", "description": "순자산 규모"}
-                ]
-            },
-            {
-                "name": "dim_merchant_real",
-                "alias": "dim_merchant", 
-                "description": "가맹점 차원 테이블",
-                "record_count": "10",
-                "columns": [
-                    {"name": "merchant_key", "type": "integer", "description": "가맹점 키 (PK)"},
-                    {"name": "merchant_id", "type": "varchar", "description": "가맹점 ID"},
-                    {"name": "merchant_name", "type": "varchar", "description": "가맹점명"},
-                    {"name": "category", "type": "varchar", "description": "업종분류 (온라인쇼핑,편의점,카페/음료,대형마트 등)"}
-                ]
-            },
-            {
-                "name": "fact_reward_real",
-                "alias": "fact_reward",
-                "description": "리워드 사실 테이블 (캐시백 적립)",
-                "record_count": "1,411,078", 
-                "columns": [
-                    {"name": "reward_key", "type": "integer", "description": "리워드 키 (PK)"},
-                    {"name": "customer_key", "type": "integer", "description": "고객 키 (FK)"},
-                    {"name": "reward_amount", "type": "decimal", "description": "적립금액"},
-                    {"name": "reward_type", "type": "varchar", "description": "리워드타입 (캐시백)"},
-                    {"name": "reward_source", "type": "varchar", "description": "적립원천 (쇼핑,요식,교통)"},
-                    {"name": "expiry_date", "type": "date", "description": "만료일자"},
-                    {"name": "earn_date", "type": "date", "description": "적립일자"}
-                ]
+async def get_database_schema(
+    service: Text2SQLService = Depends(get_text2sql_service)
+):
+    """Get warehouse schema information for Text2SQL context (served from the schema catalog)"""
+    try:
+        catalog = service.get_schema()
+        return {
+            "database_info": {
+                "name": "서울아산병원 임상 데이터 웨어하우스",
+                "description": "DuckDB information_schema 기반 스키마 카탈로그",
+                "total_records": catalog["total_records"],
+                "last_updated": catalog["refreshed_at"],
+                "catalog_version": catalog["catalog_version"]
             },
-            {
-                "name": "dim_time_real",
-                "alias": "dim_time",
-                "description": "시간 차원 테이블 (2018-2019년)",
-                "record_count": "731",
-                "columns": [
-                    {"name": "time_key", "type": "integer", "description": "시간 키 (PK)"},
-                    {"name": "date_value", "type": "date", "description": "날짜"},
-                    {"name": "year", "type": "integer", "description": "년"},
-                    {"name": "quarter", "type": "integer", "description": "분기"},
-                    {"name": "month", "type": "integer", "description": "월"},
-                    {"name": "day", "type": "integer", "description": "일"},
-                    {"name": "day_of_week", "type": "integer", "description": "요일"},
-                    {"name": "is_weekend", "type": "boolean", "description": "주말여부"}
-                ]
-            }
-        ],
-        "business_context": {
-            "domain": "K-Bank 디지털 금융",
-            "key_metrics": [
-                "고객별 월평균 이용금액", "VIP등급별 수익성", "상품별 가입률",
-                "지역별 시장점유율", "연령대별 금융행동 패턴", "캐시백 적립률"
-            ],
-            "common_analysis": [
-                "고객 세분화", "상품 성과 분석", "리스크 관리", "마케팅 효과 측정",
-                "운영 최적화", "수익성 분석"
-            ]
+            "tables": catalog["tables"]
         }
-    }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/history")
 async def get_query_history(
@@ -284,6 +193,22 @@ async def get_query_history(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/history/search")
+async def search_query_history(
+    q: str,
+    mode: str = "prefix",
+    limit: int = 20,
+    service: Text2SQLService = Depends(get_text2sql_service)
+):
+    """Search Text2SQL query history by question (mode: prefix | fulltext)"""
+    try:
+        history = await service.search_query_history(q, limit=limit, mode=mode)
+        return {"query": q, "mode": mode, "history": history}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/enhance-prompt", response_model=PromptEnhancementResponse)
 async def enhance_financial_prompt(
     request: PromptEnhancementRequest,
@@ -297,7 +222,7 @@ async def enhance_financial_prompt(
     - Output: "고객 가치 등급(VIP) 기준 고객 세그먼트 분포와 각 등급별 평균 수익성(ARPU), 거래 활성도 지표를 포함한 포트폴리오 현황 분석"
     """
     try:
-        result = await service.enhance_financial_prompt(
+        result = await service.enhance_medical_prompt(
             question=request.question,
             enhancement_type=request.enhancement_type
         )
@@ -305,6 +230,20 @@ async def enhance_financial_prompt(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/enhance-prompt/batch", response_model=List[PromptEnhancementResponse])
+async def enhance_medical_prompts_batch(
+    request: BatchPromptEnhancementRequest,
+    service: Text2SQLService = Depends(get_text2sql_service)
+):
+    """여러 의료 질의를 한 번에 강화"""
+    try:
+        return await service.enhance_medical_prompts(
+            questions=request.questions,
+            enhancement_type=request.enhancement_type
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/enhanced-generate", response_model=EnhancedText2SQLResponse)
 async def enhanced_generate_sql(
     request: EnhancedText2SQLRequest,
@@ -319,41 +258,58 @@ async def enhanced_generate_sql(
     - SQL Generation + Execution
     """
     try:
-        # Step 1: 프롬프트 강화
-        enhancement_result = await service.enhance_financial_prompt(
+        # 강화 → SQL 생성 → (실행 ∥ 설명) 파이프라인 결과를 모아 한 번에 응답
+        stages = {}
+        async for event in service.enhanced_generate_events(
             question=request.question,
-            enhancement_type=request.enhancement_type
-        )
-        
-        # Step 2: 강화된 프롬프트로 SQL 생성
-        sql_result = await service.natural_language_to_sql(
-            question=enhancement_result["enhanced_question"],
-            include_explanation=request.include_explanation
-        )
-        
-        # Step 3: SQL 실행 (선택사항)
-        execution_result = None
-        if request.auto_execute and sql_result["sql"]:
-            try:
-                execution_result = await service.execute_sql(sql_result["sql"])
-            except Exception as exec_error:
-                # SQL 실행 오류는 별도로 처리하되 전체 요청은 실패하지 않음
-                execution_result = {
-                    "error": f"SQL execution failed: {str(exec_error)}",
-                    "results": [],
-                    "row_count": 0
-                }
+            enhancement_type=request.enhancement_type,
+            include_explanation=request.include_explanation,
+            auto_execute=request.auto_execute,
+            page_size=request.page_size
+        ):
+            stages[event["event"]] = event["data"]
         
+        enhancement_result = stages["enhancement"]
         return EnhancedText2SQLResponse(
             original_question=enhancement_result["original_question"],
             enhanced_question=enhancement_result["enhanced_question"],
             enhancements_applied=enhancement_result["enhancements_applied"],
             enhancement_confidence=enhancement_result["confidence"],
-            sql=sql_result["sql"],
-            sql_explanation=sql_result["explanation"],
-            sql_confidence=sql_result["confidence"],
-            execution_result=execution_result
+            sql=stages["sql"]["sql"],
+            sql_explanation=stages.get("explanation", {}).get("explanation", ""),
+            sql_confidence=stages["sql"]["confidence"],
+            execution_result=stages.get("execution")
         )
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/enhanced-generate/stream")
+async def enhanced_generate_sql_stream(
+    request: EnhancedText2SQLRequest,
+    service: Text2SQLService = Depends(get_text2sql_service)
+):
+    """
+    프롬프트 강화 → SQL 생성 → 실행 스트리밍 API (NDJSON)
+    
+    단계가 끝나는 즉시 한 줄씩 전송: enhancement → sql → execution / explanation → done
+    SQL이 생성되면 설명 생성과 동시에 첫 페이지(page_size) 실행을 시작함
+    """
+    async def generate():
+        try:
+            async for event in service.enhanced_generate_events(
+                question=request.question,
+                enhancement_type=request.enhancement_type,
+                include_explanation=request.include_explanation,
+                auto_execute=request.auto_execute,
+                page_size=request.page_size
+            ):
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "data": {"message": str(e)}}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache"}
+    )
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
 from app.core.config import settings
+from app.services.query_history_store import close_query_history_store
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -21,6 +22,11 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Flush buffered Text2SQL history before the process exits
+    close_query_history_store()
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,145 @@
+"""
+벡터 컬렉션 통계 캐시
+대시보드 폴링이 벡터 DB를 호출하지 않도록 컬렉션 정보를 TTL 주기로 백그라운드 갱신하고,
+upsert/삭제시에는 캐시를 증분 반영하며 최근 적재/삭제 속도를 함께 제공
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+StatsFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+def empty_collection_stats() -> Dict[str, Any]:
+    """조회 실패시 컬렉션 통계 기본값"""
+    return {'points': 0, 'indexed_vectors': 0, 'segments': 0, 'ram_bytes': 0, 'disk_bytes': 0, 'storage': None}
+
+
+class CollectionStatsCache:
+    """컬렉션별 통계 캐시 (스레드 안전, 쓰기 경로는 동기 코드에서도 호출 가능)"""
+
+    def __init__(self,
+                 collection_names: List[str],
+                 ttl: Optional[float] = None,
+                 rate_window: Optional[float] = None):
+        """
+        Args:
+            collection_names: 대상 컬렉션명 목록
+            ttl: 백엔드 조회 결과를 유지할 시간 (초, 기본값 VECTOR_STATS_TTL 설정)
+            rate_window: 적재/삭제 속도 계산 구간 (초, 기본값 VECTOR_STATS_RATE_WINDOW 설정)
+        """
+        self.collection_names = list(collection_names)
+        self.ttl = settings.VECTOR_STATS_TTL if ttl is None else ttl
+        self.rate_window = settings.VECTOR_STATS_RATE_WINDOW if rate_window is None else rate_window
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {name: empty_collection_stats() for name in self.collection_names}
+        self._refreshed_at: Dict[str, Optional[float]] = {name: None for name in self.collection_names}
+        # (시각, 추가 포인트 수, 삭제 포인트 수)
+        self._writes: Dict[str, Deque[Tuple[float, int, int]]] = {name: deque() for name in self.collection_names}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _trim(self, writes: Deque[Tuple[float, int, int]], now: float):
+        while writes and writes[0][0] < now - self.rate_window:
+            writes.popleft()
+
+    def update(self, collection_name: str, info: Dict[str, Any]):
+        """백엔드에서 조회한 통계로 교체"""
+        with self._lock:
+            self._stats[collection_name] = dict(info)
+            self._refreshed_at[collection_name] = time.time()
+
+    def record_write(self, collection_name: str, added: int = 0, deleted: int = 0):
+        """
+        upsert/삭제 결과를 캐시에 증분 반영
+
+        포인트 수는 바로 조정하고 RAM/디스크 사용량은 마지막 조회 시점의 포인트당 크기로 추정
+        (색인 벡터/세그먼트 수는 백엔드가 비동기로 색인하므로 다음 갱신 때 반영)
+        """
+        if not added and not deleted:
+            return
+        now = time.time()
+        with self._lock:
+            stats = self._stats[collection_name]
+            points = stats['points']
+            delta = added - deleted
+            if points:
+                stats['ram_bytes'] = max(0, stats['ram_bytes'] + stats['ram_bytes'] * delta // points)
+                stats['disk_bytes'] = max(0, stats['disk_bytes'] + stats['disk_bytes'] * delta // points)
+            stats['points'] = max(0, points + delta)
+
+            writes = self._writes[collection_name]
+            writes.append((now, added, deleted))
+            self._trim(writes, now)
+
+    def is_stale(self) -> bool:
+        """TTL이 지났거나 한 번도 조회하지 않은 컬렉션이 있는지"""
+        now = time.time()
+        with self._lock:
+            return any(
+                refreshed_at is None or now - refreshed_at >= self.ttl
+                for refreshed_at in self._refreshed_at.values()
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """캐시된 통계 (적재/삭제 속도는 초당 포인트 수)"""
+        now = time.time()
+        snapshot = {}
+        with self._lock:
+            for name in self.collection_names:
+                writes = self._writes[name]
+                self._trim(writes, now)
+                refreshed_at = self._refreshed_at[name]
+                snapshot[name] = {
+                    **self._stats[name],
+                    'ingest_rate': sum(added for _, added, _ in writes) / self.rate_window,
+                    'delete_rate': sum(deleted for _, _, deleted in writes) / self.rate_window,
+                    'refreshed_at': datetime.fromtimestamp(refreshed_at).isoformat() if refreshed_at else None
+                }
+        return snapshot
+
+    async def refresh(self, fetch: StatsFetcher):
+        """모든 컬렉션 통계를 동시에 조회해 교체 (실패한 컬렉션은 이전 값 유지)"""
+        infos = await asyncio.gather(*(fetch(name) for name in self.collection_names), return_exceptions=True)
+        for name, info in zip(self.collection_names, infos):
+            if isinstance(info, Exception):
+                logger.error(f"통계 조회 오류 ({name}): {info}")
+                continue
+            self.update(name, info)
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    def start(self, fetch: StatsFetcher):
+        """실행 중인 이벤트 루프에서 TTL 주기 백그라운드 갱신 시작"""
+        if self.refreshing:
+            return
+
+        async def refresh_loop():
+            while True:
+                try:
+                    await self.refresh(fetch)
+                except Exception as e:
+                    logger.error(f"컬렉션 통계 갱신 오류: {e}")
+                await asyncio.sleep(self.ttl)
+
+        self._refresh_task = asyncio.create_task(refresh_loop())
+
+    async def stop(self):
+        """백그라운드 갱신 중지"""
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        try:
+            await self._refresh_task
+        except asyncio.CancelledError:
+            pass
+        self._refresh_task = None
@@ -0,0 +1,320 @@
+"""
+읽기 전용 압축 지식 그래프
+정수 노드 ID, 유형/관계 코드, CSR 인접 배열, 열 단위 노드 속성과 공유 문자열 풀로 구성해
+노드/간선마다 파이썬 객체를 두지 않고, 이웃 확장은 배열 슬라이싱으로 수행
+변경은 PartialGraph(가변 빌더)에서 하고 새 CompactGraph를 만들어 참조를 통째로 교체
+"""
+import time
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .graph_builder import PartialGraph, mention_contexts
+
+# 문자열 풀 (오프셋 int64 + UTF-8 바이트)
+STRING_POOLS = ("keys", "names", "contexts", "documents")
+
+# 노드 열 / 간선 열 / 언급 출처 배열
+ARRAY_DTYPES = {
+    "node_type": np.int16,           # type_names 코드
+    "node_context": np.int32,        # contexts 풀 코드 (같은 청크의 컨텍스트는 공유)
+    "node_confidence": np.float32,
+    "node_mention_count": np.int32,
+    "node_mention_indptr": np.int64,
+    "node_mention_doc": np.int32,    # documents 풀 코드
+    "node_mention_chunk": np.int32,
+    "node_mention_context": np.int32,  # 언급별 contexts 풀 코드
+    "indptr": np.int64,              # CSR: 노드 i의 나가는 간선은 indptr[i]:indptr[i + 1]
+    "indices": np.int32,             # 간선 대상 노드
+    "edge_relation": np.int16,       # relation_names 코드
+    "edge_confidence": np.float32,
+    "edge_count": np.int32,
+    "edge_mention_indptr": np.int64,
+    "edge_mention_doc": np.int32,
+    "edge_mention_chunk": np.int32,
+}
+
+
+def _offsets(lengths: Sequence[int]) -> np.ndarray:
+    """길이 목록 → 누적 오프셋 (길이 + 1)"""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.asarray(lengths, dtype=np.int64))
+    return offsets
+
+
+class StringPool:
+    """문자열 목록을 하나의 바이트 버퍼에 이어 붙인 풀"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    @staticmethod
+    def encode(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [string.encode("utf-8") for string in strings]
+        return _offsets([len(item) for item in encoded]), np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+
+class CompactGraph:
+    """CSR 인접 배열 기반 읽기 전용 지식 그래프"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        """
+        Args:
+            arrays: ARRAY_DTYPES의 배열과 문자열 풀별 {name}_offsets/{name}_data 배열
+            meta: type_names, relation_names, built_at
+        """
+        self.arrays = arrays
+        self.meta = meta
+        self.type_names: List[str] = meta["type_names"]
+        self.relation_names: List[str] = meta["relation_names"]
+        self.pools = {
+            name: StringPool(arrays[f"{name}_offsets"], arrays[f"{name}_data"]) for name in STRING_POOLS
+        }
+        for name in ARRAY_DTYPES:
+            setattr(self, name, arrays[name])
+        self._index: Optional[Dict[str, int]] = None
+        self._walk: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._masks: Dict[Tuple[Optional[frozenset], float], np.ndarray] = {}
+
+    # ------------------------------------------------------------------
+    # 생성 / 변환
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> "CompactGraph":
+        return cls.from_partial(PartialGraph())
+
+    @classmethod
+    def from_partial(cls, partial: PartialGraph) -> "CompactGraph":
+        """가변 부분 그래프를 압축 그래프로 고정"""
+        keys = list(partial.nodes)
+        index = {key: i for i, key in enumerate(keys)}
+        nodes = [partial.nodes[key] for key in keys]
+
+        type_names = sorted({node["type"] for node in nodes})
+        type_codes = {name: code for code, name in enumerate(type_names)}
+        relation_names = sorted({relation for _, _, relation in partial.edges})
+        relation_codes = {name: code for code, name in enumerate(relation_names)}
+
+        contexts: Dict[str, int] = {}
+        documents: Dict[str, int] = {}
+
+        def mention_arrays(mention_lists):
+            indptr = _offsets([len(mentions) for mentions in mention_lists])
+            docs = np.fromiter(
+                (documents.setdefault(doc_id, len(documents)) for mentions in mention_lists for doc_id, _ in mentions),
+                dtype=np.int32, count=int(indptr[-1])
+            )
+            chunks = np.fromiter(
+                (chunk for mentions in mention_lists for _, chunk in mentions),
+                dtype=np.int32, count=int(indptr[-1])
+            )
+            return indptr, docs, chunks
+
+        # 간선은 출발 노드 순, 같은 출발 노드 안에서는 언급 횟수/신뢰도가 높은 순으로 정렬 (이웃 목록 사전 정렬)
+        edges = sorted(
+            ((index[source], index[target], relation, attributes)
+             for (source, target, relation), attributes in partial.edges.items()),
+            key=lambda edge: (edge[0], -edge[3]["count"], -edge[3]["confidence"], edge[1], edge[2])
+        )
+        indptr = _offsets(np.bincount(np.array([edge[0] for edge in edges], dtype=np.int64), minlength=len(keys)))
+
+        node_mention_indptr, node_mention_doc, node_mention_chunk = mention_arrays(
+            [node["mentions"] for node in nodes]
+        )
+        edge_mention_indptr, edge_mention_doc, edge_mention_chunk = mention_arrays(
+            [edge[3]["mentions"] for edge in edges]
+        )
+
+        node_mention_context = np.fromiter(
+            (contexts.setdefault(context, len(contexts)) for node in nodes for context in mention_contexts(node)),
+            dtype=np.int32, count=int(node_mention_indptr[-1])
+        )
+
+        arrays = {
+            "node_type": np.array([type_codes[node["type"]] for node in nodes], dtype=np.int16),
+            "node_context": np.array(
+                [contexts.setdefault(node["context"], len(contexts)) for node in nodes], dtype=np.int32
+            ),
+            "node_confidence": np.array([node["confidence"] for node in nodes], dtype=np.float32),
+            "node_mention_count": np.array([node["count"] for node in nodes], dtype=np.int32),
+            "node_mention_indptr": node_mention_indptr,
+            "node_mention_doc": node_mention_doc,
+            "node_mention_chunk": node_mention_chunk,
+            "node_mention_context": node_mention_context,
+            "indptr": indptr,
+            "indices": np.array([edge[1] for edge in edges], dtype=np.int32),
+            "edge_relation": np.array([relation_codes[edge[2]] for edge in edges], dtype=np.int16),
+            "edge_confidence": np.array([edge[3]["confidence"] for edge in edges], dtype=np.float32),
+            "edge_count": np.array([edge[3]["count"] for edge in edges], dtype=np.int32),
+            "edge_mention_indptr": edge_mention_indptr,
+            "edge_mention_doc": edge_mention_doc,
+            "edge_mention_chunk": edge_mention_chunk,
+        }
+        for name, strings in (
+            ("keys", keys),
+            ("names", [node["name"] for node in nodes]),
+            ("contexts", list(contexts)),
+            ("documents", list(documents)),
+        ):
+            arrays[f"{name}_offsets"], arrays[f"{name}_data"] = StringPool.encode(strings)
+
+        meta = {"type_names": type_names, "relation_names": relation_names, "built_at": time.time()}
+        graph = cls(arrays, meta)
+        graph._index = index
+        return graph
+
+    def _mention_list(self, indptr, docs, chunks, row: int) -> List[Tuple[str, int]]:
+        start, end = indptr[row], indptr[row + 1]
+        documents = self.pools["documents"]
+        return [(documents[int(doc)], int(chunk)) for doc, chunk in zip(docs[start:end], chunks[start:end])]
+
+    def to_partial(self) -> PartialGraph:
+        """증분 구축을 위해 가변 부분 그래프로 되돌림"""
+        partial = PartialGraph()
+        keys = [self.key(i) for i in range(self.number_of_nodes())]
+        for i, key in enumerate(keys):
+            partial.nodes[key] = {
+                **self.node(i),
+                "count": int(self.node_mention_count[i]),
+                "mentions": self.mentions(i),
+                "contexts": self.mention_contexts(i)
+            }
+            del partial.nodes[key]["mention_count"]
+        for source in range(len(keys)):
+            for e in range(self.indptr[source], self.indptr[source + 1]):
+                partial.edges[(keys[source], keys[self.indices[e]], self.relation_names[self.edge_relation[e]])] = {
+                    "confidence": round(float(self.edge_confidence[e]), 4),
+                    "count": int(self.edge_count[e]),
+                    "mentions": self._mention_list(
+                        self.edge_mention_indptr, self.edge_mention_doc, self.edge_mention_chunk, e
+                    )
+                }
+        return partial
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_type)
+
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def __contains__(self, key: str) -> bool:
+        return self.index_of(key) is not None
+
+    def index_of(self, key: str) -> Optional[int]:
+        """정규 엔티티 ID → 정수 노드 ID"""
+        if self._index is None:
+            keys = self.pools["keys"]
+            self._index = {keys[i]: i for i in range(len(keys))}
+        return self._index.get(key)
+
+    def key(self, node: int) -> str:
+        return self.pools["keys"][node]
+
+    def node(self, node: int) -> Dict[str, Any]:
+        """응답용 노드 속성 (언급 출처 목록은 제외하고 횟수만 포함)"""
+        return {
+            "type": self.type_names[self.node_type[node]],
+            "name": self.pools["names"][node],
+            "context": self.pools["contexts"][int(self.node_context[node])],
+            "confidence": round(float(self.node_confidence[node]), 4),
+            "mention_count": int(self.node_mention_count[node])
+        }
+
+    def edge(self, edge: int) -> Dict[str, Any]:
+        return {
+            "type": self.relation_names[self.edge_relation[edge]],
+            "confidence": round(float(self.edge_confidence[edge]), 4),
+            "count": int(self.edge_count[edge])
+        }
+
+    def mentions(self, node: int) -> List[Tuple[str, int]]:
+        """노드의 (문서 ID, 청크 순번) 언급 출처"""
+        return self._mention_list(self.node_mention_indptr, self.node_mention_doc, self.node_mention_chunk, node)
+
+    def mention_contexts(self, node: int) -> List[str]:
+        """노드의 언급별 컨텍스트 (mentions와 같은 순서)"""
+        start, end = self.node_mention_indptr[node], self.node_mention_indptr[node + 1]
+        contexts = self.pools["contexts"]
+        return [contexts[int(code)] for code in self.node_mention_context[start:end]]
+
+    def neighbors(self, node: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        나가는 간선의 이웃 (이웃별로 가장 많이 언급된 관계 하나, 언급 횟수 순)
+
+        간선이 미리 정렬되어 있으므로 CSR 슬라이스를 앞에서부터 읽고 limit개에서 멈춤
+        """
+        start, end = int(self.indptr[node]), int(self.indptr[node + 1])
+        targets = self.indices[start:end]
+        seen = set()
+        neighbors = []
+        for offset, target in enumerate(targets.tolist()):
+            if target in seen:
+                continue
+            seen.add(target)
+            neighbors.append({"entity": self.node(target), "relation": self.edge(start + offset)})
+            if limit is not None and len(neighbors) >= limit:
+                break
+        return neighbors
+
+    def walk_adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        랜덤 워크용 무방향 CSR (indptr, indices, 전이 확률)
+
+        정방향/역방향 간선을 합치고 간선 신뢰도를 행 단위로 정규화해 한 번만 계산한 뒤 재사용
+        (그래프는 읽기 전용이므로 교체 전까지 유효)
+        """
+        if self._walk is None:
+            count = self.number_of_nodes()
+            sources = np.repeat(np.arange(count, dtype=np.int32), np.diff(self.indptr))
+            targets = np.asarray(self.indices, dtype=np.int32)
+            weights = np.asarray(self.edge_confidence, dtype=np.float32)
+            walk_sources = np.concatenate([sources, targets])
+            walk_targets = np.concatenate([targets, sources])
+            walk_weights = np.concatenate([weights, weights])
+            row_sums = np.bincount(walk_sources, weights=walk_weights, minlength=count)
+            probabilities = walk_weights / np.where(row_sums > 0, row_sums, 1.0)[walk_sources]
+
+            order = np.argsort(walk_sources, kind="stable")
+            self._walk = (
+                _offsets(np.bincount(walk_sources, minlength=count)),
+                walk_targets[order],
+                probabilities[order].astype(np.float32)
+            )
+        return self._walk
+
+    def node_mask(self, types: Optional[Collection[str]] = None, min_confidence: float = 0.0) -> np.ndarray:
+        """유형이 types에 속하고 (None이면 전체) 신뢰도가 min_confidence를 넘는 노드 마스크 (조건별로 캐시)"""
+        key = (None if types is None else frozenset(types), min_confidence)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.asarray(self.node_confidence) > np.float32(min_confidence)
+            if types is not None:
+                codes = [code for code, name in enumerate(self.type_names) if name in key[0]]
+                mask &= np.isin(self.node_type, codes)
+            self._masks[key] = mask
+        return mask
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.node_type, minlength=len(self.type_names))
+        return {name: int(count) for name, count in zip(self.type_names, counts)}
+
+    def relation_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.edge_relation, minlength=len(self.relation_names))
+        return {name: int(count) for name, count in zip(self.relation_names, counts)}
+
+    @property
+    def nbytes(self) -> int:
+        """배열 메모리 사용량 (바이트)"""
+        return int(sum(array.nbytes for array in self.arrays.values()))
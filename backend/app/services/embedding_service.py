@@ -0,0 +1,339 @@
+"""
+공용 임베딩 서비스
+임베딩 모델을 프로세스당 한 번만 로드하고, 텍스트 내용 해시를 키로 하는
+메모리 LRU + 디스크(memory-mapped float16) 캐시로 동일 텍스트의 재추론을 생략
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+
+KEY_SIZE = 20  # sha1 digest
+
+
+class EmbeddingCacheStore:
+    """내용 해시 → float16 벡터 디스크 저장소 (append-only)"""
+
+    def __init__(self, directory: str, dim: int, max_entries: int):
+        """
+        Args:
+            directory: 저장 디렉토리 (vectors.f16, keys.bin)
+            dim: 벡터 차원
+            max_entries: 최대 저장 벡터 수 (초과분은 디스크에 기록하지 않음)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        self.max_entries = max_entries
+        self._vectors_path = os.path.join(directory, "vectors.f16")
+        self._keys_path = os.path.join(directory, "keys.bin")
+
+        raw_keys = b""
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "rb") as f:
+                raw_keys = f.read()
+        row_bytes = dim * 2
+        stored_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+
+        # 비정상 종료로 키만 기록된 경우 벡터가 있는 행까지만 인정
+        count = min(len(raw_keys) // KEY_SIZE, stored_rows)
+        self._index: Dict[bytes, int] = {
+            raw_keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(count)
+        }
+        self._count = count
+        self._keys_file = open(self._keys_path, "ab")
+        if len(raw_keys) != count * KEY_SIZE:
+            self._keys_file.truncate(count * KEY_SIZE)
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._reserve(max(stored_rows, count, 1024))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _reserve(self, rows: int):
+        """파일을 rows 행까지 늘리고 다시 매핑"""
+        rows = min(max(rows, 1), self.max_entries)
+        if rows <= self._capacity:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * self.dim * 2)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float16, mode="r+", shape=(rows, self.dim))
+        self._capacity = rows
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self._index.get(key)
+        return None if row is None else np.array(self._vectors[row], dtype=np.float32)
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        """새 벡터 추가 (벡터를 먼저 쓰고 키를 나중에 기록)"""
+        new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._index]
+        new = new[:self.max_entries - self._count]
+        if not new:
+            return
+        if self._count + len(new) > self._capacity:
+            self._reserve(max(self._capacity * 2, self._count + len(new)))
+
+        start = self._count
+        self._vectors[start:start + len(new)] = np.stack([vector for _, vector in new])
+        self._vectors.flush()
+        self._keys_file.write(b"".join(key for key, _ in new))
+        self._keys_file.flush()
+        for offset, (key, _) in enumerate(new):
+            self._index[key] = start + offset
+        self._count += len(new)
+
+    def close(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        self._keys_file.close()
+
+
+class EmbeddingService:
+    """모델 1회 로드 + 내용 해시 캐시 기반 임베딩 서비스"""
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 cache_dir: Optional[str] = None,
+                 memory_cache_size: int = 10000,
+                 disk_cache_size: int = 500000,
+                 batch_size: int = 0,
+                 encode_processes: int = 0,
+                 encoder: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None):
+        """
+        Args:
+            model_name: 임베딩 모델명
+            cache_dir: 디스크 캐시 상위 디렉토리 (None이면 메모리 캐시만 사용)
+            memory_cache_size: 메모리 LRU에 유지할 벡터 수
+            disk_cache_size: 디스크에 저장할 최대 벡터 수
+            batch_size: 인코딩 배치 크기 (0이면 CPU 스레드 수 기준 자동 결정)
+            encode_processes: 1 이상이면 대량 인코딩시 멀티프로세스 풀 사용
+            encoder: 텍스트 목록을 정규화된 벡터로 변환하는 함수 (지정시 모델을 로드하지 않음)
+        """
+        self.model_name = model_name
+        self.memory_cache_size = memory_cache_size
+        self.disk_cache_size = disk_cache_size
+        self.batch_size = batch_size or self._default_batch_size()
+        self.encode_processes = encode_processes
+        self._encoder = encoder
+
+        self._cache_dir = (
+            os.path.join(cache_dir, re.sub(r"[^0-9A-Za-z._-]+", "_", model_name)) if cache_dir else None
+        )
+        self._lock = threading.RLock()
+        # 모델/인코딩 풀 지연 생성 전용 잠금 (로드 중에도 캐시 조회는 막지 않도록 캐시 잠금과 분리)
+        self._init_lock = threading.Lock()
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._store: Optional[EmbeddingCacheStore] = None
+        self._dim: Optional[int] = None
+        self._model = None
+        self._encode_pool = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        # 이전 실행의 디스크 캐시가 있으면 모델 로드 없이 바로 사용
+        meta = self._read_meta()
+        if meta:
+            self._open_store(meta["dim"])
+
+    @staticmethod
+    def _default_batch_size() -> int:
+        """CPU 스레드 수 기준 인코딩 배치 크기 (16~128)"""
+        return max(16, min(128, (os.cpu_count() or 1) * 8))
+
+    def _read_meta(self) -> Optional[Dict[str, int]]:
+        if not self._cache_dir:
+            return None
+        path = os.path.join(self._cache_dir, "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _open_store(self, dim: int):
+        self._dim = dim
+        if not self._cache_dir or self._store is not None:
+            return
+        self._store = EmbeddingCacheStore(self._cache_dir, dim, self.disk_cache_size)
+        with open(os.path.join(self._cache_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": dim}, f)
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha1(text.encode("utf-8")).digest()
+
+    # ------------------------------------------------------------------
+    # 모델
+    # ------------------------------------------------------------------
+
+    def _load_model(self):
+        """임베딩 모델 로드 (최초 인코딩시 한 번, 동시 요청이 와도 한 스레드만 로드)"""
+        if self._model is None:
+            with self._init_lock:
+                if self._model is None:
+                    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+                    self._model = HuggingFaceEmbeddings(
+                        model_name=self.model_name,
+                        model_kwargs={'device': 'cpu'},
+                        encode_kwargs={'normalize_embeddings': True, 'batch_size': self.batch_size}
+                    )
+        return self._model
+
+    def _ensure_encode_pool(self, model):
+        """멀티프로세스 인코딩 풀 생성 (최초 대량 인코딩시 한 번)"""
+        if self._encode_pool is None:
+            with self._init_lock:
+                if self._encode_pool is None:
+                    self._encode_pool = model.client.start_multi_process_pool(
+                        target_devices=['cpu'] * self.encode_processes
+                    )
+        return self._encode_pool
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        텍스트를 배치 인코딩
+
+        텍스트가 충분히 많고 인코딩 풀이 설정되어 있으면 여러 프로세스로 나누어 인코딩
+        """
+        if self._encoder is not None:
+            return np.asarray(self._encoder(texts), dtype=np.float32)
+
+        model = self._load_model()
+        if self.encode_processes > 0 and len(texts) >= self.batch_size * 4:
+            return np.asarray(model.client.encode_multi_process(
+                texts,
+                self._ensure_encode_pool(model),
+                batch_size=self.batch_size,
+                normalize_embeddings=True
+            ), dtype=np.float32)
+
+        return np.asarray(model.embed_documents(texts), dtype=np.float32)
+
+    @property
+    def dimension(self) -> int:
+        """임베딩 차원"""
+        if self._dim is None:
+            if self._encoder is None:
+                dim = self._load_model().client.get_sentence_embedding_dimension()
+            else:
+                dim = self._encode([""]).shape[1]
+            with self._lock:
+                self._open_store(dim)
+        return self._dim
+
+    # ------------------------------------------------------------------
+    # 임베딩 API
+    # ------------------------------------------------------------------
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        여러 텍스트를 (n, dim) float32 행렬로 임베딩
+
+        메모리 LRU → 디스크 캐시 순으로 조회하고, 없는 텍스트만 중복 제거 후 한 번에 인코딩
+        캐시 적중 여부와 무관하게 같은 텍스트는 항상 같은 벡터를 반환하도록 float16으로 반올림
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        keys = [self._key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                elif self._store is not None and (vector := self._store.get(key)) is not None:
+                    self._remember(key, vector)
+                    self._stats["disk_hits"] += 1
+                else:
+                    missing[key] = text
+                    self._stats["misses"] += 1
+                    continue
+                found[key] = vector
+
+        if missing:
+            encoded = self._encode(list(missing.values())).astype(np.float16)
+            with self._lock:
+                self._open_store(encoded.shape[1])
+                if self._store is not None:
+                    self._store.put_many(list(missing), encoded)
+                for key, vector in zip(missing, encoded.astype(np.float32)):
+                    self._remember(key, vector)
+                    found[key] = vector
+
+        return np.stack([found[key] for key in keys])
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._memory[key] = vector
+        if len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """LangChain Embeddings 호환 문서 임베딩"""
+        return self.embed_many(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """LangChain Embeddings 호환 질의 임베딩"""
+        return self.embed_many([text])[0].tolist()
+
+    def stats(self) -> Dict[str, int]:
+        """캐시 적중 통계"""
+        with self._lock:
+            return {
+                **self._stats,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._store) if self._store is not None else 0
+            }
+
+    def close(self):
+        """인코딩 풀 종료 및 디스크 캐시 정리"""
+        with self._lock:
+            if self._encode_pool is not None:
+                self._model.client.stop_multi_process_pool(self._encode_pool)
+                self._encode_pool = None
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+
+_embedding_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: Optional[str] = None) -> EmbeddingService:
+    """모델별 프로세스 전역 임베딩 서비스 반환 (최초 호출시 생성)"""
+    model_name = model_name or settings.EMBEDDING_MODEL
+    with _services_lock:
+        service = _embedding_services.get(model_name)
+        if service is None:
+            service = EmbeddingService(
+                model_name=model_name,
+                cache_dir=settings.EMBEDDING_CACHE_DIR or None,
+                memory_cache_size=settings.EMBEDDING_MEMORY_CACHE_SIZE,
+                disk_cache_size=settings.EMBEDDING_DISK_CACHE_SIZE,
+                batch_size=settings.EMBEDDING_BATCH_SIZE,
+                encode_processes=settings.EMBEDDING_ENCODE_PROCESSES
+            )
+            _embedding_services[model_name] = service
+        return service
+
+
+def close_embedding_services():
+    """프로세스 종료시 임베딩 서비스 정리"""
+    with _services_lock:
+        for service in _embedding_services.values():
+            service.close()
+        _embedding_services.clear()
@@ -0,0 +1,193 @@
+"""
+엔티티 임베딩 인덱스
+엔티티 임베딩을 연속된 float32 행렬에 행 단위로 보관하고 ID ↔ 행 번호를 매핑해
+질의 하나를 행렬-벡터 곱 한 번과 argpartition으로 채점/선택
+행마다 파티션 라벨(예: 엔티티 유형) 코드를 두어 허용 파티션 마스크를 스캔 안에서 적용
+"""
+import threading
+from typing import Collection, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class EntityEmbeddingIndex:
+    """정규화된 엔티티 임베딩 행렬 (용량을 2배씩 늘리는 amortized append)"""
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024):
+        """
+        Args:
+            dim: 임베딩 차원 (None이면 첫 추가시 결정)
+            initial_capacity: 최초 할당 행 수
+        """
+        self.dim = dim
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._row_of: Dict[str, int] = {}
+        self._ids: List[str] = []
+        # 행별 파티션 코드 (0은 라벨 없음)
+        self._partition_names: List[Optional[str]] = [None]
+        self._partition_code: Dict[Optional[str], int] = {None: 0}
+        self._partitions = np.zeros(0, dtype=np.int16)
+        if dim is not None:
+            self._matrix = np.zeros((initial_capacity, dim), dtype=np.float32)
+            self._partitions = np.zeros(initial_capacity, dtype=np.int16)
+
+    @classmethod
+    def from_matrix(cls,
+                    entity_ids: Sequence[str],
+                    matrix: np.ndarray,
+                    partitions: Optional[Sequence[str]] = None) -> "EntityEmbeddingIndex":
+        """
+        정규화된 행렬을 복사 없이 그대로 사용하는 인덱스 (예: 스냅샷의 읽기 전용 memmap)
+        읽기 전용 행렬은 처음 변경할 때 메모리로 복사됨
+        """
+        index = cls(initial_capacity=max(len(entity_ids), 1))
+        index.dim = matrix.shape[1]
+        index._matrix = matrix
+        index._ids = list(entity_ids)
+        index._row_of = {entity_id: row for row, entity_id in enumerate(index._ids)}
+        index._partitions = np.zeros(matrix.shape[0], dtype=np.int16)
+        if partitions is not None:
+            index._partitions[:len(index._ids)] = index._encode_partitions(partitions)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._row_of
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    def _reserve(self, rows: int):
+        if self._matrix is None:
+            self._matrix = np.zeros((max(rows, self.initial_capacity), self.dim), dtype=np.float32)
+        elif rows > self._matrix.shape[0]:
+            grown = np.zeros((max(rows, self._matrix.shape[0] * 2), self.dim), dtype=np.float32)
+            grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+            self._matrix = grown
+        elif not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix)
+        if len(self._partitions) < self._matrix.shape[0]:
+            grown_partitions = np.zeros(self._matrix.shape[0], dtype=np.int16)
+            grown_partitions[:len(self._ids)] = self._partitions[:len(self._ids)]
+            self._partitions = grown_partitions
+
+    def _encode_partitions(self, partitions: Sequence[Optional[str]]) -> np.ndarray:
+        for name in partitions:
+            if name not in self._partition_code:
+                self._partition_code[name] = len(self._partition_names)
+                self._partition_names.append(name)
+        return np.fromiter((self._partition_code[name] for name in partitions), dtype=np.int16, count=len(partitions))
+
+    def partition_mask(self, partitions: Collection[str]) -> np.ndarray:
+        """허용 파티션에 속한 행 마스크 (길이 = 엔티티 수)"""
+        allowed = np.fromiter((name in partitions for name in self._partition_names), dtype=bool)
+        return allowed[self._partitions[:len(self._ids)]]
+
+    def get(self, entity_id: str) -> Optional[np.ndarray]:
+        row = self._row_of.get(entity_id)
+        return None if row is None else self._matrix[row].copy()
+
+    def matrix_for(self, entity_ids: Sequence[str]) -> np.ndarray:
+        """주어진 ID 순서대로 정렬한 임베딩 행렬 (없는 ID는 0 벡터)"""
+        with self._lock:
+            matrix = np.zeros((len(entity_ids), self.dim or 0), dtype=np.float32)
+            pairs = [(i, self._row_of[entity_id]) for i, entity_id in enumerate(entity_ids) if entity_id in self._row_of]
+            if pairs:
+                positions, rows = (np.array(column, dtype=np.int64) for column in zip(*pairs))
+                matrix[positions] = self._matrix[rows]
+            return matrix
+
+    def add_many(self,
+                 entity_ids: Sequence[str],
+                 vectors,
+                 partitions: Optional[Sequence[str]] = None) -> None:
+        """엔티티 임베딩 추가 (이미 있는 ID는 행을 덮어씀, partitions는 ID별 파티션 라벨)"""
+        if not len(entity_ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            new_ids = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id not in self._row_of]
+            self._reserve(len(self._ids) + len(new_ids))
+            for entity_id in new_ids:
+                self._row_of[entity_id] = len(self._ids)
+                self._ids.append(entity_id)
+            rows = np.fromiter((self._row_of[entity_id] for entity_id in entity_ids), dtype=np.int64)
+            self._matrix[rows] = vectors
+            if partitions is not None:
+                self._partitions[rows] = self._encode_partitions(partitions)
+
+    def set_partitions(self, entity_ids: Sequence[str], partitions: Sequence[str]) -> None:
+        """기존 엔티티의 파티션 라벨 변경 (없는 ID는 무시)"""
+        with self._lock:
+            pairs = [(self._row_of[entity_id], partition)
+                     for entity_id, partition in zip(entity_ids, partitions) if entity_id in self._row_of]
+            if pairs:
+                rows = np.array([row for row, _ in pairs], dtype=np.int64)
+                self._partitions[rows] = self._encode_partitions([partition for _, partition in pairs])
+
+    def remove_many(self, entity_ids: Iterable[str]) -> None:
+        """엔티티 제거 (마지막 행을 빈 자리로 옮겨 행렬을 연속으로 유지)"""
+        with self._lock:
+            if self._matrix is not None:
+                self._reserve(len(self._ids))
+            for entity_id in entity_ids:
+                row = self._row_of.pop(entity_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                last_id = self._ids.pop()
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self._partitions[row] = self._partitions[last]
+                    self._ids[row] = last_id
+                    self._row_of[last_id] = row
+
+    def search(self,
+               query: Sequence[float],
+               k: int,
+               partitions: Optional[Collection[str]] = None) -> List[Tuple[str, float]]:
+        """
+        코사인 유사도 상위 k개 [(엔티티 ID, 유사도)]
+
+        partitions를 주면 해당 파티션 행만 후보로 삼아 (스캔 안에서 마스크 적용)
+        허용 행이 k개 이상이면 항상 k개를 반환
+        """
+        with self._lock:
+            count = len(self._ids)
+            if k <= 0 or count == 0:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+            scores = self._matrix[:count] @ query
+
+            candidates = count
+            if partitions is not None:
+                allowed = self.partition_mask(partitions)
+                candidates = int(np.count_nonzero(allowed))
+                if candidates == 0:
+                    return []
+                scores = np.where(allowed, scores, -np.inf)
+
+            k = min(k, candidates)
+            if k < count:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(count)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._ids[row], float(scores[row])) for row in top]
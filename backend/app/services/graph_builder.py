@@ -0,0 +1,427 @@
+"""
+지식 그래프 병렬 구축
+문서를 샤드로 나누어 프로세스 풀에서 청킹/엔티티·관계 추출(map)을 수행하고,
+샤드별 부분 그래프(노드, 간선, 언급 횟수)를 하나로 합친(reduce) 뒤 진행률/처리량을 제공
+"""
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..core.config import settings
+from .index_manifest import document_id_of
+from .keyword_automaton import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+# (source 유형, target 유형, 관계, 트리거 단어, 신뢰도)
+RelationRule = Tuple[str, str, str, List[str], float]
+EdgeKey = Tuple[str, str, str]
+
+
+def normalize_entity_name(name: str) -> str:
+    """엔티티명 정규화 (유니코드 NFC, 소문자, 공백 정리)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", name)).strip().lower()
+
+
+def canonical_entity_id(entity_type: str, name: str) -> str:
+    """(유형, 정규화된 이름)으로 결정되는 정규 엔티티 ID"""
+    return f"{entity_type}:{normalize_entity_name(name)}"
+
+
+class MedicalEntityExtractor:
+    """키워드/트리거 오토마톤 기반 의료 엔티티·관계 추출기"""
+
+    def __init__(self, medical_entities: Dict[str, List[str]], relation_rules: Sequence[RelationRule]):
+        """
+        Args:
+            medical_entities: 엔티티 유형 → 키워드 목록
+            relation_rules: 관계 추출 규칙 목록
+        """
+        self.medical_entities = medical_entities
+        self.relation_rules = list(relation_rules)
+
+        # 엔티티 키워드/관계 트리거를 각각 하나의 오토마톤으로 컴파일 (청크당 한 번씩만 훑음)
+        self.entity_automaton = KeywordAutomaton(
+            (keyword, entity_type)
+            for entity_type, keywords in medical_entities.items()
+            for keyword in keywords
+        )
+        self.relation_trigger_automaton = KeywordAutomaton(
+            (word, rule_index)
+            for rule_index, (_, _, _, triggers, _) in enumerate(self.relation_rules)
+            for word in triggers
+        )
+
+    def extract_entities(self, text: str) -> List[Dict[str, Any]]:
+        """
+        텍스트에서 의료 엔티티 추출 (텍스트 길이에 선형)
+
+        같은 (유형, 이름)의 언급은 어느 청크에서든 같은 정규 엔티티 ID로 매핑되고,
+        청크 안의 모든 언급 위치는 offsets에 (시작, 끝)으로 기록됨
+        """
+        entities: Dict[str, Dict[str, Any]] = {}
+
+        for match in self.entity_automaton.find_all(text):
+            entity_id = canonical_entity_id(match.value, match.keyword)
+            entity = entities.get(entity_id)
+            if entity is None:
+                entity = entities[entity_id] = {
+                    'id': entity_id,
+                    'type': match.value,
+                    'name': match.keyword,
+                    'context': text[:200],  # 컨텍스트 정보
+                    'confidence': 0.8,
+                    'offsets': []
+                }
+            entity['offsets'].append((match.start, match.end))
+
+        return list(entities.values())
+
+    def extract_relations(self, text: str, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        텍스트와 엔티티에서 의료 관계 추출 (간단한 규칙 기반)
+
+        트리거 단어는 청크당 한 번만 검사하고, 엔티티를 유형별로 묶어 규칙에 해당하는 유형 쌍만 연결
+        """
+        relations = []
+        fired_rules = self.relation_trigger_automaton.values_in(text)
+        if not fired_rules:
+            return relations
+
+        entities_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for entity in entities:
+            entities_by_type.setdefault(entity['type'], []).append(entity)
+
+        for rule_index in sorted(fired_rules):
+            source_type, target_type, relation_type, _, confidence = self.relation_rules[rule_index]
+            for source in entities_by_type.get(source_type, []):
+                for target in entities_by_type.get(target_type, []):
+                    relations.append({
+                        'source': source['id'],
+                        'target': target['id'],
+                        'type': relation_type,
+                        'confidence': confidence
+                    })
+
+        return relations
+
+
+def merge_mentions(existing: Dict[str, Any], incoming: Dict[str, Any]):
+    """노드/간선 속성에 다른 부분 그래프의 언급 횟수/출처/신뢰도를 합침 (컨텍스트 등은 기존 값 유지)"""
+    existing['mentions'].extend(incoming['mentions'])
+    existing['count'] += incoming['count']
+    existing['confidence'] = max(existing['confidence'], incoming['confidence'])
+
+
+def mention_contexts(node: Dict[str, Any]) -> List[str]:
+    """노드의 언급별 컨텍스트 (언급별 컨텍스트가 없는 노드는 모든 언급이 노드 컨텍스트를 공유)"""
+    contexts = node.get('contexts')
+    if contexts is None or len(contexts) != len(node['mentions']):
+        return [node['context']] * len(node['mentions'])
+    return list(contexts)
+
+
+class PartialGraph:
+    """
+    샤드 하나(또는 합쳐진 여러 샤드)의 부분 그래프
+
+    nodes: 정규 엔티티 ID → {type, name, context, confidence, count, mentions, contexts}
+    edges: (source, target, 관계) → {confidence, count, mentions}
+    mentions는 (문서 ID, 청크 순번) 목록, contexts는 언급별 컨텍스트 (context는 첫 언급의 컨텍스트)
+
+    문서 ID → 언급된 노드/간선 색인은 첫 remove_documents에서 만들고 이후 병합마다 갱신하므로
+    색인이 생긴 뒤에는 nodes/edges를 직접 고치지 말고 merge/add_chunk로만 바꿔야 함
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: Dict[EdgeKey, Dict[str, Any]] = {}
+        self.documents = 0
+        self.chunks = 0
+        self.characters = 0
+        self._document_nodes: Optional[Dict[str, Set[str]]] = None
+        self._document_edges: Optional[Dict[str, Set[EdgeKey]]] = None
+
+    def __getstate__(self):
+        # 프로세스 풀로 샤드를 돌려받을 때 색인은 보내지 않음 (필요하면 다시 만듦)
+        return {**self.__dict__, '_document_nodes': None, '_document_edges': None}
+
+    def add_chunk(self, extractor: MedicalEntityExtractor, doc_id: str, chunk_index: int, chunk: str):
+        self.chunks += 1
+        self.characters += len(chunk)
+        mention = (doc_id, chunk_index)
+
+        entities = extractor.extract_entities(chunk)
+        for entity in entities:
+            self._merge_node(entity['id'], {
+                'type': entity['type'],
+                'name': entity['name'],
+                'context': entity['context'],  # 첫 언급의 컨텍스트
+                'confidence': entity['confidence'],
+                'count': 1,
+                'mentions': [mention],
+                'contexts': [entity['context']]
+            })
+
+        for relation in extractor.extract_relations(chunk, entities):
+            self._merge_edge((relation['source'], relation['target'], relation['type']), {
+                'confidence': relation['confidence'],
+                'count': 1,
+                'mentions': [mention]
+            })
+
+    def _build_document_index(self):
+        self._document_nodes, self._document_edges = {}, {}
+        for node_id, node in self.nodes.items():
+            for doc_id, _ in node['mentions']:
+                self._document_nodes.setdefault(doc_id, set()).add(node_id)
+        for key, edge in self.edges.items():
+            for doc_id, _ in edge['mentions']:
+                self._document_edges.setdefault(doc_id, set()).add(key)
+
+    @staticmethod
+    def _index_mentions(index: Optional[Dict[str, set]], key, mentions):
+        if index is not None:
+            for doc_id, _ in mentions:
+                index.setdefault(doc_id, set()).add(key)
+
+    def _merge_node(self, node_id: str, attributes: Dict[str, Any]):
+        self._index_mentions(self._document_nodes, node_id, attributes['mentions'])
+        existing = self.nodes.get(node_id)
+        if existing is None:
+            self.nodes[node_id] = attributes
+        else:
+            contexts = mention_contexts(existing)
+            merge_mentions(existing, attributes)
+            existing['contexts'] = contexts + mention_contexts(attributes)
+            if existing['contexts']:
+                existing['context'] = existing['contexts'][0]
+
+    def _merge_edge(self, key: EdgeKey, attributes: Dict[str, Any]):
+        self._index_mentions(self._document_edges, key, attributes['mentions'])
+        existing = self.edges.get(key)
+        if existing is None:
+            self.edges[key] = attributes
+        else:
+            merge_mentions(existing, attributes)
+
+    def remove_documents(self, document_ids: Collection[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        문서들의 언급을 제거 (언급이 남지 않은 노드/간선과 끝 노드가 사라진 간선은 삭제)
+
+        첫 언급이 제거된 노드는 남은 첫 언급의 컨텍스트를 사용 (남은 문서만으로 새로 구축한 그래프와 같고
+        삭제/수정된 문서의 문장이 남지 않음)
+        문서 색인으로 해당 문서가 언급한 노드/간선만 방문하므로 비용은 그래프 크기가 아니라 제거할 언급 수에 비례
+        (끝 노드가 사라지는 간선은 그 노드의 언급이 모두 제거 대상 문서에 있으므로 같은 문서의 간선 색인에 포함됨)
+
+        Returns:
+            (삭제된 노드 ID, 언급이 줄어든 노드 ID)
+        """
+        document_ids = set(document_ids)
+        removed: Set[str] = set()
+        changed: Set[str] = set()
+        if self._document_nodes is None:
+            self._build_document_index()
+        node_ids: Set[str] = set().union(*(self._document_nodes.pop(doc_id, ()) for doc_id in document_ids))
+        edge_keys: Set[EdgeKey] = set().union(*(self._document_edges.pop(doc_id, ()) for doc_id in document_ids))
+
+        for node_id in node_ids:
+            node = self.nodes.get(node_id)
+            if node is None:
+                continue
+            kept = [(mention, context) for mention, context in zip(node['mentions'], mention_contexts(node))
+                    if mention[0] not in document_ids]
+            if not kept:
+                del self.nodes[node_id]
+                removed.add(node_id)
+                continue
+            node['count'] -= len(node['mentions']) - len(kept)
+            node['mentions'] = [mention for mention, _ in kept]
+            node['contexts'] = [context for _, context in kept]
+            node['context'] = node['contexts'][0]
+            changed.add(node_id)
+
+        for key in edge_keys:
+            edge = self.edges.get(key)
+            if edge is None:
+                continue
+            source, target, _ = key
+            mentions = [mention for mention in edge['mentions'] if mention[0] not in document_ids]
+            if not mentions or source in removed or target in removed:
+                del self.edges[key]
+                self._unindex(self._document_edges, key, edge['mentions'])
+                continue
+            edge['count'] -= len(edge['mentions']) - len(mentions)
+            edge['mentions'] = mentions
+
+        return removed, changed
+
+    @staticmethod
+    def _unindex(index: Dict[str, set], key, mentions):
+        """삭제된 노드/간선을 남은 (제거 대상이 아닌) 문서의 색인에서도 뺌"""
+        for doc_id, _ in mentions:
+            keys = index.get(doc_id)
+            if keys is not None:
+                keys.discard(key)
+
+    def merge(self, other: "PartialGraph"):
+        """다른 부분 그래프를 합침 (reduce 단계, 먼저 합쳐진 샤드의 속성이 우선)"""
+        for node_id, attributes in other.nodes.items():
+            self._merge_node(node_id, attributes)
+        for key, attributes in other.edges.items():
+            self._merge_edge(key, attributes)
+        self.documents += other.documents
+        self.chunks += other.chunks
+        self.characters += other.characters
+
+
+def default_text_splitter(chunk_size: int, chunk_overlap: int) -> Callable[[str], List[str]]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len
+    ).split_text
+
+
+# 워커 프로세스 전역 상태 (풀 초기화시 한 번 생성)
+_worker_extractor: Optional[MedicalEntityExtractor] = None
+_worker_split_text: Optional[Callable[[str], List[str]]] = None
+
+
+def _init_worker(medical_entities, relation_rules, chunk_size, chunk_overlap, splitter_factory):
+    global _worker_extractor, _worker_split_text
+    _worker_extractor = MedicalEntityExtractor(medical_entities, relation_rules)
+    _worker_split_text = splitter_factory(chunk_size, chunk_overlap)
+
+
+def _build_shard(documents: List[Dict[str, Any]]) -> PartialGraph:
+    """문서 샤드 하나를 청킹/추출해 부분 그래프 생성 (map 단계)"""
+    partial = PartialGraph()
+    for doc in documents:
+        doc_id = document_id_of(doc)
+        for i, chunk in enumerate(_worker_split_text(doc.get('content', ''))):
+            partial.add_chunk(_worker_extractor, doc_id, i, chunk)
+        partial.documents += 1
+    return partial
+
+
+class GraphBuildMetrics:
+    """그래프 구축 진행률/처리량 (구축 중에도 다른 스레드에서 조회 가능)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {'status': 'idle'}
+
+    def start(self, total_documents: int, processes: int, shards: int):
+        with self._lock:
+            self._state = {
+                'status': 'running',
+                'total_documents': total_documents,
+                'processed_documents': 0,
+                'chunks': 0,
+                'characters': 0,
+                'shards': shards,
+                'processes': processes,
+                'started_at': time.time()
+            }
+
+    def shard_done(self, partial: PartialGraph):
+        with self._lock:
+            self._state['processed_documents'] += partial.documents
+            self._state['chunks'] += partial.chunks
+            self._state['characters'] += partial.characters
+
+    def finish(self, status: str = 'completed', **extra):
+        with self._lock:
+            self._state['status'] = status
+            self._state['finished_at'] = time.time()
+            self._state.update(extra)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = dict(self._state)
+        if 'started_at' not in state:
+            return state
+        elapsed = state.get('finished_at', time.time()) - state['started_at']
+        state['elapsed_seconds'] = elapsed
+        state['progress'] = state['processed_documents'] / max(state['total_documents'], 1)
+        state['documents_per_second'] = state['processed_documents'] / elapsed if elapsed > 0 else 0.0
+        state['chunks_per_second'] = state['chunks'] / elapsed if elapsed > 0 else 0.0
+        return state
+
+
+class KnowledgeGraphBuilder:
+    """문서 샤드를 프로세스 풀로 병렬 추출하고 부분 그래프를 합치는 빌더"""
+
+    def __init__(self,
+                 medical_entities: Dict[str, List[str]],
+                 relation_rules: Sequence[RelationRule],
+                 chunk_size: int = 500,
+                 chunk_overlap: int = 100,
+                 processes: Optional[int] = None,
+                 shard_size: Optional[int] = None,
+                 splitter_factory: Callable[[int, int], Callable[[str], List[str]]] = default_text_splitter):
+        """
+        Args:
+            medical_entities: 엔티티 유형 → 키워드 목록
+            relation_rules: 관계 추출 규칙 목록
+            chunk_size: 청크 크기
+            chunk_overlap: 청크 겹침 크기
+            processes: 워커 프로세스 수 (기본값 GRAPH_BUILD_PROCESSES 설정, 0이면 CPU 코어 수)
+            shard_size: 샤드당 문서 수 (기본값 GRAPH_BUILD_SHARD_SIZE 설정)
+            splitter_factory: (chunk_size, chunk_overlap) → 텍스트 분할 함수 (워커에서 호출되므로 모듈 수준 함수)
+        """
+        self.worker_args = (medical_entities, list(relation_rules), chunk_size, chunk_overlap, splitter_factory)
+        processes = settings.GRAPH_BUILD_PROCESSES if processes is None else processes
+        self.processes = processes or os.cpu_count() or 1
+        self.shard_size = shard_size or settings.GRAPH_BUILD_SHARD_SIZE
+        self.metrics = GraphBuildMetrics()
+
+    def _shards(self, documents: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        return [documents[i:i + self.shard_size] for i in range(0, len(documents), self.shard_size)]
+
+    def _map_shards(self, shards: List[List[Dict[str, Any]]], processes: int) -> Iterator[PartialGraph]:
+        if processes <= 1:
+            _init_worker(*self.worker_args)
+            for shard in shards:
+                yield _build_shard(shard)
+            return
+
+        # 서버 프로세스는 여러 스레드를 쓰고 있으므로 fork 대신 spawn으로 워커를 시작
+        with ProcessPoolExecutor(max_workers=processes,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=self.worker_args) as pool:
+            # 샤드 순서대로 합쳐 결과(첫 언급 컨텍스트 등)가 프로세스 수와 무관하게 같도록 함
+            yield from pool.map(_build_shard, shards)
+
+    def build(self, documents: List[Dict[str, Any]]) -> PartialGraph:
+        """
+        문서 전체의 그래프 추출 결과를 하나의 부분 그래프로 반환
+
+        샤드가 둘 이상일 때만 프로세스 풀을 사용 (작은 입력은 현재 프로세스에서 처리)
+        """
+        shards = self._shards(documents)
+        processes = min(self.processes, len(shards))
+        self.metrics.start(len(documents), max(processes, 1), len(shards))
+
+        merged = PartialGraph()
+        try:
+            for partial in self._map_shards(shards, processes):
+                merged.merge(partial)
+                self.metrics.shard_done(partial)
+        except Exception:
+            self.metrics.finish('failed')
+            raise
+
+        self.metrics.finish(nodes=len(merged.nodes), edges=len(merged.edges))
+        logger.info(f"그래프 추출 완료: {self.metrics.snapshot()}")
+        return merged
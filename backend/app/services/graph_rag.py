@@ -2,17 +2,20 @@
 서울아산병원 AI 플랫폼 - GraphRAG 시스템
 그래프 기반 검색 증강 생성 (Retrieval Augmented Generation)
 """
-from langchain_community.graphs import Neo4jGraph
-from langchain_core.documents import Document
-from langchain_community.vectorstores import Neo4jVector
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-import networkx as nx
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
-import json
-import uuid
+import threading
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+from ..core.config import settings
+from .embedding_service import get_embedding_service
+from .entity_index import EntityEmbeddingIndex
+from .compact_graph import CompactGraph
+from .graph_retrieval import retrieve_subgraph
+from .index_manifest import content_hash, document_id_of
+from .neo4j_graph_store import Neo4jGraphStore
+from .graph_snapshot import corpus_hash, load_graph_snapshot, save_graph_snapshot
+from .graph_builder import KnowledgeGraphBuilder, MedicalEntityExtractor, PartialGraph
 
 logger = logging.getLogger(__name__)
 
@@ -20,44 +23,38 @@ class MedicalGraphRAG:
     """의료 도메인 GraphRAG 시스템"""
     
     def __init__(self, 
-                 neo4j_url: str = "neo4j://localhost:7687",
-                 neo4j_username: str = "neo4j", 
-                 neo4j_password: str = "password",
-                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"):
+                 neo4j_url: Optional[str] = None,
+                 neo4j_username: Optional[str] = None, 
+                 neo4j_password: Optional[str] = None,
+                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 graph_backend: Optional[str] = None):
         """
         GraphRAG 시스템 초기화
         
         Args:
-            neo4j_url: Neo4j 데이터베이스 URL
-            neo4j_username: Neo4j 사용자명
-            neo4j_password: Neo4j 비밀번호
+            neo4j_url: Neo4j 데이터베이스 URL (기본값 NEO4J_URL 설정)
+            neo4j_username: Neo4j 사용자명 (기본값 NEO4J_USERNAME 설정)
+            neo4j_password: Neo4j 비밀번호 (기본값 NEO4J_PASSWORD 설정)
             embedding_model: 임베딩 모델명
+            graph_backend: memory 또는 neo4j (기본값 GRAPH_BACKEND 설정)
         """
-        self.neo4j_url = neo4j_url
-        self.neo4j_username = neo4j_username
-        self.neo4j_password = neo4j_password
+        self.neo4j_url = neo4j_url or settings.NEO4J_URL
+        self.neo4j_username = neo4j_username or settings.NEO4J_USERNAME
+        self.neo4j_password = neo4j_password or settings.NEO4J_PASSWORD
         self.embedding_model_name = embedding_model
         
-        # Neo4j 연결 (실제 환경에서는 활성화)
-        self.graph = None
-        self.vector_store = None
+        # Neo4j 저장소 (graph_backend=neo4j이고 연결에 성공한 경우에만 사용)
+        self.graph_store: Optional[Neo4jGraphStore] = None
+        self._graph_store_schema = False
         
-        # NetworkX 그래프 (Neo4j 대신 메모리 기반)
-        self.knowledge_graph = nx.MultiDiGraph()
+        # 읽기 전용 압축 그래프 (Neo4j 대신 메모리 기반, 구축시 새 그래프로 통째로 교체)
+        self.knowledge_graph = CompactGraph.empty()
+        # 압축 그래프와 같은 내용의 가변 빌더 (증분 갱신시 제자리 수정, None이면 다음 갱신에서 압축 그래프로부터 복원)
+        self._mutable_graph: Optional[PartialGraph] = PartialGraph()
+        self._build_lock = threading.Lock()
         
-        # 임베딩 모델
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=embedding_model,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        
-        # 텍스트 분할기
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=100,
-            length_function=len
-        )
+        # 임베딩 모델 (벡터 스토어와 공유하는 캐시 기반 임베딩 서비스)
+        self.embeddings = get_embedding_service(embedding_model)
         
         # 의료 엔티티 및 관계 정의
         self.medical_entities = {
@@ -79,24 +76,75 @@ class MedicalGraphRAG:
             'PART_OF', 'RELATED_TO', 'USES', 'PREVENTS'
         ]
         
-        self.entity_embeddings = {}  # 엔티티 임베딩 캐시
+        # 관계 추출 규칙: (source 유형, target 유형, 관계, 트리거 단어, 신뢰도)
+        self.relation_rules = [
+            ('Drug', 'Disease', 'TREATS', ['치료', '처방', '사용'], 0.7),
+            ('Disease', 'Symptom', 'SYMPTOMS_OF', ['증상', '나타남', '발생'], 0.8),
+            ('Doctor', 'Department', 'WORKS_AT', ['소속', '근무', '전문'], 0.9)
+        ]
+        
+        # 엔티티/관계 추출기 (키워드 오토마톤)
+        self.extractor = MedicalEntityExtractor(self.medical_entities, self.relation_rules)
+        
+        # 문서 샤드를 프로세스 풀에서 청킹(500자, 100자 겹침)/추출하는 병렬 빌더
+        self.graph_builder = KnowledgeGraphBuilder(
+            self.medical_entities,
+            self.relation_rules,
+            chunk_size=500,
+            chunk_overlap=100
+        )
+        
+        self.entity_embeddings = EntityEmbeddingIndex()  # 엔티티 임베딩 행렬
+        self.document_fingerprints: Dict[str, str] = {}  # 그래프에 반영된 문서 ID → 내용 해시
+        
+        # 사용자 타입별 허용 엔티티: (엔티티 유형 목록 (None이면 전체), 최소 신뢰도 (초과))
+        self.user_type_filters = {
+            'patient': (['Disease', 'Symptom', 'Treatment', 'Drug'], 0.6),
+            'doctor': (['Disease', 'Treatment', 'Drug', 'Test', 'Department'], 0.5),
+            'researcher': (None, 0.4)  # 연구자는 모든 엔티티 허용
+        }
+        # 임베딩 행 파티션 = (유형, 신뢰도 구간), 사용자 타입별 허용 파티션을 미리 계산
+        self.confidence_bands = sorted({threshold for _, threshold in self.user_type_filters.values()})
+        self.user_type_partitions = {
+            user_type: frozenset(
+                self._entity_partition(entity_type, band)
+                for entity_type in (types or self.medical_entities)
+                for band in range(self.confidence_bands.index(threshold) + 1, len(self.confidence_bands) + 1)
+            )
+            for user_type, (types, threshold) in self.user_type_filters.items()
+        }
+        
+        if (graph_backend or settings.GRAPH_BACKEND) == 'neo4j':
+            self._try_neo4j_connection()
         
+    def _entity_partition(self, entity_type: str, band: int) -> str:
+        return f"{entity_type}:{band}"
+    
+    def _node_partitions(self, graph: CompactGraph, nodes: List[int]) -> List[str]:
+        """
+        노드들의 임베딩 행 파티션 (신뢰도 구간 = 신뢰도가 넘는 임계값 수)
+        
+        증분 갱신과 스냅샷 로드가 같은 값을 얻도록 그래프의 float32 신뢰도를 node_mask와 같은 방식으로 비교
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        bands = np.searchsorted(
+            np.array(self.confidence_bands, dtype=np.float32), np.asarray(graph.node_confidence)[nodes], side='left'
+        )
+        return [
+            self._entity_partition(graph.type_names[entity_type], int(band))
+            for entity_type, band in zip(np.asarray(graph.node_type)[nodes].tolist(), bands.tolist())
+        ]
+    
     def _try_neo4j_connection(self) -> bool:
-        """Neo4j 연결 시도 (선택적)"""
+        """Neo4j 연결 시도 (실패시 메모리 그래프만 사용)"""
         try:
-            self.graph = Neo4jGraph(
+            store = Neo4jGraphStore(
                 url=self.neo4j_url,
                 username=self.neo4j_username,
                 password=self.neo4j_password
             )
-            
-            self.vector_store = Neo4jVector.from_existing_graph(
-                self.embeddings,
-                graph=self.graph,
-                node_label="Document",
-                text_node_properties=["text"],
-                embedding_node_property="embedding"
-            )
+            store.connect()
+            self.graph_store = store
             
             logger.info("Neo4j 연결 성공")
             return True
@@ -105,159 +153,313 @@ class MedicalGraphRAG:
             logger.warning(f"Neo4j 연결 실패, 메모리 그래프 사용: {e}")
             return False
     
+    def _graph_revision(self, graph: CompactGraph) -> str:
+        """압축 그래프 리비전 (그래프를 새로 고정할 때마다 바뀌고 스냅샷에 함께 저장됨)"""
+        return repr(graph.meta.get('built_at'))
+    
+    def _graph_store_synced(self, graph: CompactGraph) -> bool:
+        """Neo4j에 마지막으로 적재된 그래프가 이 그래프인지 (다른 코퍼스/이전 실행의 엔티티가 남아 있지 않은지)"""
+        try:
+            return self.graph_store.revision() == self._graph_revision(graph)
+        except Exception as e:
+            logger.warning(f"Neo4j 그래프 리비전 조회 실패: {e}")
+            return False
+    
+    def _write_to_graph_store(self,
+                              graph: CompactGraph,
+                              nodes: Optional[List[int]] = None,
+                              deleted: Optional[List[str]] = None):
+        """
+        압축 그래프의 노드와 나가는 간선, 엔티티 임베딩을 Neo4j에 배치 적재하고 그래프 리비전을 기록
+        nodes를 지정하지 않으면 기존 엔티티를 모두 지우고 전체를 적재 (저장소를 메모리 그래프와 같게 맞춤)
+        일부 노드만 적재할 때는 해당 노드의 기존 나가는 간선을 교체하고 deleted 엔티티는 삭제
+        """
+        if self.graph_store is None:
+            return
+        try:
+            if nodes is None:
+                self.graph_store.clear()
+            elif deleted:
+                self.graph_store.delete_entities(deleted)
+            replace_edges = nodes is not None
+            nodes = list(range(graph.number_of_nodes())) if nodes is None else nodes
+            embeddings = self.entity_embeddings.matrix_for([graph.key(node) for node in nodes])
+            if not self._graph_store_schema and self.entity_embeddings.dim:
+                self.graph_store.ensure_schema(self.entity_embeddings.dim)
+                self._graph_store_schema = True
+            self.graph_store.write_graph(graph, embeddings, nodes, replace_edges=replace_edges)
+            self.graph_store.set_revision(self._graph_revision(graph))
+        except Exception as e:
+            logger.error(f"Neo4j 그래프 적재 오류: {e}")
+    
     def extract_medical_entities(self, text: str) -> List[Dict[str, Any]]:
-        """텍스트에서 의료 엔티티 추출 (간단한 키워드 기반)"""
-        entities = []
-        
-        for entity_type, keywords in self.medical_entities.items():
-            for keyword in keywords:
-                if keyword in text.lower():
-                    entity_id = f"{entity_type}_{uuid.uuid4().hex[:8]}"
-                    entities.append({
-                        'id': entity_id,
-                        'type': entity_type,
-                        'name': keyword,
-                        'context': text[:200],  # 컨텍스트 정보
-                        'confidence': 0.8
-                    })
-        
-        return entities
+        """
+        텍스트에서 의료 엔티티 추출 (키워드 오토마톤 기반, 텍스트 길이에 선형)
+        
+        같은 (유형, 이름)의 언급은 어느 청크에서든 같은 정규 엔티티 ID로 매핑됨
+        """
+        return self.extractor.extract_entities(text)
     
     def extract_medical_relations(self, text: str, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """텍스트와 엔티티에서 의료 관계 추출"""
-        relations = []
+        """텍스트와 엔티티에서 의료 관계 추출 (간단한 규칙 기반)"""
+        return self.extractor.extract_relations(text, entities)
+    
+    def _embedding_text(self, entity: Dict[str, Any]) -> str:
+        return f"{entity['name']} {entity['context']}"
+    
+    def update_documents(self,
+                         documents: Optional[List[Dict[str, Any]]] = None,
+                         removed_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        문서 단위 증분 갱신 (추가/수정/삭제)
         
-        # 간단한 규칙 기반 관계 추출
-        text_lower = text.lower()
+        내용 해시가 같은 문서는 건너뛰고, 수정/삭제된 문서는 언급 출처로 그 문서의 언급/간선만 그래프에서 뺀 뒤
+        새 내용의 추출 결과만 합침 (다른 문서는 다시 청킹/추출하지 않음)
+        빼기/합치기는 유지 중인 가변 빌더를 제자리에서 고쳐 바뀐 문서의 언급 수에 비례하지만,
+        새 압축 그래프(CSR)로 고정하는 단계는 여전히 전체 노드/간선을 한 번 훑음
+        임베딩 행렬은 제자리에서 갱신: 언급이 모두 사라진 엔티티의 행은 제거하고 (마지막 행을 빈 자리로 이동)
+        새 엔티티와 임베딩 텍스트(이름 + 컨텍스트)가 바뀐 엔티티만 다시 임베딩해 해당 행을 덮어씀
         
-        for i, entity1 in enumerate(entities):
-            for j, entity2 in enumerate(entities):
-                if i >= j:
-                    continue
-                
-                # 관계 패턴 매칭
-                if entity1['type'] == 'Drug' and entity2['type'] == 'Disease':
-                    if any(word in text_lower for word in ['치료', '처방', '사용']):
-                        relations.append({
-                            'source': entity1['id'],
-                            'target': entity2['id'], 
-                            'type': 'TREATS',
-                            'confidence': 0.7
-                        })
-                
-                elif entity1['type'] == 'Symptom' and entity2['type'] == 'Disease':
-                    if any(word in text_lower for word in ['증상', '나타남', '발생']):
-                        relations.append({
-                            'source': entity2['id'],
-                            'target': entity1['id'],
-                            'type': 'SYMPTOMS_OF', 
-                            'confidence': 0.8
-                        })
-                
-                elif entity1['type'] == 'Doctor' and entity2['type'] == 'Department':
-                    if any(word in text_lower for word in ['소속', '근무', '전문']):
-                        relations.append({
-                            'source': entity1['id'],
-                            'target': entity2['id'],
-                            'type': 'WORKS_AT',
-                            'confidence': 0.9
-                        })
-        
-        return relations
+        Args:
+            documents: 추가/수정할 문서 (같은 ID가 이미 있으면 교체)
+            removed_ids: 삭제할 문서 ID
+        
+        Returns:
+            문서/엔티티 변경 요약
+        """
+        started = time.perf_counter()
+        latest = {document_id_of(doc): doc for doc in documents or []}
+        removed_ids = set(removed_ids or []) - set(latest)
+        
+        with self._build_lock:
+            fingerprints = {document_id: content_hash(doc.get('content', '')) for document_id, doc in latest.items()}
+            changed_ids = [
+                document_id for document_id, fingerprint in fingerprints.items()
+                if self.document_fingerprints.get(document_id) != fingerprint
+            ]
+            stale_ids = set(changed_ids) | removed_ids
+            
+            old_graph = self.knowledge_graph
+            partial = self.graph_builder.build([latest[document_id] for document_id in changed_ids]) \
+                if changed_ids else PartialGraph()
+            if not stale_ids:
+                return self._update_summary(latest, changed_ids, removed_ids, [], [], old_graph, started)
+            if self._mutable_graph is None:
+                # 스냅샷 로드 뒤 첫 갱신에서 한 번만 압축 그래프를 가변 빌더로 되돌림
+                self._mutable_graph = old_graph.to_partial()
+            try:
+                graph, deleted, reembed = self._apply_update(old_graph, partial, stale_ids)
+            except Exception:
+                # 가변 빌더가 일부만 바뀌었을 수 있으므로 버리고 다음 갱신에서 (바뀌지 않은) 압축 그래프로부터 복원
+                self._mutable_graph = None
+                raise
+            
+            for document_id in removed_ids:
+                self.document_fingerprints.pop(document_id, None)
+            for document_id in changed_ids:
+                self.document_fingerprints[document_id] = fingerprints[document_id]
+        
+        return self._update_summary(latest, changed_ids, removed_ids, deleted, reembed, graph, started)
+    
+    def _apply_update(self, old_graph: CompactGraph, partial: PartialGraph, stale_ids: set):
+        """가변 빌더에서 문서 언급을 빼고 새 추출 결과를 합친 뒤 압축 그래프/임베딩 행렬/Neo4j에 반영"""
+        merged = self._mutable_graph
+        removed_nodes, shrunk_nodes = merged.remove_documents(stale_ids)
+        merged.merge(partial)
+        graph = CompactGraph.from_partial(merged)
+        
+        # 임베딩 행렬 갱신 대상: 언급이 바뀐 엔티티 중 그래프에 남은 것
+        deleted = [entity_id for entity_id in removed_nodes if entity_id not in graph]
+        touched = [
+            entity_id for entity_id in dict.fromkeys([*shrunk_nodes, *removed_nodes, *partial.nodes])
+            if entity_id in graph
+        ]
+        reembed = []
+        for entity_id in touched:
+            entity = graph.node(graph.index_of(entity_id))
+            previous = old_graph.index_of(entity_id)
+            if (entity_id not in self.entity_embeddings or previous is None
+                    or self._embedding_text(old_graph.node(previous)) != self._embedding_text(entity)):
+                reembed.append((entity_id, entity))
+        # 임베딩 생성이 실패하면 그래프/행렬을 바꾸지 않도록 먼저 계산 (동일 텍스트는 캐시 적중)
+        vectors = self.embeddings.embed_many([self._embedding_text(entity) for _, entity in reembed]) \
+            if reembed else []
+        
+        self.entity_embeddings.remove_many(deleted)
+        self.entity_embeddings.add_many([entity_id for entity_id, _ in reembed], vectors)
+        # 병합/제거로 신뢰도가 바뀔 수 있으므로 언급이 바뀐 엔티티의 파티션을 갱신
+        touched_nodes = [graph.index_of(entity_id) for entity_id in touched]
+        self.entity_embeddings.set_partitions(touched, self._node_partitions(graph, touched_nodes))
+        
+        self.knowledge_graph = graph
+        
+        # Neo4j 사용시 바뀐 엔티티와 그 간선만 반영 (저장소가 이전 그래프와 다르면 (새로 구축/다른 코퍼스) 전체 교체)
+        if self.graph_store is not None:
+            if self._graph_store_synced(old_graph):
+                self._write_to_graph_store(graph, touched_nodes, deleted)
+            else:
+                self._write_to_graph_store(graph)
+        return graph, deleted, reembed
+    
+    def _update_summary(self, latest, changed_ids, removed_ids, deleted, reembed, graph, started) -> Dict[str, Any]:
+        """update_documents의 문서/엔티티 변경 요약"""
+        return {
+            'documents_changed': len(changed_ids),
+            'documents_unchanged': len(latest) - len(changed_ids),
+            'documents_removed': len(removed_ids),
+            'entities_removed': len(deleted),
+            'entities_embedded': len(reembed),
+            'total_nodes': graph.number_of_nodes(),
+            'total_edges': graph.number_of_edges(),
+            'elapsed_seconds': time.perf_counter() - started
+        }
     
     def build_knowledge_graph(self, documents: List[Dict[str, Any]]):
-        """의료 문서들로부터 지식 그래프 구축"""
+        """
+        의료 문서들로부터 지식 그래프 구축 (update_documents로 추가/수정, 같은 문서를 다시 넣어도 중복되지 않음)
+        
+        문서 샤드별 청킹/추출은 프로세스 풀에서 병렬로 수행하고 (map), 부분 그래프를 합친 뒤 (reduce)
+        언급마다 노드를 만들지 않고 (유형, 정규화된 이름)별 정규 엔티티 하나에 언급 출처를 누적하므로
+        그래프 크기와 임베딩 비용은 코퍼스 크기가 아니라 어휘 크기에 비례함
+        완성된 압축 그래프는 참조 교체 한 번으로 반영되어 검색 중인 요청은 이전 그래프를 끝까지 사용
+        진행률/처리량은 get_build_progress()로 구축 중에도 조회 가능
+        """
         try:
             logger.info(f"지식 그래프 구축 시작: {len(documents)}개 문서")
-            
-            for doc in documents:
-                content = doc.get('content', '')
-                doc_id = doc.get('id', str(uuid.uuid4()))
-                
-                # 텍스트 청킹
-                chunks = self.text_splitter.split_text(content)
-                
-                for i, chunk in enumerate(chunks):
-                    # 엔티티 추출
-                    entities = self.extract_medical_entities(chunk)
-                    
-                    # 그래프에 엔티티 추가
-                    for entity in entities:
-                        self.knowledge_graph.add_node(
-                            entity['id'],
-                            type=entity['type'],
-                            name=entity['name'],
-                            document_id=doc_id,
-                            chunk_index=i,
-                            context=entity['context'],
-                            confidence=entity['confidence'],
-                            created_at=datetime.now().isoformat()
-                        )
-                        
-                        # 엔티티 임베딩 생성 및 캐시
-                        if entity['id'] not in self.entity_embeddings:
-                            embedding_text = f"{entity['name']} {entity['context']}"
-                            embedding = self.embeddings.embed_query(embedding_text)
-                            self.entity_embeddings[entity['id']] = embedding
-                    
-                    # 관계 추출 및 추가
-                    relations = self.extract_medical_relations(chunk, entities)
-                    for relation in relations:
-                        self.knowledge_graph.add_edge(
-                            relation['source'],
-                            relation['target'],
-                            type=relation['type'],
-                            confidence=relation['confidence'],
-                            document_id=doc_id,
-                            chunk_index=i,
-                            created_at=datetime.now().isoformat()
-                        )
+            summary = self.update_documents(documents)
             
             # 그래프 통계
-            num_nodes = self.knowledge_graph.number_of_nodes()
-            num_edges = self.knowledge_graph.number_of_edges()
-            logger.info(f"지식 그래프 구축 완료: {num_nodes}개 노드, {num_edges}개 관계")
+            logger.info(
+                f"지식 그래프 구축 완료: {summary['total_nodes']}개 노드, {summary['total_edges']}개 관계, "
+                f"{self.knowledge_graph.nbytes / 1024:.1f}KB"
+            )
             
         except Exception as e:
             logger.error(f"지식 그래프 구축 오류: {e}")
     
-    def graph_search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
-        """그래프 기반 검색"""
+    def remove_documents(self, document_ids: List[str]) -> Dict[str, Any]:
+        """문서 삭제 (해당 문서의 언급/간선과 더 이상 언급되지 않는 엔티티 제거)"""
+        return self.update_documents(removed_ids=document_ids)
+    
+    def snapshot_hash(self, documents: List[Dict[str, Any]]) -> str:
+        """문서 집합과 추출 규칙/청킹/임베딩 모델 설정으로 결정되는 스냅샷 키"""
+        medical_entities, relation_rules, chunk_size, chunk_overlap, _ = self.graph_builder.worker_args
+        return corpus_hash(
+            documents, [medical_entities, relation_rules, chunk_size, chunk_overlap, self.embedding_model_name]
+        )
+    
+    def snapshot_key(self) -> str:
+        """
+        추출 규칙/청킹/임베딩 모델 설정으로만 결정되는 스냅샷 키
+        
+        API로 추가/삭제된 문서도 재시작시 복원되도록 문서 집합은 키에 넣지 않고 스냅샷의 문서 지문으로 복원
+        """
+        return self.snapshot_hash([])
+    
+    def persist_snapshot(self) -> Optional[str]:
+        """현재 그래프를 설정 키로 스냅샷 저장 (문서 갱신 후 호출)"""
+        return self.save_snapshot(self.snapshot_key())
+    
+    def save_snapshot(self, source_hash: str, directory: Optional[str] = None) -> Optional[str]:
+        """현재 그래프와 노드 순서에 맞춘 엔티티 임베딩 행렬을 스냅샷으로 저장"""
+        directory = directory or settings.GRAPH_SNAPSHOT_DIR
+        if not directory:
+            return None
+        try:
+            with self._build_lock:
+                graph = self.knowledge_graph
+                keys = [graph.key(i) for i in range(graph.number_of_nodes())]
+                return save_graph_snapshot(
+                    directory, graph, self.entity_embeddings.matrix_for(keys), source_hash,
+                    documents=self.document_fingerprints
+                )
+        except Exception as e:
+            logger.error(f"지식 그래프 스냅샷 저장 오류: {e}")
+            return None
+    
+    def load_snapshot(self, source_hash: str, directory: Optional[str] = None) -> bool:
+        """
+        원본 해시가 같은 스냅샷이 있으면 읽기 전용 메모리 매핑으로 로드 (재추출/재임베딩 없음)
+        
+        Returns:
+            로드 성공 여부
+        """
+        directory = directory or settings.GRAPH_SNAPSHOT_DIR
+        if not directory:
+            return False
+        try:
+            snapshot = load_graph_snapshot(directory, source_hash)
+            if snapshot is None:
+                return False
+            graph, embeddings = snapshot
+            keys = [graph.key(i) for i in range(graph.number_of_nodes())]
+            partitions = self._node_partitions(graph, list(range(graph.number_of_nodes())))
+            with self._build_lock:
+                self.entity_embeddings = EntityEmbeddingIndex.from_matrix(keys, embeddings, partitions)
+                self.knowledge_graph = graph
+                self._mutable_graph = None
+                self.document_fingerprints = dict(graph.meta.get('documents', {}))
+                # Neo4j에 마지막으로 적재된 그래프가 스냅샷과 다르면 (빈 저장소/다른 코퍼스/저장 전 갱신) 전체 교체
+                if self.graph_store is not None and not self._graph_store_synced(graph):
+                    self._write_to_graph_store(graph)
+            logger.info(f"지식 그래프 스냅샷 로드: {graph.number_of_nodes()}개 노드, {graph.number_of_edges()}개 관계")
+            return True
+        except Exception as e:
+            logger.error(f"지식 그래프 스냅샷 로드 오류: {e}")
+            return False
+    
+    def get_build_progress(self) -> Dict[str, Any]:
+        """마지막(또는 진행 중인) 그래프 구축의 진행률과 처리량"""
+        return self.graph_builder.metrics.snapshot()
+    
+    def graph_search(self,
+                     query: str,
+                     k: int = 10,
+                     mode: str = 'neighbors',
+                     user_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        그래프 기반 검색
+        
+        Args:
+            query: 검색 쿼리
+            k: 결과 엔티티 수
+            mode: 'neighbors' (유사 엔티티 + 1홉 이웃) 또는 'subgraph' (개인화 PageRank 다중 홉 순위)
+            user_type: 지정시 해당 사용자 타입에 허용된 엔티티만 검색 (None이면 전체)
+        """
         try:
+            if mode == 'subgraph':
+                return self._subgraph_results(self.subgraph_search(query, k=k, max_nodes=k, user_type=user_type))
+            
+            graph = self.knowledge_graph  # 검색 중 그래프가 교체되어도 같은 그래프를 사용
             query_embedding = self.embeddings.embed_query(query)
             
-            # 엔티티와의 유사도 계산
-            similarities = []
-            for entity_id, entity_embedding in self.entity_embeddings.items():
-                # 코사인 유사도 계산 (간단한 내적 근사)
-                similarity = sum(a * b for a, b in zip(query_embedding, entity_embedding))
-                similarities.append((entity_id, similarity))
+            # Neo4j 사용시 벡터 인덱스 조회 + 이웃 확장을 Cypher 한 번으로 수행
+            if self.graph_store is not None:
+                try:
+                    return self._neo4j_search(query_embedding, k, user_type)
+                except Exception as e:
+                    logger.warning(f"Neo4j 그래프 검색 실패, 메모리 그래프 사용: {e}")
             
-            # 유사도 순으로 정렬
-            similarities.sort(key=lambda x: x[1], reverse=True)
+            # 엔티티 임베딩 행렬과의 코사인 유사도 상위 k개 (행렬-벡터 곱 + argpartition)
+            # 사용자 타입 필터는 허용 파티션 마스크로 스캔 안에서 적용되어 허용 엔티티가 충분하면 항상 k개
+            similarities = self.entity_embeddings.search(
+                query_embedding, k, partitions=self._user_type_partitions(user_type)
+            )
             
             # 상위 k개 엔티티와 관련된 서브그래프 추출
             results = []
-            for entity_id, similarity in similarities[:k]:
-                if entity_id in self.knowledge_graph:
-                    node_data = self.knowledge_graph.nodes[entity_id]
-                    
-                    # 연관된 엔티티들 찾기
-                    neighbors = []
-                    for neighbor in self.knowledge_graph.neighbors(entity_id):
-                        edge_data = self.knowledge_graph[entity_id][neighbor]
-                        neighbor_data = self.knowledge_graph.nodes[neighbor]
-                        neighbors.append({
-                            'entity': neighbor_data,
-                            'relation': list(edge_data.values())[0] if edge_data else {}
-                        })
-                    
-                    results.append({
-                        'entity': node_data,
-                        'similarity': similarity,
-                        'neighbors': neighbors[:3],  # 상위 3개 이웃만
-                        'entity_id': entity_id
-                    })
+            for entity_id, similarity in similarities:
+                node = graph.index_of(entity_id)
+                if node is None:
+                    continue
+                
+                results.append({
+                    'entity': graph.node(node),
+                    'similarity': similarity,
+                    # 언급 횟수가 많은 상위 3개 이웃만 (CSR 슬라이스가 미리 정렬되어 있음)
+                    'neighbors': graph.neighbors(node, limit=3),
+                    'entity_id': entity_id
+                })
             
             return results
             
@@ -265,6 +467,88 @@ class MedicalGraphRAG:
             logger.error(f"그래프 검색 오류: {e}")
             return []
     
+    def _neo4j_search(self, query_embedding: List[float], k: int, user_type: Optional[str]) -> List[Dict[str, Any]]:
+        types, threshold = None, None
+        if user_type is not None:
+            if user_type not in self.user_type_filters:
+                return []
+            types, threshold = self.user_type_filters[user_type]
+        return self.graph_store.search(query_embedding, k, neighbor_limit=3, types=types, min_confidence=threshold)
+    
+    def subgraph_search(self,
+                        query: str,
+                        k: int = 5,
+                        max_nodes: Optional[int] = None,
+                        max_edges: Optional[int] = None,
+                        time_budget_ms: Optional[float] = None,
+                        user_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        다중 홉 가중 서브그래프 검색
+        
+        질의와 유사한 상위 k개 엔티티를 시드로 간선 신뢰도 가중 개인화 PageRank를 계산하고
+        점수 상위 노드와 그 사이 간선만 반환 (시간 예산 초과시 근사 점수로 조기 종료)
+        
+        Args:
+            query: 검색 쿼리
+            k: 시드 엔티티 수
+            max_nodes: 최대 노드 수 (기본값 GRAPH_SUBGRAPH_MAX_NODES 설정)
+            max_edges: 최대 간선 수 (기본값 max_nodes의 2배)
+            time_budget_ms: 시간 예산 (기본값 GRAPH_SEARCH_TIME_BUDGET_MS 설정)
+            user_type: 지정시 시드와 결과 노드를 해당 사용자 타입에 허용된 엔티티로 제한
+        """
+        graph = self.knowledge_graph
+        query_embedding = self.embeddings.embed_query(query)
+        
+        allowed = None
+        if user_type is not None:
+            types, threshold = self.user_type_filters.get(user_type, ([], float('inf')))
+            allowed = graph.node_mask(types, threshold)
+        
+        seeds = {}
+        for entity_id, similarity in self.entity_embeddings.search(
+            query_embedding, k, partitions=self._user_type_partitions(user_type)
+        ):
+            node = graph.index_of(entity_id)
+            if node is not None and similarity > 0:
+                seeds[node] = similarity
+        
+        return retrieve_subgraph(
+            graph,
+            seeds,
+            max_nodes=max_nodes or settings.GRAPH_SUBGRAPH_MAX_NODES,
+            max_edges=max_edges,
+            time_budget_ms=settings.GRAPH_SEARCH_TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms,
+            alpha=settings.GRAPH_PPR_ALPHA,
+            epsilon=settings.GRAPH_PPR_EPSILON,
+            allowed=allowed
+        )
+    
+    def _user_type_partitions(self, user_type: Optional[str]) -> Optional[frozenset]:
+        """사용자 타입의 허용 파티션 (None이면 필터 없음, 알 수 없는 타입은 빈 집합)"""
+        if user_type is None:
+            return None
+        return self.user_type_partitions.get(user_type, frozenset())
+    
+    def _subgraph_results(self, subgraph: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """서브그래프를 graph_search 결과 형식으로 변환 (이웃은 서브그래프 안의 나가는 간선 상위 3개)"""
+        entities = {node['entity_id']: node['entity'] for node in subgraph['nodes']}
+        outgoing: Dict[str, List[Dict[str, Any]]] = {}
+        for edge in subgraph['edges']:
+            neighbors = outgoing.setdefault(edge['source'], [])
+            if len(neighbors) < 3:
+                neighbors.append({'entity': entities[edge['target']], 'relation': edge['relation']})
+        
+        return [
+            {
+                'entity': node['entity'],
+                'similarity': node['similarity'],
+                'score': node['score'],
+                'neighbors': outgoing.get(node['entity_id'], []),
+                'entity_id': node['entity_id']
+            }
+            for node in subgraph['nodes']
+        ]
+    
     def generate_graph_context(self, search_results: List[Dict[str, Any]]) -> str:
         """검색 결과로부터 그래프 컨텍스트 생성"""
         try:
@@ -302,36 +586,17 @@ class MedicalGraphRAG:
     def graphrag_search(self, 
                        query: str, 
                        user_type: str = 'patient',
-                       max_results: int = 5) -> Dict[str, Any]:
-        """GraphRAG 통합 검색"""
+                       max_results: int = 5,
+                       mode: str = 'neighbors') -> Dict[str, Any]:
+        """GraphRAG 통합 검색 (mode는 graph_search 참고)"""
         try:
-            # 1. 그래프 기반 검색
-            graph_results = self.graph_search(query, k=max_results * 2)
+            # 1. 사용자 타입별 허용 엔티티만 대상으로 그래프 기반 검색 (과다 조회 후 필터링 없이 max_results개)
+            filtered_results = self.graph_search(query, k=max_results, mode=mode, user_type=user_type)
             
-            # 2. 사용자 타입별 결과 필터링
-            filtered_results = []
-            for result in graph_results:
-                entity_type = result['entity']['type']
-                confidence = result['entity']['confidence']
-                
-                # 사용자 타입별 엔티티 우선순위
-                if user_type == 'patient':
-                    if entity_type in ['Disease', 'Symptom', 'Treatment', 'Drug'] and confidence > 0.6:
-                        filtered_results.append(result)
-                elif user_type == 'doctor':
-                    if entity_type in ['Disease', 'Treatment', 'Drug', 'Test', 'Department'] and confidence > 0.5:
-                        filtered_results.append(result)
-                elif user_type == 'researcher':
-                    if confidence > 0.4:  # 연구자는 모든 엔티티 허용
-                        filtered_results.append(result)
-                
-                if len(filtered_results) >= max_results:
-                    break
-            
-            # 3. 그래프 컨텍스트 생성
+            # 2. 그래프 컨텍스트 생성
             graph_context = self.generate_graph_context(filtered_results)
             
-            # 4. 결과 요약
+            # 3. 결과 요약
             return {
                 'query': query,
                 'user_type': user_type,
@@ -358,25 +623,20 @@ class MedicalGraphRAG:
     def get_graph_statistics(self) -> Dict[str, Any]:
         """그래프 통계 정보 반환"""
         try:
-            # 엔티티 타입별 개수
-            entity_counts = {}
-            for node_id in self.knowledge_graph.nodes():
-                node_data = self.knowledge_graph.nodes[node_id]
-                entity_type = node_data.get('type', 'Unknown')
-                entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
-            
-            # 관계 타입별 개수
-            relation_counts = {}
-            for edge in self.knowledge_graph.edges(data=True):
-                relation_type = edge[2].get('type', 'Unknown')
-                relation_counts[relation_type] = relation_counts.get(relation_type, 0) + 1
+            graph = self.knowledge_graph
+            num_nodes = graph.number_of_nodes()
+            num_edges = graph.number_of_edges()
             
             return {
-                'total_nodes': self.knowledge_graph.number_of_nodes(),
-                'total_edges': self.knowledge_graph.number_of_edges(),
-                'entity_counts': entity_counts,
-                'relation_counts': relation_counts,
-                'avg_degree': sum(dict(self.knowledge_graph.degree()).values()) / max(self.knowledge_graph.number_of_nodes(), 1)
+                'total_nodes': num_nodes,
+                'total_edges': num_edges,
+                'entity_counts': graph.type_counts(),
+                'relation_counts': graph.relation_counts(),
+                'memory_bytes': graph.nbytes,
+                'build': self.get_build_progress(),
+                'backend': 'neo4j' if self.graph_store is not None else 'memory',
+                # 노드 차수(들어오는 + 나가는 간선)의 평균
+                'avg_degree': 2 * num_edges / max(num_nodes, 1)
             }
             
         except Exception as e:
@@ -418,10 +678,17 @@ SAMPLE_GRAPH_DOCUMENTS = [
 ]
 
 def initialize_graph_knowledge():
-    """샘플 그래프 지식 데이터 초기화"""
+    """
+    그래프 지식 초기화
+    
+    설정이 같은 스냅샷이 있으면 (API로 갱신된 문서 포함) 그대로 매핑하고, 없으면 샘플 문서로 구축 후 저장
+    """
     try:
         logger.info("의료 지식 그래프 초기화 시작...")
-        medical_graph_rag.build_knowledge_graph(SAMPLE_GRAPH_DOCUMENTS)
+        if not medical_graph_rag.load_snapshot(medical_graph_rag.snapshot_key()):
+            medical_graph_rag.build_knowledge_graph(SAMPLE_GRAPH_DOCUMENTS)
+            if medical_graph_rag.knowledge_graph.number_of_nodes():
+                medical_graph_rag.persist_snapshot()
         
         stats = medical_graph_rag.get_graph_statistics()
         logger.info(f"지식 그래프 초기화 완료 - 통계: {stats}")
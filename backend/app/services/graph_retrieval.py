@@ -0,0 +1,167 @@
+"""
+가중 서브그래프 검색
+질의와 유사한 엔티티를 시드로 개인화 PageRank(forward push 근사)를 계산해 다중 홉 관련도를 구하고
+점수 상위 노드와 그 사이 간선으로 크기가 제한된 서브그래프를 구성
+push는 잔차가 남은 시드 근방 노드만 방문하므로 그래프 전체 크기와 무관하게 끝나며,
+시간 예산이나 push 횟수 한도에 도달하면 그때까지의 근사 점수로 조기 종료
+"""
+import heapq
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+
+# 시간 예산 확인 주기 (push 횟수)
+DEADLINE_CHECK_INTERVAL = 32
+
+
+def personalized_pagerank(graph: CompactGraph,
+                          seeds: Dict[int, float],
+                          alpha: float = 0.15,
+                          epsilon: float = 1e-4,
+                          max_pushes: int = 20000,
+                          deadline: Optional[float] = None) -> Tuple[Dict[int, float], int, bool]:
+    """
+    Andersen-Chung-Lang forward push 방식의 개인화 PageRank
+
+    전이 확률은 walk_adjacency()의 무방향 신뢰도 가중치를 사용 (관계 방향과 무관하게 관련도 전파)
+
+    Args:
+        graph: 압축 그래프
+        seeds: 노드 ID → 개인화 가중치 (합이 1이 되도록 정규화)
+        alpha: 재시작 확률 (클수록 시드 근처에 집중)
+        epsilon: 잔차/차수가 이 값 이하인 노드는 더 이상 push하지 않음
+        max_pushes: push 횟수 한도
+        deadline: time.perf_counter() 기준 종료 시각
+
+    Returns:
+        (노드 ID → 점수, push 횟수, 조기 종료 여부)
+    """
+    total = sum(weight for weight in seeds.values() if weight > 0)
+    if not total:
+        return {}, 0, False
+
+    indptr, indices, probabilities = graph.walk_adjacency()
+    residual = {node: weight / total for node, weight in seeds.items() if weight > 0}
+    estimate: Dict[int, float] = {}
+    queue = deque(residual)
+    queued = set(queue)
+    pushes = 0
+    truncated = False
+
+    while queue:
+        if pushes >= max_pushes or (
+            deadline is not None and pushes % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline
+        ):
+            truncated = True
+            break
+        node = queue.popleft()
+        queued.discard(node)
+        mass = residual.pop(node, 0.0)
+        pushes += 1
+
+        start, end = int(indptr[node]), int(indptr[node + 1])
+        if start == end:
+            # 이웃이 없는 노드는 잔차를 모두 자기 점수로
+            estimate[node] = estimate.get(node, 0.0) + mass
+            continue
+        estimate[node] = estimate.get(node, 0.0) + alpha * mass
+
+        spread = (1 - alpha) * mass
+        for target, probability in zip(indices[start:end].tolist(), probabilities[start:end].tolist()):
+            remaining = residual.get(target, 0.0) + spread * probability
+            residual[target] = remaining
+            if target not in queued and remaining > epsilon * max(int(indptr[target + 1] - indptr[target]), 1):
+                queue.append(target)
+                queued.add(target)
+
+    # 남은 잔차는 한 번 더 push한 것처럼 재시작 몫만 반영 (조기 종료시 경계 노드도 순위에 포함)
+    for node, mass in residual.items():
+        estimate[node] = estimate.get(node, 0.0) + alpha * mass
+    return estimate, pushes, truncated
+
+
+def extract_subgraph(graph: CompactGraph,
+                     scores: Dict[int, float],
+                     max_nodes: int,
+                     max_edges: int,
+                     allowed: Optional[np.ndarray] = None
+                     ) -> Tuple[List[Tuple[int, float]], List[Tuple[float, int, int, int]]]:
+    """
+    점수 상위 max_nodes개 노드와 그 사이 간선 중 (양 끝 점수 합 × 신뢰도) 상위 max_edges개
+    allowed(노드 마스크)를 주면 허용된 노드만 순위에 포함 (워크는 모든 노드를 거쳐 전파됨)
+
+    Returns:
+        ([(노드 ID, 점수)], [(간선 점수, 출발 노드, 도착 노드, 간선 ID)])
+    """
+    candidates = scores.items()
+    if allowed is not None:
+        candidates = [(node, score) for node, score in candidates if allowed[node]]
+    ranked = heapq.nlargest(max_nodes, candidates, key=lambda item: item[1])
+    selected = {node for node, _ in ranked}
+    edges = []
+    for node, score in ranked:
+        start, end = int(graph.indptr[node]), int(graph.indptr[node + 1])
+        for offset, target in enumerate(graph.indices[start:end].tolist()):
+            if target in selected:
+                edge = start + offset
+                edges.append(((score + scores[target]) * float(graph.edge_confidence[edge]), node, target, edge))
+    return ranked, heapq.nlargest(max_edges, edges)
+
+
+def retrieve_subgraph(graph: CompactGraph,
+                      seeds: Dict[int, float],
+                      max_nodes: int = 20,
+                      max_edges: Optional[int] = None,
+                      time_budget_ms: Optional[float] = None,
+                      alpha: float = 0.15,
+                      epsilon: float = 1e-4,
+                      allowed: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    시드에서 개인화 PageRank로 순위를 매긴 크기 제한 서브그래프
+
+    Args:
+        graph: 압축 그래프
+        seeds: 노드 ID → 시드 유사도
+        max_nodes: 최대 노드 수
+        max_edges: 최대 간선 수 (기본값 max_nodes의 2배)
+        time_budget_ms: PageRank 계산 시간 예산 (밀리초, None이면 제한 없음)
+        alpha: 재시작 확률
+        epsilon: push 허용 오차
+        allowed: 결과에 포함할 수 있는 노드 마스크 (None이면 전체)
+
+    Returns:
+        nodes(점수 순), edges(점수 순), truncated(조기 종료 여부), pushes, elapsed_ms
+    """
+    started = time.perf_counter()
+    deadline = None if time_budget_ms is None else started + time_budget_ms / 1000
+    scores, pushes, truncated = personalized_pagerank(graph, seeds, alpha=alpha, epsilon=epsilon, deadline=deadline)
+    ranked, edges = extract_subgraph(graph, scores, max_nodes, max_edges or max_nodes * 2, allowed)
+
+    return {
+        'nodes': [
+            {
+                'entity_id': graph.key(node),
+                'entity': graph.node(node),
+                'score': score,
+                'similarity': seeds.get(node),
+                'seed': node in seeds
+            }
+            for node, score in ranked
+        ],
+        'edges': [
+            {
+                'source': graph.key(source),
+                'target': graph.key(target),
+                'relation': graph.edge(edge),
+                'score': score
+            }
+            for score, source, target, edge in edges
+        ],
+        'truncated': truncated,
+        'pushes': pushes,
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
@@ -0,0 +1,132 @@
+"""
+지식 그래프 스냅샷
+압축 그래프 배열과 노드 순서에 맞춘 엔티티 임베딩 행렬을 버전별 디렉토리에 .npy로 저장하고,
+시작시 mmap_mode='r'로 매핑해 재구축/재임베딩 없이 바로 사용 (워커 프로세스는 같은 페이지 캐시를 공유)
+원본 코퍼스/추출 설정 해시가 바뀐 경우에만 다시 구축
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
+CURRENT_FILE = "CURRENT"
+EMBEDDINGS_FILE = "entity_embeddings.npy"
+
+
+def corpus_hash(documents: Iterable[Dict[str, Any]], config: Any) -> str:
+    """원본 문서(ID, 내용)와 추출/임베딩 설정으로 결정되는 해시"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([SNAPSHOT_FORMAT, config], ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+    for doc in sorted(documents, key=lambda doc: str(doc.get("id", ""))):
+        digest.update(str(doc.get("id", "")).encode("utf-8") + b"\x00")
+        digest.update(doc.get("content", "").encode("utf-8") + b"\x00")
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: str, data: Any):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def save_graph_snapshot(directory: str,
+                        graph: CompactGraph,
+                        embeddings: np.ndarray,
+                        source_hash: str,
+                        keep: int = 2,
+                        documents: Optional[Dict[str, str]] = None) -> str:
+    """
+    스냅샷 저장
+
+    새 버전 디렉토리를 임시 이름으로 완성한 뒤 이름을 바꾸고 CURRENT 포인터를 교체하므로
+    저장 중 중단되거나 다른 프로세스가 읽고 있어도 이전 스냅샷이 온전히 유지됨
+
+    Args:
+        directory: 스냅샷 상위 디렉토리
+        graph: 압축 그래프
+        embeddings: 노드 순서에 맞춘 (노드 수, dim) float32 임베딩 행렬
+        source_hash: corpus_hash 결과
+        keep: 유지할 최근 버전 수
+        documents: 그래프에 반영된 문서 ID → 내용 해시 (로드시 graph.meta['documents'])
+
+    Returns:
+        저장된 버전 이름
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = f"v{time.time_ns()}-{source_hash[:12]}"
+    temp_dir = os.path.join(directory, version + ".tmp")
+    os.makedirs(temp_dir)
+
+    for name, array in graph.arrays.items():
+        np.save(os.path.join(temp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+    np.save(os.path.join(temp_dir, EMBEDDINGS_FILE), np.ascontiguousarray(embeddings, dtype=np.float32))
+    _write_json_atomic(os.path.join(temp_dir, "meta.json"), {
+        **graph.meta,
+        "format": SNAPSHOT_FORMAT,
+        "source_hash": source_hash,
+        "documents": documents or {},
+        "arrays": sorted(graph.arrays)
+    })
+
+    os.replace(temp_dir, os.path.join(directory, version))
+    _write_json_atomic(os.path.join(directory, CURRENT_FILE), {"version": version})
+
+    versions = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith("v") and not name.endswith(".tmp") and os.path.isdir(os.path.join(directory, name))
+    )
+    for old in versions[:-keep]:
+        if old != version:
+            shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+    logger.info(f"지식 그래프 스냅샷 저장: {version}")
+    return version
+
+
+def load_graph_snapshot(directory: str,
+                        source_hash: Optional[str] = None) -> Optional[Tuple[CompactGraph, np.ndarray]]:
+    """
+    현재 스냅샷을 읽기 전용 메모리 매핑으로 로드
+
+    Args:
+        directory: 스냅샷 상위 디렉토리
+        source_hash: 지정시 스냅샷의 원본 해시와 다르면 None 반환
+
+    Returns:
+        (압축 그래프, 임베딩 행렬) 또는 사용할 스냅샷이 없으면 None
+    """
+    current_path = os.path.join(directory, CURRENT_FILE)
+    if not os.path.exists(current_path):
+        return None
+    try:
+        with open(current_path, "r", encoding="utf-8") as f:
+            version_dir = os.path.join(directory, json.load(f)["version"])
+        with open(os.path.join(version_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"지식 그래프 스냅샷을 읽을 수 없음: {e}")
+        return None
+
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        logger.info(f"스냅샷 형식 불일치 (v{meta.get('format')}), 다시 구축함")
+        return None
+    if source_hash is not None and meta.get("source_hash") != source_hash:
+        logger.info("원본 코퍼스가 바뀌어 스냅샷을 사용하지 않음")
+        return None
+
+    arrays = {
+        name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r") for name in meta["arrays"]
+    }
+    embeddings = np.load(os.path.join(version_dir, EMBEDDINGS_FILE), mmap_mode="r")
+    return CompactGraph(arrays, meta), embeddings
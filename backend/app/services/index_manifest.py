@@ -0,0 +1,123 @@
+"""
+벡터 색인 매니페스트
+문서별 지문과 청크 ID를 기록해 재색인시 변경된 청크만 임베딩/upsert하고
+더 이상 존재하지 않는 청크는 삭제하도록 함
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 청크 ID 네임스페이스 (값이 바뀌면 모든 청크 ID가 바뀌므로 변경 금지)
+CHUNK_NAMESPACE = uuid.UUID("6f1c1f4e-3b0e-5d7a-9a57-5e0b1d8c2a10")
+
+# payload에 들어가는 문서 메타데이터 필드
+METADATA_FIELDS = ("source", "title", "type", "department", "specialty", "confidence")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def chunk_point_id(document_id: str, chunk_index: int, chunk: str) -> str:
+    """(문서 ID, 청크 순번, 청크 내용 해시)로 결정되는 청크 포인트 ID"""
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{document_id}\x00{chunk_index}\x00{content_hash(chunk)}"))
+
+
+def document_id_of(doc: Dict[str, Any]) -> str:
+    """문서 ID (id가 없으면 출처+제목, 그것도 없으면 내용 해시)"""
+    if doc.get("id"):
+        return str(doc["id"])
+    if doc.get("source") or doc.get("title"):
+        return f"{doc.get('source', '')}:{doc.get('title', '')}"
+    return content_hash(doc.get("content", ""))
+
+
+def metadata_hash(doc: Dict[str, Any]) -> str:
+    return content_hash(json.dumps(
+        [doc.get(field) for field in METADATA_FIELDS], ensure_ascii=False, sort_keys=True, default=str
+    ))
+
+
+def document_fingerprint(doc: Dict[str, Any]) -> str:
+    """문서 내용 + 메타데이터 지문 (같으면 재색인 생략)"""
+    return content_hash(metadata_hash(doc) + doc.get("content", ""))
+
+
+class IndexManifest:
+    """컬렉션별 문서 색인 상태 (JSON 파일)"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 매니페스트 파일 경로 (None이면 메모리에만 유지)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._collections = json.load(f).get("collections", {})
+
+    def get(self, collection_name: str, document_id: str) -> Optional[Dict[str, Any]]:
+        return self._collections.get(collection_name, {}).get(document_id)
+
+    def documents(self, collection_name: str) -> List[str]:
+        return list(self._collections.get(collection_name, {}))
+
+    def set(self, collection_name: str, document_id: str, fingerprint: str, metadata: str, chunk_ids: List[str]):
+        with self._lock:
+            self._collections.setdefault(collection_name, {})[document_id] = {
+                "fingerprint": fingerprint,
+                "metadata": metadata,
+                "chunk_ids": chunk_ids
+            }
+
+    def reset(self, collection_name: str):
+        """컬렉션의 색인 기록 전체 삭제 (백엔드 데이터가 사라진 경우)"""
+        with self._lock:
+            self._collections.pop(collection_name, None)
+
+    def remove(self, collection_name: str, document_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._collections.get(collection_name, {}).pop(document_id, None)
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체 (중간에 중단되어도 이전 매니페스트 유지)"""
+        if not self.path:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "collections": self._collections}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+
+def plan_document_update(entry: Optional[Dict[str, Any]],
+                         chunk_ids: List[str],
+                         metadata: str) -> Tuple[List[int], Set[str]]:
+    """
+    문서 재색인 계획
+
+    Args:
+        entry: 매니페스트에 기록된 이전 색인 상태
+        chunk_ids: 새 청크 ID 목록
+        metadata: 새 메타데이터 해시
+
+    Returns:
+        (upsert할 청크 순번, 삭제할 이전 청크 ID)
+        메타데이터나 청크 수가 바뀌면 payload(total_chunks 등)가 달라지므로 모든 청크를 upsert
+    """
+    if entry is None:
+        return list(range(len(chunk_ids))), set()
+
+    previous = entry["chunk_ids"]
+    stale = set(previous) - set(chunk_ids)
+    if entry.get("metadata") != metadata or len(previous) != len(chunk_ids):
+        return list(range(len(chunk_ids))), stale
+
+    known = set(previous)
+    return [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in known], stale
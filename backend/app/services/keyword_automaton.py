@@ -0,0 +1,81 @@
+"""
+다중 키워드 매칭 오토마톤 (Aho-Corasick)
+키워드 사전을 하나의 오토마톤으로 컴파일해 텍스트를 한 번만 훑으며 모든 언급을 위치와 함께 찾음
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    value: Any
+
+
+class KeywordAutomaton:
+    """대소문자 구분 없는 Aho-Corasick 오토마톤 (겹치는 매칭 포함)"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        """
+        Args:
+            keywords: (키워드, 매칭시 함께 반환할 값) 목록 (같은 키워드가 여러 값에 속할 수 있음)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, Any]] = []
+
+        for keyword, value in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append(len(self._patterns))
+            self._patterns.append((keyword, value))
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _build_failure_links(self):
+        """BFS로 실패 링크를 만들고 접미사 상태의 출력을 합침"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """텍스트의 모든 키워드 언급 (끝 위치 순)"""
+        matches = []
+        goto, fail, outputs, patterns = self._goto, self._fail, self._outputs, self._patterns
+        state = 0
+        for position, char in enumerate(text.lower()):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_index in outputs[state]:
+                keyword, value = patterns[pattern_index]
+                matches.append(KeywordMatch(position + 1 - len(keyword), position + 1, keyword, value))
+        return matches
+
+    def values_in(self, text: str) -> set:
+        """텍스트에 언급된 키워드의 값 집합"""
+        return {match.value for match in self.find_all(text)}
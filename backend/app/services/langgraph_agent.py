@@ -18,9 +18,9 @@ from datetime import datetime
 import json
 import uuid
 
-from vector_store import medical_vector_store
-from graph_rag import medical_graph_rag
-from qwen_model import qwen_model
+from .vector_store import medical_vector_store
+from .graph_rag import medical_graph_rag
+from .qwen_model import qwen_model
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,295 @@
+"""
+BM25 어휘 색인
+벡터 컬렉션과 같은 청크를 역색인해 약물명(메트포르민), KCD 코드(E11, I10)처럼
+정확한 용어가 중요한 질의를 보완하고, 밀집 검색 결과와 RRF(reciprocal rank fusion)로 결합
+"""
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+
+# 영문/숫자 용어(KCD 코드, 약물 영문명, 용량)와 한글 어절
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:\.[0-9a-z]+)*|[가-힣]+")
+
+# 어절 끝에서 떼어낼 조사 (긴 것부터 검사)
+JOSA_SUFFIXES = sorted(
+    ["은", "는", "이", "가", "을", "를", "의", "에", "에서", "에게", "으로", "로", "와", "과", "도", "만", "이나", "나"],
+    key=len,
+    reverse=True
+)
+
+
+def _strip_josa(word: str) -> str:
+    for suffix in JOSA_SUFFIXES:
+        if len(word) > len(suffix) + 1 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 의료 텍스트 토큰화
+
+    - 영문/숫자 용어는 소문자 그대로 (E11.9는 e11.9와 상위 코드 e11을 함께 생성)
+    - 한글 어절은 조사를 뗀 어절과 음절 bigram을 생성해 형태소 분석기 없이도 활용형/복합어가 일치하도록 함
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        word = match.group()
+        if word[0] < "가":
+            tokens.append(word)
+            if "." in word:
+                tokens.append(word.split(".", 1)[0])
+            continue
+
+        stem = _strip_josa(word)
+        tokens.append(stem)
+        if len(stem) > 2:
+            tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+    return tokens
+
+
+def _matches(payload: Dict[str, Any], payload_filter: Optional[Dict[str, Any]]) -> bool:
+    return not payload_filter or all(payload.get(field) == value for field, value in payload_filter.items())
+
+
+class BM25Collection:
+    """컬렉션 하나의 BM25 역색인"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: str, terms: Dict[str, int], payload: Dict[str, Any]):
+        self.remove(doc_id)
+        length = sum(terms.values())
+        self._docs[doc_id] = {"terms": terms, "length": length, "payload": payload}
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc["length"]
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, terms: List[str], k: int,
+               payload_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        if k <= 0 or not self._docs:
+            return []
+        n = len(self._docs)
+        average_length = self._total_length / n or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                length_norm = 1 - self.b + self.b * self._docs[doc_id]["length"] / average_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+        if payload_filter:
+            scores = {
+                doc_id: score for doc_id, score in scores.items()
+                if _matches(self._docs[doc_id]["payload"], payload_filter)
+            }
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [{"id": doc_id, "score": score, "payload": self._docs[doc_id]["payload"]} for doc_id, score in top]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {doc_id: {"terms": doc["terms"], "payload": doc["payload"]} for doc_id, doc in self._docs.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Collection":
+        collection = cls()
+        for doc_id, doc in data.items():
+            collection.add(doc_id, doc["terms"], doc["payload"])
+        return collection
+
+
+class LexicalIndex:
+    """
+    컬렉션별 BM25 색인 (벡터 백엔드와 같은 포인트 ID/페이로드를 유지)
+
+    디스크에는 컬렉션별 스냅샷(JSON)과 그 이후의 연산 로그(JSONL)를 두고, save는 마지막 저장 이후
+    변경분만 로그에 덧붙임 (로그가 컬렉션보다 충분히 길어졌을 때만 스냅샷을 다시 씀)
+    """
+
+    def __init__(self, directory: Optional[str] = None, compact_threshold: int = 1000):
+        """
+        Args:
+            directory: 컬렉션별 스냅샷/연산 로그 저장 디렉토리 (None이면 메모리에만 유지)
+            compact_threshold: 로그 연산 수가 2 * 청크 수 + 이 값을 넘으면 스냅샷으로 압축
+        """
+        self.directory = directory
+        self.compact_threshold = compact_threshold
+        self._collections: Dict[str, BM25Collection] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}  # 아직 로그에 쓰지 않은 연산
+        self._log_operations: Dict[str, int] = {}  # 스냅샷 이후 로그에 기록된 연산 수
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, collection_name: str) -> str:
+        return os.path.join(self.directory, f"{collection_name}.json")
+
+    def _log_path(self, collection_name: str) -> str:
+        return os.path.join(self.directory, f"{collection_name}.log.jsonl")
+
+    def _load(self, collection_name: str) -> BM25Collection:
+        """스냅샷을 읽고 이후 연산 로그를 재생"""
+        collection = BM25Collection()
+        if os.path.exists(self._path(collection_name)):
+            with open(self._path(collection_name), "r", encoding="utf-8") as f:
+                collection = BM25Collection.from_dict(json.load(f))
+
+        operations = 0
+        if os.path.exists(self._log_path(collection_name)):
+            with open(self._log_path(collection_name), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # 마지막 줄이 기록 도중 끊긴 경우
+                    operations += 1
+                    if entry["op"] == "add":
+                        collection.add(entry["id"], entry["terms"], entry["payload"])
+                    elif entry["op"] == "delete":
+                        collection.remove(entry["id"])
+                    else:
+                        collection = BM25Collection()
+        self._log_operations[collection_name] = operations
+        return collection
+
+    def _collection(self, collection_name: str):
+        """(컬렉션, 잠금) 반환 (최초 접근시 스냅샷에서 로드)"""
+        with self._lock:
+            lock = self._locks.setdefault(collection_name, threading.RLock())
+        with lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                collection = self._load(collection_name) if self.directory else BM25Collection()
+                self._collections[collection_name] = collection
+        return collection, lock
+
+    def add(self, collection_name: str, ids: List[str], payloads: List[Dict[str, Any]]):
+        """청크 추가/교체 (payload의 content를 색인)"""
+        collection, lock = self._collection(collection_name)
+        with lock:
+            for doc_id, payload in zip(ids, payloads):
+                terms = dict(Counter(tokenize(payload.get("content", ""))))
+                collection.add(doc_id, terms, payload)
+                if self.directory:
+                    self._pending.setdefault(collection_name, []).append(
+                        {"op": "add", "id": doc_id, "terms": terms, "payload": payload}
+                    )
+
+    def delete(self, collection_name: str, ids: List[str]):
+        collection, lock = self._collection(collection_name)
+        with lock:
+            for doc_id in ids:
+                collection.remove(doc_id)
+                if self.directory:
+                    self._pending.setdefault(collection_name, []).append({"op": "delete", "id": doc_id})
+
+    def reset(self, collection_name: str):
+        _, lock = self._collection(collection_name)
+        with lock:
+            self._collections[collection_name] = BM25Collection()
+            if self.directory:
+                self._pending[collection_name] = [{"op": "reset"}]
+
+    def count(self, collection_name: str) -> int:
+        collection, lock = self._collection(collection_name)
+        with lock:
+            return len(collection)
+
+    def search(self, collection_name: str, query: str, k: int,
+               payload_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """BM25 상위 k개 [{"id", "score", "payload"}]"""
+        terms = tokenize(query)
+        collection, lock = self._collection(collection_name)
+        with lock:
+            return collection.search(terms, k, payload_filter)
+
+    def save(self, collection_name: str):
+        """
+        마지막 저장 이후 변경분을 연산 로그에 덧붙임 (변경 크기에 비례)
+
+        로그가 2 * 청크 수 + compact_threshold를 넘을 때만 스냅샷을 다시 쓰고 로그를 비움
+        """
+        if not self.directory:
+            return
+        collection, lock = self._collection(collection_name)
+        with lock:
+            pending = self._pending.pop(collection_name, [])
+            if pending:
+                with open(self._log_path(collection_name), "a", encoding="utf-8") as f:
+                    for entry in pending:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            operations = self._log_operations.get(collection_name, 0) + len(pending)
+            self._log_operations[collection_name] = operations
+            if operations > 2 * len(collection) + self.compact_threshold:
+                self._compact(collection_name, collection)
+
+    def _compact(self, collection_name: str, collection: BM25Collection):
+        """
+        스냅샷을 다시 쓰고 로그를 비움 (임시 파일에 쓴 뒤 교체)
+
+        로그에는 스냅샷에 반영된 연산까지 모두 기록되어 있으므로, 스냅샷 교체 후 로그 삭제 전에 중단되어도
+        로그 재생 결과가 스냅샷과 같음 (ID별 마지막 연산/초기화가 결과를 정함)
+        """
+        temp_path = self._path(collection_name) + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(collection.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, self._path(collection_name))
+        if os.path.exists(self._log_path(collection_name)):
+            os.remove(self._log_path(collection_name))
+        self._log_operations[collection_name] = 0
+
+
+def reciprocal_rank_fusion(ranked_lists: Dict[str, List[Dict[str, Any]]],
+                           limit: int,
+                           k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    여러 검색 결과를 RRF로 결합
+
+    Args:
+        ranked_lists: 검색 방식명 → 순위순 결과 리스트 (결과는 'id' 필드로 식별)
+        limit: 반환할 결과 수
+        k: RRF 상수 (기본값 HYBRID_RRF_K 설정)
+
+    Returns:
+        score를 RRF 점수로 바꾸고 방식별 순위를 'ranks'에 기록한 결과 리스트
+    """
+    k = settings.HYBRID_RRF_K if k is None else k
+    fused: Dict[str, Dict[str, Any]] = {}
+    for source, results in ranked_lists.items():
+        for rank, result in enumerate(results, start=1):
+            entry = fused.get(result["id"])
+            if entry is None:
+                entry = fused[result["id"]] = {**result, "score": 0.0, "ranks": {}}
+            entry["score"] += 1.0 / (k + rank)
+            entry["ranks"][source] = rank
+    return heapq.nlargest(limit, fused.values(), key=lambda result: result["score"])
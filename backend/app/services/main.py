@@ -8,10 +8,12 @@ from datetime import datetime
 from typing import Dict, Any
 import uvicorn
 import logging
-from qwen_model import qwen_model
-from vector_store import medical_vector_store, initialize_sample_data
-from graph_rag import medical_graph_rag, initialize_graph_knowledge
-from langgraph_agent import medical_agent
+# 저장소/임베딩 서비스가 한 모듈 인스턴스를 공유하도록 저장소 루트 기준 패키지 경로로 import
+# (실행: 저장소 루트에서 python -m backend.app.services.main)
+from backend.app.services.qwen_model import qwen_model
+from backend.app.services.vector_store import async_medical_vector_store, close_vector_store, initialize_sample_data
+from backend.app.services.graph_rag import medical_graph_rag, initialize_graph_knowledge
+from backend.app.services.langgraph_agent import medical_agent
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +46,13 @@ async def startup_event():
     logger.info("Server starting up...")
     # 백그라운드에서 모델 로드 (서버 시작을 블로킹하지 않음)
     asyncio.create_task(load_model_background())
+    # 대시보드 폴링이 벡터 DB를 호출하지 않도록 컬렉션 통계를 백그라운드로 갱신
+    async_medical_vector_store.start_stats_refresh()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료시 Qdrant 커넥션 풀, 임베딩 인코딩 풀 및 캐시 정리"""
+    await close_vector_store()
 
 async def load_model_background():
     """백그라운드에서 모델 및 지식베이스 로드"""
@@ -94,20 +103,27 @@ async def generate_medical_response(query: str, session_id: str, user_type: str)
     yield f"data: {json.dumps({'event_type': 'session_start', 'data': {'session_id': session_id}, 'timestamp': datetime.now().isoformat(), 'session_id': session_id})}\n\n"
     await asyncio.sleep(0.5)
     
-    # GraphRAG 검색 수행
+    # GraphRAG 검색과 벡터 검색을 동시에 시작 (진행 이벤트를 보내는 동안 검색이 진행됨)
+    graph_task = asyncio.create_task(
+        asyncio.to_thread(medical_graph_rag.graphrag_search, query, user_type=user_type, max_results=3)
+    )
+    vector_task = asyncio.create_task(
+        async_medical_vector_store.search_by_medical_context(query, user_type=user_type)
+    )
+    
     yield f"data: {json.dumps({'event_type': 'step_update', 'data': {'step': 'GraphRAG 지식 그래프 검색 중...'}, 'timestamp': datetime.now().isoformat(), 'session_id': session_id})}\n\n"
     await asyncio.sleep(0.3)
     
     try:
         # GraphRAG 검색
-        graph_results = medical_graph_rag.graphrag_search(query, user_type=user_type, max_results=3)
+        graph_results = await graph_task
         graph_context = graph_results.get('graph_context', '')
         
         # 벡터 검색 수행
         yield f"data: {json.dumps({'event_type': 'step_update', 'data': {'step': '벡터 데이터베이스 검색 중...'}, 'timestamp': datetime.now().isoformat(), 'session_id': session_id})}\n\n"
         await asyncio.sleep(0.3)
         
-        vector_results = medical_vector_store.search_by_medical_context(query, user_type=user_type)
+        vector_results = await vector_task
         vector_context = ""
         if vector_results:
             vector_context = "\\n\\n".join([
@@ -136,6 +152,7 @@ async def generate_medical_response(query: str, session_id: str, user_type: str)
         
     except Exception as e:
         logger.error(f"Knowledge base search error: {e}")
+        vector_task.cancel()
         # 기본 메모리 컨텍스트
         memory_context = {
             "previous_symptoms": ["두통", "발열"] if "증상" in query else [],
@@ -181,7 +198,8 @@ async def generate_medical_response(query: str, session_id: str, user_type: str)
             
             # 에이전트 처리 과정을 스트리밍으로 전송
             if agent_result.get('tools_used'):
-                yield f"data: {json.dumps({'event_type': 'step_update', 'data': {'step': f'도구 사용 완료: {', '.join(agent_result['tools_used'])}'}, 'timestamp': datetime.now().isoformat(), 'session_id': session_id})}\n\n"
+                tools_used = ', '.join(agent_result['tools_used'])
+                yield f"data: {json.dumps({'event_type': 'step_update', 'data': {'step': f'도구 사용 완료: {tools_used}'}, 'timestamp': datetime.now().isoformat(), 'session_id': session_id})}\n\n"
                 await asyncio.sleep(0.2)
             
             # 응답을 토큰 단위로 스트리밍
@@ -287,11 +305,14 @@ async def test_stream():
 async def get_vector_stats():
     """벡터 스토어 통계"""
     try:
-        stats = medical_vector_store.get_collection_stats()
+        stats = await async_medical_vector_store.get_collection_stats()
         return {
             "status": "success",
             "vector_store_stats": stats,
-            "total_documents": sum(stats.values())
+            "total_documents": sum(info["points"] for info in stats.values()),
+            "total_ram_bytes": sum(info["ram_bytes"] for info in stats.values()),
+            "total_disk_bytes": sum(info["disk_bytes"] for info in stats.values()),
+            "total_ingest_rate": sum(info["ingest_rate"] for info in stats.values())
         }
     except Exception as e:
         return {
@@ -326,7 +347,7 @@ async def vector_search(request: Dict[Any, Any]):
         if not query:
             raise HTTPException(status_code=400, detail="Query is required")
         
-        results = medical_vector_store.search_by_medical_context(query, user_type=user_type)
+        results = await async_medical_vector_store.search_by_medical_context(query, user_type=user_type)
         
         return {
             "status": "success",
@@ -349,11 +370,12 @@ async def graph_search(request: Dict[Any, Any]):
     try:
         query = request.get("query", "")
         user_type = request.get("user_type", "patient")
+        mode = request.get("mode", "neighbors")
         
         if not query:
             raise HTTPException(status_code=400, detail="Query is required")
         
-        results = medical_graph_rag.graphrag_search(query, user_type=user_type)
+        results = medical_graph_rag.graphrag_search(query, user_type=user_type, mode=mode)
         
         return {
             "status": "success",
@@ -369,6 +391,52 @@ async def graph_search(request: Dict[Any, Any]):
             "graph_results": {}
         }
 
+@app.post("/api/v1/knowledge/graph-documents")
+async def upsert_graph_documents(request: Dict[Any, Any]):
+    """지식 그래프 문서 추가/수정 (해당 문서의 언급과 엔티티 임베딩만 증분 갱신)"""
+    try:
+        documents = request.get("documents", [])
+        
+        if not documents:
+            raise HTTPException(status_code=400, detail="Documents are required")
+        
+        summary = await asyncio.to_thread(medical_graph_rag.update_documents, documents)
+        if summary["documents_changed"]:
+            # 재시작시 갱신된 그래프를 그대로 복원하도록 스냅샷 저장
+            await asyncio.to_thread(medical_graph_rag.persist_snapshot)
+        
+        return {
+            "status": "success",
+            "update": summary
+        }
+        
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e),
+            "update": {}
+        }
+
+@app.delete("/api/v1/knowledge/graph-documents/{document_id}")
+async def delete_graph_document(document_id: str):
+    """지식 그래프 문서 삭제"""
+    try:
+        summary = await asyncio.to_thread(medical_graph_rag.remove_documents, [document_id])
+        if summary["documents_removed"]:
+            await asyncio.to_thread(medical_graph_rag.persist_snapshot)
+        
+        return {
+            "status": "success",
+            "update": summary
+        }
+        
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e),
+            "update": {}
+        }
+
 @app.post("/api/v1/agent/query")
 async def agent_query(request: Dict[Any, Any]):
     """LangGraph 에이전트 질의 처리"""
@@ -0,0 +1,143 @@
+"""
+규칙 기반 의료 프롬프트 재작성기
+용어 매핑과 환자명 패턴을 하나의 정규식으로 컴파일해 한 번의 스캔으로 치환하고,
+치환 중에 강화 통계를 함께 수집
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+MEDICAL_TERM_MAPPINGS = {
+    "TG": "중성지방",
+    "콜레스테롤": "콜레스테롤",
+    "혈압": "vital sign 혈압",
+    "맥박": "vital sign 맥박",
+    "당뇨": "당뇨병",
+    "경과기록": "입원경과기록"
+}
+
+CASUAL_ENDINGS = {
+    "보여줘": "보여주세요",
+    "알려줘": "알려주세요",
+    "해줘": "해주세요",
+    "줘": "주세요"
+}
+
+QUESTION_ENDINGS = ("주세요", "까요?", "인가요?")
+
+ENHANCED_MEDICAL_TERMS = ["환자이름이", "진료과가", "vital sign", "입원경과기록", "중성지방", "검사명이"]
+
+PATIENT_PATTERN = r"(?P<name>[가-힣]+)\s*환자"
+
+
+class MedicalPromptRewriter:
+    """사전 기반 의료 질의 재작성기 (컴파일된 단일 패턴)"""
+
+    def __init__(self, mappings: Dict[str, str] = MEDICAL_TERM_MAPPINGS):
+        self._targets: Dict[str, Tuple[str, str]] = {}
+        alternatives = []
+
+        # 긴 키워드가 먼저 매칭되도록 정렬, 자기 자신으로의 매핑은 제외
+        for i, original in enumerate(sorted(mappings, key=len, reverse=True)):
+            term = mappings[original]
+            if original == term:
+                continue
+            group = f"m{i}"
+            self._targets[group] = (original, term)
+            alternatives.append(f"(?P<{group}>{self._guarded(original, term)})")
+        alternatives.append(f"(?P<patient>{PATIENT_PATTERN})")
+
+        self._pattern = re.compile("|".join(alternatives))
+        self._ending_lengths = sorted({len(ending) for ending in CASUAL_ENDINGS}, reverse=True)
+        self._terms = re.compile("|".join(re.escape(term) for term in ENHANCED_MEDICAL_TERMS))
+
+    @staticmethod
+    def _guarded(original: str, term: str) -> str:
+        """
+        이미 강화된 표현은 다시 치환하지 않도록 전후방 탐색으로 보호
+
+        예: "당뇨" → "당뇨병" 매핑은 "당뇨(?!병)"으로 컴파일되어 "당뇨병"을 건드리지 않음
+        """
+        escaped = re.escape(original)
+        if original not in term:
+            return escaped
+        start = term.index(original)
+        prefix, suffix = term[:start], term[start + len(original):]
+        if prefix:
+            escaped = f"(?<!{re.escape(prefix)}){escaped}"
+        if suffix:
+            escaped = f"{escaped}(?!{re.escape(suffix)})"
+        return escaped
+
+    def rewrite(self, question: str) -> Dict[str, Any]:
+        """질의 하나를 재작성하고 적용된 강화 사항과 신뢰도를 반환"""
+        enhancements: List[str] = []
+        seen = set()
+
+        def replace(match: "re.Match") -> str:
+            group = match.lastgroup
+            if group == "patient":
+                name = match.group("name")
+                enhancements.append(f"환자명 구조화: {name} 환자 → 환자이름이 {name}인")
+                return f"환자이름이 {name}인"
+
+            original, term = self._targets[group]
+            if group not in seen:
+                seen.add(group)
+                enhancements.append(f"의학용어 강화: {original} → {term}")
+            return term
+
+        enhanced = self._pattern.sub(replace, question)
+
+        # 질문 형태로 변환 (어미 길이별 사전 조회)
+        for length in self._ending_lengths:
+            formal = CASUAL_ENDINGS.get(enhanced[-length:])
+            if formal is not None:
+                casual = enhanced[-length:]
+                enhanced = enhanced[:-length] + formal
+                enhancements.append(f"정중한 질문 형태로 변환: {casual} → {formal}")
+                break
+        else:
+            if not enhanced.endswith(QUESTION_ENDINGS):
+                enhanced = enhanced.rstrip(".") + "을 조회해주세요"
+                enhancements.append("질문 형태로 변환")
+
+        return {
+            "original_question": question,
+            "enhanced_question": enhanced,
+            "enhancements_applied": enhancements,
+            "confidence": 0.6 if enhancements else 0.3
+        }
+
+    def rewrite_many(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """여러 질의를 한 번에 재작성"""
+        rewrite = self.rewrite
+        return [rewrite(question) for question in questions]
+
+    def analyze(self, original: str, enhanced: str) -> Tuple[List[str], float]:
+        """
+        LLM이 강화한 질의의 강화 사항과 신뢰도 계산
+
+        두 텍스트를 각각 한 번씩만 스캔해 의학 용어 포함 여부를 구함
+        """
+        original_terms = set(self._terms.findall(original))
+        enhanced_terms = set(self._terms.findall(enhanced))
+
+        enhancements = []
+        if len(enhanced) > len(original):
+            enhancements.append("질의 구체화")
+        enhancements.extend(
+            f"의학용어 추가: {term}" for term in ENHANCED_MEDICAL_TERMS
+            if term in enhanced_terms and term not in original_terms
+        )
+
+        confidence = 0.5
+        length_ratio = len(enhanced) / len(original) if len(original) > 0 else 1
+        if length_ratio > 1.2:  # 20% 이상 증가
+            confidence += 0.2
+        confidence += min(len(enhanced_terms) * 0.1, 0.3)
+
+        return enhancements, min(confidence, 0.95)  # 최대 0.95
+
+
+# 전역 재작성기 인스턴스
+medical_prompt_rewriter = MedicalPromptRewriter()
@@ -0,0 +1,305 @@
+"""
+Neo4j 지식 그래프 저장소
+압축 그래프의 노드/간선/엔티티 임베딩을 배치 UNWIND 쓰기로 청크 단위 트랜잭션에 적재하고,
+그래프 검색을 벡터 인덱스 조회 + 이웃 확장 Cypher 한 번(왕복 1회)으로 수행해
+대규모 그래프를 API 프로세스 밖(Neo4j)에 둘 수 있도록 함
+"""
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from .compact_graph import CompactGraph
+
+try:
+    import neo4j
+except ImportError:  # 선택 의존성: 없으면 메모리 그래프만 사용
+    neo4j = None
+
+logger = logging.getLogger(__name__)
+
+# 레이블/관계 유형/인덱스 이름은 파라미터로 넘길 수 없어 쿼리에 직접 넣으므로 식별자 형식만 허용
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+ENTITY_PROPERTIES = "{.type, .name, .context, .confidence, .mention_count}"
+
+
+def _identifier(name: str) -> str:
+    if not IDENTIFIER.match(name):
+        raise ValueError(f"Cypher 식별자로 사용할 수 없는 이름: {name!r}")
+    return name
+
+
+def _batches(rows: Sequence[Dict[str, Any]], size: int) -> Iterator[Sequence[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class Neo4jGraphStore:
+    """Neo4j 기반 지식 그래프 저장소 (엔티티 노드 + 관계 유형별 간선 + 벡터 인덱스)"""
+
+    def __init__(self,
+                 url: Optional[str] = None,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None,
+                 database: Optional[str] = None,
+                 label: str = "Entity",
+                 index_name: str = "entity_embedding",
+                 batch_size: Optional[int] = None,
+                 candidate_multiplier: Optional[int] = None,
+                 driver: Any = None):
+        """
+        Args:
+            url: Bolt URL (기본값 NEO4J_URL 설정)
+            username: 사용자명 (기본값 NEO4J_USERNAME 설정)
+            password: 비밀번호 (기본값 NEO4J_PASSWORD 설정)
+            database: 데이터베이스 이름 (기본값 NEO4J_DATABASE 설정, 빈 문자열이면 서버 기본값)
+            label: 엔티티 노드 레이블
+            index_name: 엔티티 임베딩 벡터 인덱스 이름
+            batch_size: UNWIND 배치(트랜잭션)당 행 수 (기본값 NEO4J_BATCH_SIZE 설정)
+            candidate_multiplier: 필터 적용시 벡터 인덱스에서 k의 몇 배를 후보로 가져올지
+            driver: 이미 생성된 드라이버 (지정시 url/username/password 무시)
+        """
+        self.url = url or settings.NEO4J_URL
+        self.username = username or settings.NEO4J_USERNAME
+        self.password = password or settings.NEO4J_PASSWORD
+        self.database = (database if database is not None else settings.NEO4J_DATABASE) or None
+        self.label = _identifier(label)
+        self.index_name = _identifier(index_name)
+        self.batch_size = batch_size or settings.NEO4J_BATCH_SIZE
+        self.candidate_multiplier = candidate_multiplier or settings.NEO4J_CANDIDATE_MULTIPLIER
+        self._driver = driver
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            if neo4j is None:
+                raise RuntimeError("neo4j 드라이버가 설치되지 않음 (pip install neo4j)")
+            self._driver = neo4j.GraphDatabase.driver(self.url, auth=(self.username, self.password))
+        return self._driver
+
+    def _session(self):
+        return self.driver.session(database=self.database)
+
+    def connect(self) -> None:
+        """연결 확인 (실패시 예외)"""
+        self.driver.verify_connectivity()
+
+    def close(self) -> None:
+        if self._driver is not None:
+            self._driver.close()
+            self._driver = None
+
+    # ------------------------------------------------------------------
+    # 스키마
+    # ------------------------------------------------------------------
+
+    def ensure_schema(self, dim: int) -> None:
+        """엔티티 ID 유일성 제약과 코사인 벡터 인덱스 생성 (이미 있으면 유지)"""
+        statements = [
+            f"CREATE CONSTRAINT {self.label.lower()}_id IF NOT EXISTS "
+            f"FOR (e:{self.label}) REQUIRE e.id IS UNIQUE",
+            f"CREATE VECTOR INDEX {self.index_name} IF NOT EXISTS "
+            f"FOR (e:{self.label}) ON (e.embedding) "
+            f"OPTIONS {{indexConfig: {{`vector.dimensions`: {int(dim)}, `vector.similarity_function`: 'cosine'}}}}",
+        ]
+        with self._session() as session:
+            for statement in statements:
+                session.run(statement).consume()
+
+    # ------------------------------------------------------------------
+    # 배치 쓰기
+    # ------------------------------------------------------------------
+
+    def _write_batches(self, query: str, rows: Sequence[Dict[str, Any]]) -> int:
+        """rows를 batch_size개씩 나누어 배치마다 별도 쓰기 트랜잭션으로 UNWIND 실행"""
+        with self._session() as session:
+            for batch in _batches(rows, self.batch_size):
+                session.execute_write(lambda tx, batch=batch: tx.run(query, rows=list(batch)).consume())
+        return len(rows)
+
+    def write_graph(self,
+                    graph: CompactGraph,
+                    embeddings: np.ndarray,
+                    nodes: Optional[Iterable[int]] = None,
+                    replace_edges: bool = False) -> Dict[str, int]:
+        """
+        압축 그래프를 Neo4j에 적재 (MERGE라서 반복 적재해도 중복 없이 속성만 갱신)
+
+        Args:
+            graph: 압축 그래프
+            embeddings: nodes 순서에 맞춘 (노드 수, dim) 임베딩 행렬
+            nodes: 적재할 노드 번호 (None이면 전체), 이 노드들에서 나가는 간선도 함께 적재
+            replace_edges: 적재 전 nodes에서 나가는 기존 간선을 삭제 (문서 제거로 사라진 관계 반영)
+
+        Returns:
+            적재한 노드/간선 수
+        """
+        nodes = list(range(graph.number_of_nodes())) if nodes is None else list(nodes)
+        node_rows = [
+            {"id": graph.key(node), **graph.node(node), "embedding": embedding}
+            for node, embedding in zip(nodes, np.asarray(embeddings, dtype=np.float32).tolist())
+        ]
+        written_nodes = self._write_batches(
+            f"UNWIND $rows AS row "
+            f"MERGE (e:{self.label} {{id: row.id}}) "
+            f"SET e.type = row.type, e.name = row.name, e.context = row.context, "
+            f"e.confidence = row.confidence, e.mention_count = row.mention_count, e.embedding = row.embedding",
+            node_rows
+        )
+
+        if replace_edges:
+            self._write_batches(
+                f"UNWIND $rows AS row MATCH (:{self.label} {{id: row.id}})-[r]->(:{self.label}) DELETE r",
+                [{"id": row["id"]} for row in node_rows]
+            )
+
+        # 관계 유형은 파라미터로 넘길 수 없으므로 유형별로 나누어 적재
+        edge_rows: Dict[str, List[Dict[str, Any]]] = {}
+        for node in nodes:
+            source = graph.key(node)
+            for edge in range(int(graph.indptr[node]), int(graph.indptr[node + 1])):
+                attributes = graph.edge(edge)
+                edge_rows.setdefault(attributes["type"], []).append({
+                    "source": source,
+                    "target": graph.key(int(graph.indices[edge])),
+                    "confidence": attributes["confidence"],
+                    "count": attributes["count"]
+                })
+        written_edges = 0
+        for relation, rows in edge_rows.items():
+            written_edges += self._write_batches(
+                f"UNWIND $rows AS row "
+                f"MATCH (s:{self.label} {{id: row.source}}) "
+                f"MATCH (t:{self.label} {{id: row.target}}) "
+                f"MERGE (s)-[r:{_identifier(relation)}]->(t) "
+                f"SET r.confidence = row.confidence, r.count = row.count",
+                rows
+            )
+
+        logger.info(f"Neo4j 그래프 적재: {written_nodes}개 노드, {written_edges}개 관계")
+        return {"nodes": written_nodes, "edges": written_edges}
+
+    def delete_entities(self, entity_ids: Sequence[str]) -> int:
+        """엔티티 노드와 연결된 관계를 배치 단위로 삭제"""
+        return self._write_batches(
+            f"UNWIND $rows AS row MATCH (e:{self.label} {{id: row.id}}) DETACH DELETE e",
+            [{"id": entity_id} for entity_id in entity_ids]
+        )
+
+    def clear(self) -> int:
+        """엔티티 노드와 관계를 배치 단위로 삭제"""
+        query = f"MATCH (e:{self.label}) WITH e LIMIT $limit DETACH DELETE e RETURN count(*) AS deleted"
+        deleted = 0
+        with self._session() as session:
+            while True:
+                count = session.execute_write(
+                    lambda tx: tx.run(query, limit=self.batch_size).single()["deleted"]
+                )
+                deleted += count
+                if count == 0:
+                    return deleted
+
+    def set_revision(self, revision: str) -> None:
+        """저장된 그래프의 리비전 기록 (메모리 그래프와 같은 내용인지 확인용, 엔티티 레이블과 별도 노드)"""
+        with self._session() as session:
+            session.execute_write(lambda tx: tx.run(
+                "MERGE (m:GraphRevision {label: $label}) SET m.revision = $revision",
+                label=self.label, revision=revision
+            ).consume())
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def revision(self) -> Optional[str]:
+        """set_revision으로 기록한 리비전 (기록이 없으면 None)"""
+        with self._session() as session:
+            record = session.execute_read(lambda tx: tx.run(
+                "MATCH (m:GraphRevision {label: $label}) RETURN m.revision AS revision", label=self.label
+            ).single())
+        return None if record is None else record["revision"]
+
+    def search(self,
+               query_embedding: Sequence[float],
+               k: int,
+               neighbor_limit: int = 3,
+               types: Optional[Sequence[str]] = None,
+               min_confidence: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        벡터 인덱스 상위 k개 엔티티와 엔티티별 이웃을 Cypher 한 번으로 조회
+
+        이웃은 이웃별로 가장 많이 언급된 관계 하나씩, 언급 횟수/신뢰도 순으로 neighbor_limit개
+        (메모리 그래프의 graph_search와 같은 결과 형식)
+        벡터 인덱스는 필터를 먼저 적용하지 않으므로 types/min_confidence 지정시 후보를 k의 candidate_multiplier배
+        가져와 거르고, 통과한 엔티티가 k개 미만이면 인덱스를 다 훑을 때까지 후보 수를 두 배씩 늘려 다시 조회
+
+        Args:
+            query_embedding: 질의 임베딩
+            k: 결과 엔티티 수
+            neighbor_limit: 엔티티당 이웃 수
+            types: 허용 엔티티 유형 (None이면 전체)
+            min_confidence: 최소 신뢰도 (초과)
+        """
+        # 필터를 통과한 후보가 없어도 훑은 후보 수(scanned)를 돌려받도록 빈 목록은 null 한 행으로 펼침
+        query = (
+            f"CALL db.index.vector.queryNodes($index, $candidates, $embedding) YIELD node, score "
+            f"WITH count(node) AS scanned, collect(CASE WHEN ($types IS NULL OR node.type IN $types) "
+            f"AND ($min_confidence IS NULL OR node.confidence > $min_confidence) "
+            f"THEN {{node: node, score: score}} END)[..$k] AS hits "
+            f"UNWIND CASE WHEN hits = [] THEN [null] ELSE hits END AS hit "
+            f"WITH scanned, hit.node AS node, hit.score AS score "
+            f"CALL {{ "
+            f"  WITH node "
+            f"  MATCH (node)-[r]->(neighbor:{self.label}) "
+            f"  WITH neighbor, r ORDER BY r.count DESC, r.confidence DESC "
+            f"  WITH neighbor, head(collect(r)) AS r "
+            f"  ORDER BY r.count DESC, r.confidence DESC, neighbor.id "
+            f"  LIMIT $neighbor_limit "
+            f"  RETURN collect({{entity: neighbor {ENTITY_PROPERTIES}, "
+            f"relation: {{type: type(r), confidence: r.confidence, count: r.count}}}}) AS neighbors "
+            f"}} "
+            f"RETURN scanned, node.id AS entity_id, node {ENTITY_PROPERTIES} AS entity, score, neighbors "
+            f"ORDER BY score DESC"
+        )
+        filtered = types is not None or min_confidence is not None
+        parameters = {
+            "index": self.index_name,
+            "candidates": k * self.candidate_multiplier if filtered else k,
+            "embedding": [float(value) for value in query_embedding],
+            "types": list(types) if types is not None else None,
+            "min_confidence": min_confidence,
+            "k": k,
+            "neighbor_limit": neighbor_limit,
+        }
+        with self._session() as session:
+            while True:
+                records = session.execute_read(lambda tx: tx.run(query, **parameters).data())
+                scanned = records[0]["scanned"] if records else 0
+                records = [record for record in records if record["entity_id"] is not None]
+                if len(records) >= k or scanned < parameters["candidates"]:
+                    break
+                parameters["candidates"] *= 2
+
+        # Neo4j 코사인 점수는 (1 + cos) / 2로 정규화되어 있으므로 코사인 유사도로 되돌림
+        return [
+            {
+                "entity": record["entity"],
+                "similarity": 2 * record["score"] - 1,
+                "neighbors": record["neighbors"],
+                "entity_id": record["entity_id"]
+            }
+            for record in records
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        """엔티티 노드/관계 수"""
+        with self._session() as session:
+            record = session.execute_read(lambda tx: tx.run(
+                f"MATCH (e:{self.label}) "
+                f"OPTIONAL MATCH (e)-[r]->(:{self.label}) "
+                f"RETURN count(DISTINCT e) AS nodes, count(r) AS edges"
+            ).single())
+        return {"nodes": record["nodes"], "edges": record["edges"]}
@@ -0,0 +1,211 @@
+"""
+Text2SQL 질의 이력 저장소
+최근 이력은 고정 크기 링 버퍼에 두고, 전체 이력은 DuckDB 테이블에 배치로 기록
+"""
+import asyncio
+import itertools
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import duckdb
+
+from ..core.config import settings
+
+HISTORY_TABLE = "text2sql_query_history"
+HISTORY_COLUMNS = ["id", "question", "sql", "explanation", "confidence", "timestamp"]
+
+
+class QueryHistoryStore:
+    """링 버퍼 + DuckDB 영속화 기반 질의 이력 저장소"""
+
+    def __init__(self,
+                 db_path: str = ":memory:",
+                 buffer_size: int = 500,
+                 batch_size: int = 50,
+                 flush_interval: float = 2.0):
+        """
+        Args:
+            db_path: DuckDB 파일 경로 (":memory:"이면 프로세스 종료시 소멸)
+            buffer_size: 메모리에 유지할 최근 이력 수
+            batch_size: 한 번에 기록할 이력 수 (도달시 즉시 flush)
+            flush_interval: 배치가 차지 않았을 때 flush까지 대기 시간(초)
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._conn = duckdb.connect(db_path)
+        self._lock = threading.Lock()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self._initialize_schema()
+        self._warm_buffer()
+
+    def _initialize_schema(self):
+        """이력 테이블 및 인덱스 생성"""
+        with self._lock:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {HISTORY_TABLE} (
+                    id VARCHAR PRIMARY KEY,
+                    question VARCHAR NOT NULL,
+                    sql VARCHAR,
+                    explanation VARCHAR,
+                    confidence DOUBLE,
+                    timestamp TIMESTAMP NOT NULL
+                )
+            """)
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{HISTORY_TABLE}_timestamp ON {HISTORY_TABLE}(timestamp)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{HISTORY_TABLE}_question ON {HISTORY_TABLE}(question)"
+            )
+
+    def _warm_buffer(self):
+        """재시작시 최근 이력을 링 버퍼로 적재"""
+        rows = self._select(
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM {HISTORY_TABLE} ORDER BY timestamp DESC LIMIT ?",
+            [self._recent.maxlen]
+        )
+        self._recent.extend(reversed(rows))
+
+    async def add(self, record: Dict[str, Any]):
+        """이력 추가 (배치가 차면 즉시, 아니면 flush_interval 후 기록)"""
+        self._recent.append(record)
+        self._pending.append(record)
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_interval, self._schedule_flush)
+
+    def _schedule_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        """대기 중인 이력을 테이블에 기록"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        rows = [
+            (
+                record["id"],
+                record["question"],
+                record.get("sql"),
+                record.get("explanation"),
+                record.get("confidence"),
+                datetime.fromisoformat(record["timestamp"]),
+            )
+            for record in batch
+        ]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {HISTORY_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    async def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """최근 이력 조회 (최신순)"""
+        if limit <= len(self._recent):
+            return list(itertools.islice(reversed(self._recent), limit))
+
+        await self.flush()
+        return await asyncio.to_thread(
+            self._select,
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM {HISTORY_TABLE} ORDER BY timestamp DESC LIMIT ?",
+            [limit]
+        )
+
+    async def search(self,
+                     query: str,
+                     limit: int = 20,
+                     mode: str = "prefix") -> List[Dict[str, Any]]:
+        """
+        질문 텍스트 검색
+
+        Args:
+            query: 검색어
+            limit: 최대 반환 수
+            mode: prefix (질문 앞부분 일치) 또는 fulltext (모든 단어 포함), 두 방식 모두 대소문자 무시
+        """
+        await self.flush()
+
+        if mode == "prefix":
+            conditions = ["question ILIKE ? ESCAPE '\\'"]
+            params: List[Any] = [self._escape_like(query.strip()) + "%"]
+        elif mode == "fulltext":
+            terms = query.split()
+            conditions = ["question ILIKE ? ESCAPE '\\'" for _ in terms] or ["TRUE"]
+            params = [f"%{self._escape_like(term)}%" for term in terms]
+        else:
+            raise ValueError(f"지원되지 않는 검색 모드: {mode}")
+
+        sql = (
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM {HISTORY_TABLE} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY timestamp DESC LIMIT ?"
+        )
+        return await asyncio.to_thread(self._select, sql, params + [limit])
+
+    def _select(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {**dict(zip(HISTORY_COLUMNS, row)), "timestamp": row[5].isoformat()}
+            for row in rows
+        ]
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    def close(self):
+        """남은 이력을 기록하고 연결 종료"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._write_batch(batch)
+        with self._lock:
+            self._conn.close()
+
+
+_query_history_store: Optional[QueryHistoryStore] = None
+
+
+def get_query_history_store() -> QueryHistoryStore:
+    """프로세스 전역 이력 저장소 반환 (최초 호출시 생성)"""
+    global _query_history_store
+    if _query_history_store is None:
+        _query_history_store = QueryHistoryStore(
+            db_path=settings.QUERY_HISTORY_DB_PATH,
+            buffer_size=settings.QUERY_HISTORY_BUFFER_SIZE,
+            batch_size=settings.QUERY_HISTORY_BATCH_SIZE,
+            flush_interval=settings.QUERY_HISTORY_FLUSH_INTERVAL
+        )
+    return _query_history_store
+
+
+def close_query_history_store():
+    """프로세스 종료시 이력 저장소 정리"""
+    global _query_history_store
+    if _query_history_store is not None:
+        _query_history_store.close()
+        _query_history_store = None
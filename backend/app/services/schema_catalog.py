@@ -0,0 +1,217 @@
+"""
+Text2SQL 스키마 카탈로그
+DuckDB information_schema를 한 번 조회해 컬럼 타입/샘플값/카디널리티를 캐시하고,
+스키마 fingerprint가 바뀌면 무효화되며 토큰 예산에 맞춘 프롬프트 조각을 생성
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import duckdb
+
+SAMPLE_VALUE_LIMIT = 6
+SAMPLE_MAX_CARDINALITY = 30
+SAMPLE_MAX_LENGTH = 30
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (ASCII는 4자당 1토큰, 한글 등은 1자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def is_select_query(conn: "duckdb.DuckDBPyConnection", sql: str) -> bool:
+    """
+    단일 조회(SELECT/WITH) 문장인지 DuckDB 파서로 확인
+
+    json_serialize_sql은 SELECT가 아닌 문장이 하나라도 있으면 오류를 반환하므로
+    "SELECT 1; DROP TABLE t"나 WITH ... DELETE처럼 앞부분만 조회인 문장도 걸러짐
+    (DuckDB 0.9는 상수 인자만 받으므로 파라미터 대신 문자열 리터럴로 전달)
+    """
+    literal = "'" + sql.replace("'", "''") + "'"
+    parsed = json.loads(conn.execute(f"SELECT json_serialize_sql({literal})").fetchone()[0])
+    return not parsed.get("error") and len(parsed.get("statements", [])) == 1
+
+
+class SchemaCatalog:
+    """라이브 웨어하우스 스키마 캐시"""
+
+    def __init__(self,
+                 connect: Callable[[], "duckdb.DuckDBPyConnection"],
+                 annotations: Optional[List[Dict[str, Any]]] = None,
+                 sample_exclude: Optional[Set[str]] = None,
+                 check_interval: float = 30.0):
+        """
+        Args:
+            connect: 웨어하우스 커넥션(커서) 생성 함수
+            annotations: 테이블/컬럼 설명 [{"name", "description", "columns": [{"name", "description"}]}]
+            sample_exclude: 샘플값을 노출하지 않을 컬럼명 (개인정보, 자유 텍스트 등)
+            check_interval: DDL 변경 여부(fingerprint)를 재확인하는 최소 간격(초)
+        """
+        self._connect = connect
+        self._annotations = {table["name"]: table for table in (annotations or [])}
+        self._sample_exclude = sample_exclude or set()
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._tables: Optional[List[Dict[str, Any]]] = None
+        self._fingerprint: Optional[str] = None
+        self._checked_at = 0.0
+        self.version = 0
+        self.refreshed_at: Optional[str] = None
+        self._description: Optional[Dict[str, Any]] = None
+
+    def invalidate(self):
+        """캐시 무효화 (다음 조회시 재수집)"""
+        with self._lock:
+            self._tables = None
+
+    def tables(self) -> List[Dict[str, Any]]:
+        """캐시된 테이블 메타데이터 반환 (필요시 재수집)"""
+        with self._lock:
+            now = time.monotonic()
+            if self._tables is not None and now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                if self._read_fingerprint() != self._fingerprint:
+                    self._tables = None
+
+            if self._tables is None:
+                self._introspect()
+                self._checked_at = now
+            return self._tables
+
+    def _read_fingerprint(self, conn=None) -> str:
+        owned = conn is None
+        conn = conn or self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = 'main'
+                ORDER BY table_name, ordinal_position
+            """).fetchall()
+        finally:
+            if owned:
+                conn.close()
+        return hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()
+
+    def _introspect(self):
+        conn = self._connect()
+        try:
+            columns_by_table: Dict[str, List[tuple]] = {}
+            for table_name, column_name, data_type in conn.execute("""
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = 'main'
+                ORDER BY table_name, ordinal_position
+            """).fetchall():
+                columns_by_table.setdefault(table_name, []).append((column_name, data_type))
+
+            tables = []
+            for table_name, columns in columns_by_table.items():
+                tables.append(self._describe_table(conn, table_name, columns))
+
+            self._fingerprint = self._read_fingerprint(conn)
+        finally:
+            conn.close()
+
+        # 설명(annotations)에 정의된 순서를 우선하고 나머지는 이름순
+        order = {name: i for i, name in enumerate(self._annotations)}
+        tables.sort(key=lambda t: (order.get(t["name"], len(order)), t["name"]))
+
+        self._tables = tables
+        self.version += 1
+        self.refreshed_at = datetime.now().isoformat()
+
+    def _describe_table(self, conn, table_name: str, columns: List[tuple]) -> Dict[str, Any]:
+        quoted = [f'"{name}"' for name, _ in columns]
+        stats = conn.execute(
+            f'SELECT COUNT(*), {", ".join(f"approx_count_distinct({c})" for c in quoted)} FROM "{table_name}"'
+        ).fetchone()
+        row_count, cardinalities = stats[0], stats[1:]
+
+        annotation = self._annotations.get(table_name, {})
+        column_notes = {c["name"]: c.get("description", "") for c in annotation.get("columns", [])}
+
+        described = []
+        for (column_name, data_type), cardinality in zip(columns, cardinalities):
+            samples: List[str] = []
+            if (data_type == "VARCHAR" and cardinality <= SAMPLE_MAX_CARDINALITY
+                    and column_name not in self._sample_exclude):
+                samples = [
+                    str(value) for (value,) in conn.execute(
+                        f'SELECT "{column_name}" FROM "{table_name}" WHERE "{column_name}" IS NOT NULL '
+                        f'GROUP BY 1 ORDER BY COUNT(*) DESC, 1 LIMIT {SAMPLE_VALUE_LIMIT}'
+                    ).fetchall()
+                    if len(str(value)) <= SAMPLE_MAX_LENGTH
+                ]
+            described.append({
+                "name": column_name,
+                "type": data_type,
+                "description": column_notes.get(column_name, ""),
+                "cardinality": int(cardinality),
+                "sample_values": samples
+            })
+
+        return {
+            "name": table_name,
+            "description": annotation.get("description", ""),
+            "row_count": int(row_count),
+            "columns": described
+        }
+
+    def render(self,
+               tables: Optional[List[Dict[str, Any]]] = None,
+               token_budget: Optional[int] = None) -> str:
+        """
+        프롬프트용 스키마 텍스트 생성
+
+        예산을 넘으면 샘플값 → 설명 순으로 생략하고, 그래도 넘으면 뒤쪽 테이블부터 제외
+        """
+        tables = self.tables() if tables is None else tables
+        text = ""
+        for detail in (2, 1, 0):
+            text = "\n".join(self._render_table(table, detail) for table in tables)
+            if token_budget is None or estimate_tokens(text) <= token_budget:
+                return text
+
+        kept: List[str] = []
+        used = 0
+        for table in tables:
+            block = self._render_table(table, 0)
+            cost = estimate_tokens(block) + 1
+            if kept and used + cost > token_budget:
+                break
+            kept.append(block)
+            used += cost
+        return "\n".join(kept)
+
+    @staticmethod
+    def _render_table(table: Dict[str, Any], detail: int) -> str:
+        header = table["name"]
+        if detail >= 1 and table.get("description"):
+            header += f" ({table['description']})"
+        lines = [header]
+        for column in table["columns"]:
+            line = f"  - {column['name']} {column.get('type', '')}".rstrip()
+            if detail >= 1 and column.get("description"):
+                line += f": {column['description']}"
+            if detail >= 2 and column.get("sample_values"):
+                line += f" e.g. {', '.join(column['sample_values'])}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def describe(self) -> Dict[str, Any]:
+        """API 응답용 스키마 설명 (카탈로그 버전이 바뀔 때만 재생성)"""
+        tables = self.tables()
+        if self._description is None or self._description["catalog_version"] != self.version:
+            self._description = {
+                "catalog_version": self.version,
+                "refreshed_at": self.refreshed_at,
+                "total_records": sum(table["row_count"] for table in tables),
+                "tables": tables
+            }
+        return self._description
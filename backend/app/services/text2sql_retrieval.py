@@ -0,0 +1,201 @@
+"""
+Text2SQL 프롬프트 검색 단계
+과거 성공 질의(few-shot 예시)와 질문에 관련된 스키마 조각만 골라 프롬프트를 축소
+"""
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+VECTOR_DIM = 1024
+_NON_WORD = re.compile(r"[^0-9a-z가-힣_]+")
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+([a-z_][a-z0-9_]*)", re.IGNORECASE)
+
+
+def ngram_vector(text: str, dim: int = VECTOR_DIM) -> np.ndarray:
+    """
+    문자 2-3gram 해시 벡터 (L2 정규화)
+
+    한국어는 조사가 붙어 단어 단위 매칭이 어렵기 때문에 문자 n-gram을 사용하고,
+    모델 로딩 없이 마이크로초 단위로 계산되도록 해싱 트릭을 적용
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in _NON_WORD.sub(" ", text.lower()).split():
+        padded = f" {token} "
+        for n in (2, 3):
+            for i in range(len(padded) - n + 1):
+                vector[zlib.crc32(padded[i:i + n].encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def referenced_tables(sql: str) -> List[str]:
+    """SQL의 FROM/JOIN 절에서 테이블명 추출"""
+    return [name.lower() for name in _TABLE_REF.findall(sql)]
+
+
+class FewShotRetriever:
+    """과거 성공 (질문, SQL) 쌍에서 최근접 예시 검색"""
+
+    def __init__(self, max_examples: int = 2000):
+        self.max_examples = max_examples
+        self._slots: List[Tuple[str, str, str]] = []  # (key, question, sql)
+        self._keys: Dict[str, int] = {}
+        self._matrix = np.zeros((16, VECTOR_DIM), dtype=np.float32)
+        self._cursor = 0  # 가득 찼을 때 다음으로 덮어쓸 슬롯
+        self._lock = threading.Lock()
+        self.seeded = False
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, question: str, sql: str):
+        """예시 추가 (같은 질문은 최신 SQL로 갱신, 가득 차면 가장 오래된 슬롯을 덮어씀)"""
+        key = " ".join(question.split())
+        vector = ngram_vector(key)
+        with self._lock:
+            if key in self._keys:
+                self._slots[self._keys[key]] = (key, question, sql)
+                return
+
+            if len(self._slots) < self.max_examples:
+                slot = len(self._slots)
+                if slot == len(self._matrix):
+                    grown = np.zeros((min(slot * 2, self.max_examples), VECTOR_DIM), dtype=np.float32)
+                    grown[:slot] = self._matrix
+                    self._matrix = grown
+                self._slots.append((key, question, sql))
+            else:
+                slot = self._cursor
+                self._cursor = (self._cursor + 1) % self.max_examples
+                del self._keys[self._slots[slot][0]]
+                self._slots[slot] = (key, question, sql)
+
+            self._keys[key] = slot
+            self._matrix[slot] = vector
+
+    def top_k(self, question: str, k: int = 3, min_score: float = 0.2) -> List[Dict[str, Any]]:
+        """질문과 가장 유사한 예시 k개"""
+        with self._lock:
+            if not self._slots or k <= 0:
+                return []
+            scores = self._matrix[:len(self._slots)] @ ngram_vector(question)
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            ranked = top[np.argsort(-scores[top])]
+            return [
+                {"question": self._slots[i][1], "sql": self._slots[i][2], "score": float(scores[i])}
+                for i in ranked if scores[i] >= min_score
+            ]
+
+
+class SchemaLinker:
+    """테이블/컬럼 설명 인덱스로 질문에 관련된 스키마 조각 선택"""
+
+    def __init__(self, schema: List[Dict[str, Any]]):
+        """
+        Args:
+            schema: [{"name", "description", "columns": [{"name", "description", "sample_values"?}]}]
+        """
+        self.schema = schema
+        self._tables = {table["name"]: table for table in schema}
+        self._table_vectors = np.stack([
+            ngram_vector(f"{t['name']} {t.get('description', '')}") for t in schema
+        ]) if schema else np.zeros((0, VECTOR_DIM), dtype=np.float32)
+
+        # 키 컬럼은 항상 포함되므로 인덱싱하지 않음 ("환자 키" 등이 모든 테이블과 매칭되는 것 방지)
+        self._columns: List[Tuple[str, Dict[str, Any]]] = [
+            (table["name"], column) for table in schema for column in table["columns"]
+            if not column["name"].endswith("_key")
+        ]
+        self._column_vectors = np.stack([
+            ngram_vector(" ".join([column["name"], column.get("description", "")]
+                                  + column.get("sample_values", [])))
+            for _, column in self._columns
+        ]) if self._columns else np.zeros((0, VECTOR_DIM), dtype=np.float32)
+
+    def link(self,
+             question: str,
+             max_tables: int = 4,
+             min_score: float = 0.15,
+             column_min_score: float = 0.1,
+             required_tables: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        질문에 관련된 테이블과 컬럼만 남긴 스키마 반환
+
+        Args:
+            question: 사용자 질문
+            max_tables: 최대 테이블 수 (required_tables 제외)
+            min_score: 테이블 선택 임계값
+            column_min_score: 선택된 테이블 안에서 컬럼을 남길 임계값
+            required_tables: 항상 포함할 테이블 (few-shot 예시가 참조하는 테이블 등)
+
+        키 컬럼(*_key)은 조인을 위해 항상 포함하며, 아무것도 연결되지 않으면 전체 스키마를 반환
+        """
+        query = ngram_vector(question)
+        table_scores = dict(zip(self._tables, (self._table_vectors @ query).tolist()))
+        column_scores = (self._column_vectors @ query).tolist()
+
+        matched_columns: Dict[str, set] = {}
+        for (table_name, column), score in zip(self._columns, column_scores):
+            if score >= column_min_score:
+                matched_columns.setdefault(table_name, set()).add(column["name"])
+            table_scores[table_name] = max(table_scores[table_name], score)
+
+        selected = [name for name in (required_tables or []) if name in self._tables]
+        ranked = sorted(table_scores, key=table_scores.get, reverse=True)
+        budget = len(selected) + max_tables
+        for name in ranked:
+            if len(selected) >= budget:
+                break
+            if table_scores[name] >= min_score and name not in selected:
+                selected.append(name)
+
+        if not selected:
+            return self.schema
+
+        bridge = self._bridge_table(selected)
+        if bridge:
+            selected.append(bridge)
+
+        fragments = []
+        for name in selected:
+            table = self._tables[name]
+            matched = matched_columns.get(name, set())
+            columns = [
+                column for column in table["columns"]
+                if column["name"] in matched or column["name"].endswith("_key")
+            ]
+            fragments.append({**table, "columns": columns})
+        return fragments
+
+    def _bridge_table(self, selected: List[str]) -> Optional[str]:
+        """선택된 테이블들을 조인할 수 있는 테이블이 없으면 키를 가장 많이 공유하는 테이블 반환"""
+        if len(selected) < 2:
+            return None
+
+        def keys(name: str) -> set:
+            return {c["name"] for c in self._tables[name]["columns"] if c["name"].endswith("_key")}
+
+        primary_keys = {
+            next((c["name"] for c in self._tables[name]["columns"] if c["name"].endswith("_key")), None)
+            for name in selected
+        } - {None}
+        if any(primary_keys <= keys(name) for name in selected):
+            return None
+
+        candidates = [
+            (len(primary_keys & keys(name)), -len(self._tables[name]["columns"]), name)
+            for name in self._tables if name not in selected
+        ]
+        best = max(candidates, default=None)
+        return best[2] if best and best[0] >= 2 else None
+
+
+def render_examples(examples: List[Dict[str, Any]]) -> str:
+    """few-shot 예시를 프롬프트용 텍스트로 변환"""
+    return "\n\n".join(
+        f"Question: {example['question']}\nSQL: {example['sql'].strip()}" for example in examples
+    )
@@ -1,15 +1,190 @@
-from typing import Optional, Dict, Any, List
-from app.core.config import settings
+from typing import Optional, Dict, Any, List, AsyncIterator
+from ..core.config import settings
+from .medical_prompt_rewriter import medical_prompt_rewriter
+from .query_history_store import get_query_history_store
+from .schema_catalog import SchemaCatalog, is_select_query
+from .text2sql_retrieval import (
+    FewShotRetriever, SchemaLinker, referenced_tables, render_examples
+)
+import asyncio
 import duckdb
+import threading
 import time
 import uuid
 from datetime import datetime
 
+FEW_SHOT_EXAMPLES = 3
+FEW_SHOT_MIN_CONFIDENCE = 0.7
+LLM_SQL_CONFIDENCE = 0.85
+INVALID_SQL_CONFIDENCE = 0.3
+SCHEMA_PROMPT_TOKEN_BUDGET = 800
+
+HOSPITAL_SCHEMA = [
+    {
+        "name": "dim_patient",
+        "description": "환자 차원",
+        "columns": [
+            {"name": "patient_key", "description": "환자 고유 키"},
+            {"name": "patient_name", "description": "환자 이름"},
+            {"name": "age_group", "description": "연령대 (20대, 30대, etc.)"},
+            {"name": "gender", "description": "성별 (남, 여)"},
+            {"name": "region", "description": "지역"}
+        ]
+    },
+    {
+        "name": "dim_department",
+        "description": "진료과 차원",
+        "columns": [
+            {"name": "dept_key", "description": "진료과 키"},
+            {"name": "dept_name", "description": "진료과명"},
+            {"name": "dept_category", "description": "진료과 분류"}
+        ]
+    },
+    {
+        "name": "dim_diagnosis",
+        "description": "진단 차원",
+        "columns": [
+            {"name": "diagnosis_key", "description": "진단 고유 키"},
+            {"name": "kcd_code", "description": "KCD 질병 코드"},
+            {"name": "diagnosis_name", "description": "진단명"},
+            {"name": "category", "description": "질병 분류"}
+        ]
+    },
+    {
+        "name": "fact_visit",
+        "description": "진료 사실 (방문, 입원, 외래, 응급실)",
+        "columns": [
+            {"name": "visit_key", "description": "방문 고유 키"},
+            {"name": "patient_key", "description": "환자 키 (FK to dim_patient)"},
+            {"name": "diagnosis_key", "description": "진단 키 (FK to dim_diagnosis)"},
+            {"name": "dept_key", "description": "진료과 키 (FK to dim_department)"},
+            {"name": "visit_date", "description": "방문 날짜"},
+            {"name": "visit_count", "description": "방문 횟수"},
+            {"name": "duration_days", "description": "입원 일수"},
+            {"name": "total_cost", "description": "진료비"},
+            {"name": "visit_type", "description": "진료 유형 (입원, 외래, 응급실)"}
+        ]
+    },
+    {
+        "name": "fact_lab_test",
+        "description": "검사 결과",
+        "columns": [
+            {"name": "test_key", "description": "검사 키"},
+            {"name": "patient_key", "description": "환자 키"},
+            {"name": "visit_key", "description": "방문 키"},
+            {"name": "test_name", "description": "검사명"},
+            {"name": "test_date", "description": "검사 날짜"},
+            {"name": "test_value", "description": "검사 수치"},
+            {"name": "unit", "description": "단위"},
+            {"name": "reference_range", "description": "참조 범위"}
+        ]
+    },
+    {
+        "name": "fact_vital_signs",
+        "description": "생체 징후 (vital sign)",
+        "columns": [
+            {"name": "vital_key", "description": "생체징후 키"},
+            {"name": "patient_key", "description": "환자 키"},
+            {"name": "visit_key", "description": "방문 키"},
+            {"name": "measurement_time", "description": "측정 시간"},
+            {"name": "vital_type", "description": "생체징후 종류 (수축기혈압, 이완기혈압, 맥박, 체온)"},
+            {"name": "vital_value", "description": "측정값"},
+            {"name": "unit", "description": "단위"}
+        ]
+    },
+    {
+        "name": "fact_medical_record",
+        "description": "의료기록 (경과기록)",
+        "columns": [
+            {"name": "record_key", "description": "기록 키"},
+            {"name": "patient_key", "description": "환자 키"},
+            {"name": "visit_key", "description": "방문 키"},
+            {"name": "dept_key", "description": "진료과 키"},
+            {"name": "record_type", "description": "기록 유형 (입원경과기록, 외래경과기록, 퇴원요약)"},
+            {"name": "record_date", "description": "기록 날짜"},
+            {"name": "record_content", "description": "기록 내용"}
+        ]
+    },
+    {
+        "name": "fact_prescription",
+        "description": "처방 (약물)",
+        "columns": [
+            {"name": "prescription_key", "description": "처방 키"},
+            {"name": "patient_key", "description": "환자 키"},
+            {"name": "visit_key", "description": "방문 키"},
+            {"name": "medication_name", "description": "약물명"},
+            {"name": "medication_category", "description": "약물 분류"},
+            {"name": "dosage", "description": "용량"},
+            {"name": "unit", "description": "단위"},
+            {"name": "frequency_per_day", "description": "일일 복용 횟수"},
+            {"name": "duration_days", "description": "처방 일수"},
+            {"name": "start_date", "description": "처방 시작일"},
+            {"name": "end_date", "description": "처방 종료일"}
+        ]
+    }
+]
+
+SCHEMA_NOTES = """Notes:
+- 환자 예시: 홍길동 (당뇨병, 내분비내과), 김철수 (심장질환, 심장내과), 김영희 (고혈압, 심장내과)
+- 시점: 2025년 11월이 현재 달 (오늘: 2025-11-17)
+- KCD codes: E11 당뇨병, I10 고혈압, E78 고지혈증, C% 암, J% 호흡기 질환"""
+
+_few_shot_retriever = FewShotRetriever()
+_schema_linker: Optional[SchemaLinker] = None
+_schema_linker_version = -1
+_schema_catalog: Optional[SchemaCatalog] = None
+_warehouse = None
+_warehouse_lock = threading.Lock()
+
+
+def get_warehouse():
+    """
+    Process-wide DuckDB warehouse connection (sample tables are created once)
+
+    Shared by every request, so queries must go through is_select_query before execution
+    """
+    global _warehouse
+    with _warehouse_lock:
+        if _warehouse is None:
+            conn = duckdb.connect(':memory:')
+            Text2SQLService._create_sample_tables(conn)
+            _warehouse = conn
+    return _warehouse
+
+
+def get_schema_catalog() -> SchemaCatalog:
+    """Process-wide schema catalog introspected from the warehouse"""
+    global _schema_catalog
+    if _schema_catalog is None:
+        _schema_catalog = SchemaCatalog(
+            connect=lambda: get_warehouse().cursor(),
+            annotations=HOSPITAL_SCHEMA,
+            sample_exclude={"patient_name", "record_content"}
+        )
+    return _schema_catalog
+
+
+def get_few_shot_retriever() -> FewShotRetriever:
+    """Process-wide few-shot example index (seeded lazily from query history)"""
+    return _few_shot_retriever
+
+
+def get_schema_linker() -> SchemaLinker:
+    """Schema-linking index over catalog tables, rebuilt when the catalog changes"""
+    global _schema_linker, _schema_linker_version
+    catalog = get_schema_catalog()
+    tables = catalog.tables()
+    if _schema_linker is None or _schema_linker_version != catalog.version:
+        _schema_linker = SchemaLinker(tables)
+        _schema_linker_version = catalog.version
+    return _schema_linker
+
+
 class Text2SQLService:
     """Service for converting natural language to SQL queries"""
     
     def __init__(self):
-        self.query_history = []  # In-memory storage for demo
+        self.query_history = get_query_history_store()
         
         # Initialize LLM if available
         self.llm = None
@@ -51,57 +226,78 @@ class Text2SQLService:
     ) -> Dict[str, Any]:
         """Convert natural language question to SQL query"""
         
-        # Get schema context
-        schema_context = self._get_schema_context()
+        sql, explanation, confidence = await self._generate_sql(question)
+        if explanation is None:
+            explanation = await self.explain_sql(sql) if include_explanation else ""
         
-        if self.llm:
-            # Use LLM to generate SQL
-            prompt = f"""You are a SQL expert for a medical data warehouse using DuckDB.
-            Convert the following Korean question to a SQL query.
-            
-            Database Schema:
-            {schema_context}
-            
-            Question: {question}
-            
-            DuckDB Syntax Rules:
-            1. Use proper JOIN conditions
-            2. Include appropriate WHERE clauses
-            3. Use GROUP BY for aggregations
-            4. For current date: use CURRENT_DATE or '2025-11-17'::DATE
-            5. For date arithmetic: use INTERVAL, e.g., CURRENT_DATE - INTERVAL 1 YEAR
-            6. For date ranges: use BETWEEN '2024-11-17'::DATE AND '2025-11-17'::DATE
-            7. Do NOT use MySQL functions like CURDATE(), DATE_SUB()
-            8. Return only the SQL query, no explanations
-            
-            SQL Query:"""
-            
-            response = self.llm.invoke(prompt)
-            sql = response.content.strip() if hasattr(response, 'content') else str(response).strip()
-            
-            # Clean SQL (remove markdown formatting if present)
-            if sql.startswith('```sql'):
-                sql = sql.replace('```sql', '').replace('```', '').strip()
-            elif sql.startswith('```'):
-                sql = sql.replace('```', '').strip()
-            
-            # Generate explanation
-            explanation = ""
-            if include_explanation:
-                explain_prompt = f"""다음 SQL 쿼리를 간단한 한국어로 설명해주세요:
+        await self._record_history(question, sql, explanation, confidence)
+        
+        return {
+            "sql": sql,
+            "explanation": explanation,
+            "confidence": confidence,
+            "execution_result": None
+        }
+    
+    async def _generate_sql(self, question: str) -> tuple[str, Optional[str], float]:
+        """Generate SQL only; explanation is None when it still has to be requested from the LLM"""
+        if not self.llm:
+            # Fallback to rule-based generation
+            return self._generate_sql_rule_based(question)
+        
+        # Use LLM to generate SQL
+        prompt = await self._build_sql_prompt(question)
+        sql = await self._ainvoke(prompt)
+        
+        # Clean SQL (remove markdown formatting if present)
+        if sql.startswith('```sql'):
+            sql = sql.replace('```sql', '').replace('```', '').strip()
+        elif sql.startswith('```'):
+            sql = sql.replace('```', '').strip()
+        
+        # Only queries that bind against the live warehouse schema are trusted
+        valid = await asyncio.to_thread(self._validate_sql_sync, sql)
+        confidence = LLM_SQL_CONFIDENCE if valid else INVALID_SQL_CONFIDENCE
+        return sql, None, confidence
+    
+    @staticmethod
+    def _validate_sql_sync(sql: str) -> bool:
+        """Check that sql is a single read-only query that plans (EXPLAIN) without running it"""
+        conn = get_warehouse().cursor()
+        try:
+            if not is_select_query(conn, sql):
+                return False
+            conn.execute(f"EXPLAIN {sql}")
+            return True
+        except duckdb.Error:
+            return False
+        finally:
+            conn.close()
+    
+    async def explain_sql(self, sql: str) -> str:
+        """Explain a SQL query in Korean"""
+        if not self.llm:
+            return ""
+        
+        explain_prompt = f"""다음 SQL 쿼리를 간단한 한국어로 설명해주세요:
                 {sql}
                 
                 어떤 데이터를 조회하는지 간결하게 설명해주세요."""
-                
-                explain_response = self.llm.invoke(explain_prompt)
-                explanation = explain_response.content.strip() if hasattr(explain_response, 'content') else str(explain_response).strip()
-            
-            confidence = 0.85  # Would be calculated based on validation
-        else:
-            # Fallback to rule-based generation
-            sql, explanation, confidence = self._generate_sql_rule_based(question)
         
-        # Store in history
+        return await self._ainvoke(explain_prompt)
+    
+    async def _ainvoke(self, prompt: str) -> str:
+        """Invoke the LLM without blocking the event loop"""
+        response = await self.llm.ainvoke(prompt)
+        return response.content.strip() if hasattr(response, 'content') else str(response).strip()
+    
+    async def _record_history(self, question: str, sql: str, explanation: str, confidence: float):
+        """
+        Store a generated query in history and the few-shot index
+        
+        Only confident queries become few-shot examples; SQL that failed validation or
+        execution is recorded with INVALID_SQL_CONFIDENCE, so it is also skipped when reseeding
+        """
         query_record = {
             "id": str(uuid.uuid4()),
             "question": question,
@@ -110,103 +306,125 @@ class Text2SQLService:
             "confidence": confidence,
             "timestamp": datetime.utcnow().isoformat()
         }
-        self.query_history.append(query_record)
+        await self.query_history.add(query_record)
+        if confidence >= FEW_SHOT_MIN_CONFIDENCE:
+            get_few_shot_retriever().add(question, sql)
+    
+    async def enhanced_generate_events(
+        self,
+        question: str,
+        enhancement_type: str = "medical",
+        include_explanation: bool = True,
+        auto_execute: bool = True,
+        page_size: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        프롬프트 강화 → SQL 생성 → 실행/설명 파이프라인
         
-        return {
-            "sql": sql,
-            "explanation": explanation,
-            "confidence": confidence,
-            "execution_result": None
-        }
+        각 단계 결과를 준비되는 즉시 이벤트로 반환하며, SQL이 생성되면
+        설명 생성과 동시에 첫 페이지 실행을 시작함
+        """
+        start_time = time.perf_counter()
+        
+        def event(name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "event": name,
+                "data": data,
+                "elapsed_ms": (time.perf_counter() - start_time) * 1000
+            }
+        
+        enhancement = await self.enhance_medical_prompt(question, enhancement_type)
+        yield event("enhancement", enhancement)
+        
+        enhanced_question = enhancement["enhanced_question"]
+        sql, explanation, confidence = await self._generate_sql(enhanced_question)
+        yield event("sql", {"sql": sql, "confidence": confidence})
+        
+        pending: Dict[asyncio.Future, str] = {}
+        if auto_execute and sql:
+            pending[asyncio.ensure_future(self._execute_first_page(sql, page_size))] = "execution"
+        if include_explanation:
+            if explanation is None:
+                pending[asyncio.ensure_future(self.explain_sql(sql))] = "explanation"
+            else:
+                yield event("explanation", {"explanation": explanation})
+        
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if pending.pop(task) == "execution":
+                        execution = task.result()
+                        if "error" in execution:
+                            confidence = min(confidence, INVALID_SQL_CONFIDENCE)
+                        yield event("execution", execution)
+                    else:
+                        explanation = task.result()
+                        yield event("explanation", {"explanation": explanation})
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        await self._record_history(enhanced_question, sql, explanation or "", confidence)
+        yield event("done", {})
+    
+    async def _execute_first_page(self, sql: str, page_size: int) -> Dict[str, Any]:
+        """Execute speculatively; execution errors are reported, not raised"""
+        try:
+            return await self.execute_sql(sql, limit=page_size)
+        except Exception as exec_error:
+            return {
+                "error": f"SQL execution failed: {str(exec_error)}",
+                "results": [],
+                "row_count": 0
+            }
     
     def _get_schema_context(self) -> str:
         """Get database schema as context for LLM"""
-        return """
-        Tables:
-        1. dim_patient (환자 차원)
-           - patient_key: 환자 고유 키
-           - patient_name: 환자 이름
-           - age_group: 연령대 (20대, 30대, etc.)
-           - gender: 성별 (남, 여)
-           - region: 지역
-        
-        2. dim_department (진료과 차원)
-           - dept_key: 진료과 키
-           - dept_name: 진료과명
-           - dept_category: 진료과 분류
-        
-        3. dim_diagnosis (진단 차원)
-           - diagnosis_key: 진단 고유 키
-           - kcd_code: KCD 질병 코드
-           - diagnosis_name: 진단명
-           - category: 질병 분류
-        
-        4. fact_visit (진료 사실)
-           - visit_key: 방문 고유 키
-           - patient_key: 환자 키 (FK to dim_patient)
-           - diagnosis_key: 진단 키 (FK to dim_diagnosis)
-           - dept_key: 진료과 키 (FK to dim_department)
-           - visit_date: 방문 날짜
-           - visit_count: 방문 횟수
-           - duration_days: 입원 일수
-           - total_cost: 진료비
-           - visit_type: 진료 유형 (입원, 외래, 응급실)
-        
-        5. fact_lab_test (검사 결과)
-           - test_key: 검사 키
-           - patient_key: 환자 키
-           - visit_key: 방문 키
-           - test_name: 검사명
-           - test_date: 검사 날짜
-           - test_value: 검사 수치
-           - unit: 단위
-           - reference_range: 참조 범위
-        
-        6. fact_vital_signs (생체 징후)
-           - vital_key: 생체징후 키
-           - patient_key: 환자 키
-           - visit_key: 방문 키
-           - measurement_time: 측정 시간
-           - vital_type: 생체징후 종류 (수축기혈압, 이완기혈압, 맥박, 체온)
-           - vital_value: 측정값
-           - unit: 단위
-        
-        7. fact_medical_record (의료기록)
-           - record_key: 기록 키
-           - patient_key: 환자 키
-           - visit_key: 방문 키
-           - dept_key: 진료과 키
-           - record_type: 기록 유형 (입원경과기록, 외래경과기록, 퇴원요약)
-           - record_date: 기록 날짜
-           - record_content: 기록 내용
-        
-        8. fact_prescription (처방)
-           - prescription_key: 처방 키
-           - patient_key: 환자 키
-           - visit_key: 방문 키
-           - medication_name: 약물명
-           - medication_category: 약물 분류
-           - dosage: 용량
-           - unit: 단위
-           - frequency_per_day: 일일 복용 횟수
-           - duration_days: 처방 일수
-           - start_date: 처방 시작일
-           - end_date: 처방 종료일
-        
-        Sample Data:
-        - 환자: 홍길동 (당뇨병, 내분비내과), 김철수 (심장질환, 심장내과), 김영희 (고혈압, 심장내과)
-        - 검사: 중성지방, 총콜레스테롤, Troponin I, CK-MB, BNP, HbA1c
-        - Vital Signs: 수축기혈압, 이완기혈압, 맥박, 체온
-        - 약물: 메트포르민(당뇨병), 암로디핀(고혈압), 아스피린(항혈전), 로사르탄(고혈압)
-        - 시점: 2025년 11월이 현재 달 (오늘: 2025-11-17)
-        
-        Common KCD codes:
-        - E11: 당뇨병
-        - I10: 고혈압
-        - E78: 고지혈증
-        - C%: 암
-        - J%: 호흡기 질환
-        """
+        return f"{get_schema_catalog().render()}\n\n{SCHEMA_NOTES}"
+    
+    async def _build_sql_prompt(self, question: str) -> str:
+        """Build a compact prompt with retrieved few-shot examples and linked schema"""
+        retriever = get_few_shot_retriever()
+        if not retriever.seeded:
+            # Oldest first so the newest SQL wins for repeated questions
+            for record in reversed(await self.query_history.recent(retriever.max_examples)):
+                if record.get("sql") and (record.get("confidence") or 0) >= FEW_SHOT_MIN_CONFIDENCE:
+                    retriever.add(record["question"], record["sql"])
+            retriever.seeded = True
+        
+        examples = retriever.top_k(question, k=FEW_SHOT_EXAMPLES)
+        example_tables = [t for example in examples for t in referenced_tables(example["sql"])]
+        schema_fragments = get_schema_linker().link(question, required_tables=example_tables)
+        
+        examples_section = ""
+        if examples:
+            examples_section = f"""
+            Similar Past Questions:
+            {render_examples(examples)}
+            """
+        
+        return f"""You are a SQL expert for a medical data warehouse using DuckDB.
+            Convert the following Korean question to a SQL query.
+            
+            Relevant Schema:
+            {get_schema_catalog().render(schema_fragments, token_budget=SCHEMA_PROMPT_TOKEN_BUDGET)}
+            
+            {SCHEMA_NOTES}
+            {examples_section}
+            Question: {question}
+            
+            DuckDB Syntax Rules:
+            1. Use proper JOIN conditions
+            2. Include appropriate WHERE clauses
+            3. Use GROUP BY for aggregations
+            4. For current date: use CURRENT_DATE or '2025-11-17'::DATE
+            5. For date arithmetic: use INTERVAL, e.g., CURRENT_DATE - INTERVAL 1 YEAR
+            6. For date ranges: use BETWEEN '2024-11-17'::DATE AND '2025-11-17'::DATE
+            7. Do NOT use MySQL functions like CURDATE(), DATE_SUB()
+            8. Return only the SQL query, no explanations
+            
+            SQL Query:"""
     
     def _generate_sql_rule_based(self, question: str) -> tuple[str, str, float]:
         """Simple rule-based SQL generation for fallback"""
@@ -250,24 +468,30 @@ class Text2SQLService:
         limit: Optional[int] = 100
     ) -> Dict[str, Any]:
         """Execute SQL query and return results"""
+        return await asyncio.to_thread(self._execute_sql_sync, sql, limit)
+    
+    def _execute_sql_sync(self, sql: str, limit: Optional[int]) -> Dict[str, Any]:
         start_time = time.time()
         
         try:
-            # Initialize DuckDB connection
-            conn = duckdb.connect(':memory:')
-            
-            # Create sample tables (replace with actual database connection)
-            self._create_sample_tables(conn)
-            
-            # Add LIMIT if not present
-            if limit and "limit" not in sql.lower():
-                # Remove trailing semicolon if present
-                sql_clean = sql.rstrip(';').strip()
-                sql = f"{sql_clean} LIMIT {limit}"
+            conn = get_warehouse().cursor()
             
-            # Execute query
-            result = conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in conn.description] if conn.description else []
+            try:
+                # The warehouse is shared across requests: only read-only queries may run on it
+                if not is_select_query(conn, sql):
+                    raise ValueError("Only a single SELECT/WITH query can be executed")
+                
+                # Add LIMIT if not present
+                if limit and "limit" not in sql.lower():
+                    # Remove trailing semicolon if present
+                    sql_clean = sql.rstrip(';').strip()
+                    sql = f"{sql_clean} LIMIT {limit}"
+                
+                # Execute query
+                result = conn.execute(sql).fetchall()
+                columns = [desc[0] for desc in conn.description] if conn.description else []
+            finally:
+                conn.close()
             
             # Convert to dict format
             results = [
@@ -275,8 +499,6 @@ class Text2SQLService:
                 for row in result
             ]
             
-            conn.close()
-            
             execution_time = (time.time() - start_time) * 1000
             
             return {
@@ -289,7 +511,8 @@ class Text2SQLService:
         except Exception as e:
             raise Exception(f"SQL execution failed: {str(e)}")
     
-    def _create_sample_tables(self, conn):
+    @staticmethod
+    def _create_sample_tables(conn):
         """Create sample tables for demonstration"""
         # Create patient table with names
         conn.execute("""
@@ -506,6 +729,10 @@ class Text2SQLService:
             ) AS t(prescription_key, patient_key, visit_key, medication_name, medication_category, dosage, unit, frequency_per_day, duration_days, start_date, end_date)
         """)
     
+    def get_schema(self) -> Dict[str, Any]:
+        """Describe the warehouse schema from the cached catalog"""
+        return get_schema_catalog().describe()
+    
     def _generate_result_explanation(self, results: List[Dict], columns: List[str]) -> str:
         """Generate natural language explanation of query results"""
         if not results:
@@ -519,7 +746,16 @@ class Text2SQLService:
     
     async def get_query_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent query history"""
-        return self.query_history[-limit:][::-1]  # Return most recent first
+        return await self.query_history.recent(limit)  # Return most recent first
+    
+    async def search_query_history(
+        self,
+        query: str,
+        limit: int = 20,
+        mode: str = "prefix"
+    ) -> List[Dict[str, Any]]:
+        """Search query history by question text (prefix or full-text)"""
+        return await self.query_history.search(query, limit=limit, mode=mode)
     
     async def enhance_medical_prompt(
         self,
@@ -564,14 +800,10 @@ class Text2SQLService:
         """
         
         try:
-            response = self.llm.invoke(enhancement_prompt)
-            enhanced_question = response.content.strip() if hasattr(response, 'content') else str(response).strip()
-            
-            # 강화 사항 분석
-            enhancements_applied = self._analyze_enhancements(question, enhanced_question)
+            enhanced_question = await self._ainvoke(enhancement_prompt)
             
-            # 신뢰도 계산 (단어 수 증가, 의학 용어 포함 등을 기준)
-            confidence = self._calculate_enhancement_confidence(question, enhanced_question)
+            # 강화 사항 분석 및 신뢰도 계산 (단어 수 증가, 의학 용어 포함 등을 기준)
+            enhancements_applied, confidence = medical_prompt_rewriter.analyze(question, enhanced_question)
             
             return {
                 "original_question": question,
@@ -583,88 +815,18 @@ class Text2SQLService:
             print(f"⚠️ LLM prompt enhancement failed: {e}")
             return self._enhance_prompt_rule_based(question)
     
+    async def enhance_medical_prompts(
+        self,
+        questions: List[str],
+        enhancement_type: str = "medical"
+    ) -> List[Dict[str, Any]]:
+        """여러 의료 질의를 한 번에 강화"""
+        if not self.llm:
+            return medical_prompt_rewriter.rewrite_many(questions)
+        return list(await asyncio.gather(*[
+            self.enhance_medical_prompt(question, enhancement_type) for question in questions
+        ]))
+    
     def _enhance_prompt_rule_based(self, question: str) -> Dict[str, Any]:
         """규칙 기반 프롬프트 강화"""
-        enhanced = question
-        enhancements = []
-        
-        # 기본적인 의료 용어 매핑
-        medical_mappings = {
-            "TG": "중성지방",
-            "콜레스테롤": "콜레스테롤",
-            "혈압": "vital sign 혈압",
-            "맥박": "vital sign 맥박",
-            "당뇨": "당뇨병",
-            "경과기록": "입원경과기록"
-        }
-        
-        for original, enhanced_term in medical_mappings.items():
-            if original in enhanced and enhanced_term not in enhanced:
-                enhanced = enhanced.replace(original, enhanced_term)
-                enhancements.append(f"의학용어 강화: {original} → {enhanced_term}")
-        
-        # 환자명 패턴 강화
-        import re
-        patient_pattern = r"([가-힣]+)\s*환자"
-        match = re.search(patient_pattern, enhanced)
-        if match:
-            patient_name = match.group(1)
-            enhanced = re.sub(patient_pattern, f"환자이름이 {patient_name}인", enhanced)
-            enhancements.append(f"환자명 구조화: {patient_name} 환자 → 환자이름이 {patient_name}인")
-        
-        # 질문 형태로 변환
-        casual_endings = ["보여줘", "알려줘", "줘", "해줘"]
-        formal_endings = ["보여주세요", "알려주세요", "주세요", "해주세요"]
-        
-        for i, casual in enumerate(casual_endings):
-            if enhanced.endswith(casual):
-                enhanced = enhanced[:-len(casual)] + formal_endings[i]
-                enhancements.append(f"정중한 질문 형태로 변환: {casual} → {formal_endings[i]}")
-                break
-        else:
-            # 질문 형태가 아닌 경우 질문으로 변환
-            if not any(enhanced.endswith(ending) for ending in ["주세요", "까요?", "인가요?"]):
-                enhanced = enhanced.rstrip(".") + "을 조회해주세요"
-                enhancements.append("질문 형태로 변환")
-        
-        confidence = 0.6 if enhancements else 0.3
-        
-        return {
-            "original_question": question,
-            "enhanced_question": enhanced,
-            "enhancements_applied": enhancements,
-            "confidence": confidence
-        }
-    
-    def _analyze_enhancements(self, original: str, enhanced: str) -> List[str]:
-        """강화 사항 분석"""
-        enhancements = []
-        
-        # 길이 증가 확인
-        if len(enhanced) > len(original):
-            enhancements.append("질의 구체화")
-        
-        # 의학 용어 포함 확인
-        medical_terms = ["환자이름이", "진료과가", "vital sign", "입원경과기록", "중성지방", "검사명이"]
-        for term in medical_terms:
-            if term in enhanced and term not in original:
-                enhancements.append(f"의학용어 추가: {term}")
-        
-        return enhancements
-    
-    def _calculate_enhancement_confidence(self, original: str, enhanced: str) -> float:
-        """강화 신뢰도 계산"""
-        # 기본 신뢰도
-        confidence = 0.5
-        
-        # 길이 기반 신뢰도
-        length_ratio = len(enhanced) / len(original) if len(original) > 0 else 1
-        if length_ratio > 1.2:  # 20% 이상 증가
-            confidence += 0.2
-        
-        # 의학 용어 포함도
-        medical_terms = ["환자이름이", "진료과가", "vital sign", "입원경과기록", "중성지방", "검사명이"]
-        medical_term_count = sum(1 for term in medical_terms if term in enhanced)
-        confidence += min(medical_term_count * 0.1, 0.3)
-        
-        return min(confidence, 0.95)  # 최대 0.95
\ No newline at end of file
+        return medical_prompt_rewriter.rewrite(question)
@@ -0,0 +1,972 @@
+"""
+벡터 저장소 백엔드
+Qdrant 서버와 프로세스 내 로컬 인덱스(NumPy flat / HNSW)를 같은 인터페이스로 제공해
+Qdrant 없이도 단일 노드/CI 환경에서 MedicalVectorStore를 사용할 수 있도록 함
+"""
+import asyncio
+import heapq
+import json
+import logging
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+
+try:
+    import hnswlib
+except ImportError:  # 선택 의존성: 없으면 대용량 컬렉션도 flat 검색
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# payload 필드 → 일치해야 하는 값
+PayloadFilter = Dict[str, Any]
+
+DEFAULT_INDEXED_FIELDS = ("hospital_department", "medical_specialty")
+
+# 컬렉션별 프로비저닝 버전을 기록하는 Qdrant 메타 컬렉션
+PROVISIONING_COLLECTION = "_collection_provisioning"
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    컬렉션 벡터 저장 방식
+
+    양자화 벡터(int8 scalar 또는 product)만 RAM에 두고 원본 float32 벡터는 디스크에 두며,
+    양자화 점수로 oversampling배 후보를 고른 뒤 원본 벡터로 재채점해 recall을 유지
+    """
+    quantization: Optional[str] = None  # None, scalar(int8) 또는 product
+    on_disk: bool = False  # 원본 벡터를 디스크(mmap)에 저장
+    always_ram: bool = True  # 양자화 벡터는 항상 RAM에 유지
+    quantile: float = 0.99  # scalar 양자화 범위 (이 분위수 밖의 값은 잘림)
+    compression: str = "x16"  # product 양자화 압축률
+    rescore: bool = True
+    oversampling: float = 2.0
+
+
+STORAGE_PROFILES = {
+    "memory": StorageProfile(),
+    "scalar": StorageProfile(quantization="scalar", on_disk=True),
+    "product": StorageProfile(quantization="product", on_disk=True, oversampling=3.0),
+}
+
+
+def estimate_storage_bytes(points: int, dim: int, spec: "CollectionSpec") -> Dict[str, int]:
+    """저장 프로필 기준 RAM/디스크 사용량 추정 (벡터 + HNSW 0레벨 링크, payload 제외)"""
+    storage = spec.storage
+    original = points * dim * 4
+    if storage.quantization == "scalar":
+        quantized = points * dim
+    elif storage.quantization == "product":
+        quantized = points * dim * 4 // int(storage.compression.lstrip("x"))
+    else:
+        quantized = 0
+    graph = points * spec.hnsw_m * 2 * 4
+
+    ram = graph + (0 if storage.on_disk else original) + (quantized if storage.always_ram else 0)
+    return {"ram_bytes": ram, "disk_bytes": original + quantized + graph}
+
+
+@dataclass(frozen=True)
+class CollectionSpec:
+    """
+    컬렉션 프로비저닝 명세
+
+    설정을 바꿀 때 version을 올리면 시작시 기존 컬렉션을 새 설정으로 마이그레이션
+    """
+    name: str
+    version: int = 1
+    keyword_fields: Tuple[str, ...] = DEFAULT_INDEXED_FIELDS  # 필터용 keyword payload 인덱스
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    payload_m: Optional[int] = None  # keyword 값별 추가 HNSW 링크 (필터 검색 정확도/속도)
+    full_scan_threshold: int = 10000  # 필터 결과가 이보다 작으면(KB) HNSW 대신 payload 인덱스 후 전수 비교
+    search_ef: Optional[int] = None  # 검색시 hnsw_ef (None이면 서버 기본값)
+    storage: StorageProfile = StorageProfile()
+
+
+class VectorBackend(ABC):
+    """벡터 저장소 백엔드 인터페이스"""
+
+    name = "base"
+
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        """컬렉션 이름 목록"""
+        pass
+
+    @abstractmethod
+    def ensure_collection(self, spec: CollectionSpec, dim: int) -> str:
+        """
+        명세대로 컬렉션을 생성하거나 마이그레이션
+
+        Returns:
+            created, migrated 또는 unchanged
+        """
+        pass
+
+    @abstractmethod
+    def upsert(self,
+               collection_name: str,
+               ids: List[str],
+               vectors: np.ndarray,
+               payloads: List[Dict[str, Any]],
+               wait: bool = True) -> None:
+        """포인트 추가/갱신 (같은 ID는 덮어씀)"""
+        pass
+
+    @abstractmethod
+    def delete(self, collection_name: str, ids: List[str]) -> None:
+        """포인트 삭제"""
+        pass
+
+    @abstractmethod
+    def search(self,
+               collection_name: str,
+               vector: Sequence[float],
+               k: int,
+               payload_filter: Optional[PayloadFilter] = None) -> List[Dict[str, Any]]:
+        """유사도 상위 k개 [{"id", "score", "payload"}]"""
+        pass
+
+    @abstractmethod
+    def count(self, collection_name: str) -> int:
+        """컬렉션 포인트 수"""
+        pass
+
+    @abstractmethod
+    def scroll(self, collection_name: str,
+               batch_size: int = 1000) -> Iterator[Tuple[List[str], List[Dict[str, Any]]]]:
+        """저장된 포인트를 (ID 리스트, payload 리스트) 배치로 순회 (벡터는 읽지 않음)"""
+        pass
+
+    @abstractmethod
+    def collection_info(self, collection_name: str) -> Dict[str, Any]:
+        """포인트/색인 벡터/세그먼트 수, RAM/디스크 사용량과 저장 프로필"""
+        pass
+
+    async def asearch(self,
+                      collection_name: str,
+                      vector: Sequence[float],
+                      k: int,
+                      payload_filter: Optional[PayloadFilter] = None) -> List[Dict[str, Any]]:
+        """비동기 검색 (기본 구현은 동기 검색을 그대로 호출)"""
+        return self.search(collection_name, vector, k, payload_filter)
+
+    async def acount(self, collection_name: str) -> int:
+        """비동기 포인트 수 조회"""
+        return self.count(collection_name)
+
+    async def acollection_info(self, collection_name: str) -> Dict[str, Any]:
+        """비동기 컬렉션 정보 조회"""
+        return self.collection_info(collection_name)
+
+    async def aclose(self) -> None:
+        """비동기 자원 정리"""
+        self.close()
+
+    def close(self) -> None:
+        """자원 정리"""
+        pass
+
+
+class QdrantBackend(VectorBackend):
+    """Qdrant 서버 백엔드 (동기 클라이언트 + 커넥션 풀 기반 비동기 클라이언트)"""
+
+    name = "qdrant"
+
+    def __init__(self, url: str = None):
+        import httpx
+        import qdrant_client
+        from qdrant_client.http import models
+
+        self._models = models
+        self._specs: Dict[str, CollectionSpec] = {}
+        self.url = url or settings.QDRANT_URL
+        self.max_retries = settings.QDRANT_MAX_RETRIES
+        self.retry_backoff = settings.QDRANT_RETRY_BACKOFF
+
+        self.client = qdrant_client.QdrantClient(url=self.url, timeout=settings.QDRANT_TIMEOUT)
+        self.async_client = qdrant_client.AsyncQdrantClient(
+            url=self.url,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            timeout=settings.QDRANT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.QDRANT_POOL_SIZE,
+                max_keepalive_connections=settings.QDRANT_POOL_SIZE,
+                keepalive_expiry=settings.QDRANT_KEEPALIVE_EXPIRY
+            )
+        )
+
+    def _to_filter(self, payload_filter: Optional[PayloadFilter]):
+        if not payload_filter:
+            return None
+        models = self._models
+        return models.Filter(must=[
+            models.FieldCondition(key=key, match=models.MatchValue(value=value))
+            for key, value in payload_filter.items()
+        ])
+
+    @staticmethod
+    def _to_hits(points) -> List[Dict[str, Any]]:
+        return [{"id": point.id, "score": point.score, "payload": point.payload or {}} for point in points]
+
+    def list_collections(self) -> List[str]:
+        return [
+            col.name for col in self.client.get_collections().collections
+            if col.name != PROVISIONING_COLLECTION
+        ]
+
+    def _ensure_provisioning_collection(self):
+        names = [col.name for col in self.client.get_collections().collections]
+        if PROVISIONING_COLLECTION not in names:
+            self.client.create_collection(
+                collection_name=PROVISIONING_COLLECTION,
+                vectors_config=self._models.VectorParams(size=1, distance=self._models.Distance.DOT)
+            )
+
+    def _provisioned_version(self, collection_name: str) -> Optional[int]:
+        """메타 컬렉션에 기록된 프로비저닝 버전"""
+        self._ensure_provisioning_collection()
+        points = self.client.retrieve(
+            collection_name=PROVISIONING_COLLECTION,
+            ids=[str(uuid.uuid5(uuid.NAMESPACE_URL, collection_name))]
+        )
+        return points[0].payload.get("version") if points else None
+
+    def _record_version(self, spec: CollectionSpec):
+        self.client.upsert(
+            collection_name=PROVISIONING_COLLECTION,
+            points=[self._models.PointStruct(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, spec.name)),
+                vector=[1.0],
+                payload={"collection": spec.name, "version": spec.version,
+                         "provisioned_at": datetime.now().isoformat()}
+            )],
+            wait=True
+        )
+
+    def _sync_payload_indexes(self, spec: CollectionSpec):
+        """명세의 keyword 인덱스를 생성하고 더 이상 선언되지 않은 인덱스는 제거"""
+        schema = self.client.get_collection(collection_name=spec.name).payload_schema or {}
+        for field in spec.keyword_fields:
+            if field not in schema:
+                self.client.create_payload_index(
+                    collection_name=spec.name,
+                    field_name=field,
+                    field_schema=self._models.PayloadSchemaType.KEYWORD,
+                    wait=True
+                )
+        for field in schema:
+            if field not in spec.keyword_fields:
+                self.client.delete_payload_index(collection_name=spec.name, field_name=field, wait=True)
+
+    def ensure_collection(self, spec: CollectionSpec, dim: int) -> str:
+        models = self._models
+        self._specs[spec.name] = spec
+        hnsw_config = models.HnswConfigDiff(
+            m=spec.hnsw_m,
+            ef_construct=spec.hnsw_ef_construct,
+            full_scan_threshold=spec.full_scan_threshold,
+            payload_m=spec.payload_m
+        )
+
+        if spec.name not in self.list_collections():
+            self.client.create_collection(
+                collection_name=spec.name,
+                vectors_config=models.VectorParams(
+                    size=dim,
+                    distance=models.Distance.COSINE,
+                    on_disk=spec.storage.on_disk
+                ),
+                hnsw_config=hnsw_config,
+                quantization_config=self._quantization_config(spec.storage)
+            )
+            action = "created"
+        else:
+            stored = self._provisioned_version(spec.name)
+            if stored is not None and stored >= spec.version:
+                return "unchanged"
+            size = self.client.get_collection(collection_name=spec.name).config.params.vectors.size
+            if size != dim:
+                raise ValueError(f"{spec.name} 벡터 차원 불일치: {size} != {dim} (재색인 필요)")
+            self.client.update_collection(
+                collection_name=spec.name,
+                vectors_config={"": models.VectorParamsDiff(on_disk=spec.storage.on_disk)},
+                hnsw_config=hnsw_config,
+                quantization_config=self._quantization_config(spec.storage) or models.Disabled.DISABLED
+            )
+            action = "migrated"
+
+        self._sync_payload_indexes(spec)
+        self._ensure_provisioning_collection()
+        self._record_version(spec)
+        return action
+
+    def upsert(self, collection_name, ids, vectors, payloads, wait=True) -> None:
+        self.client.upsert(
+            collection_name=collection_name,
+            points=self._models.Batch(
+                ids=list(ids),
+                vectors=np.asarray(vectors).tolist(),
+                payloads=payloads
+            ),
+            wait=wait
+        )
+
+    def delete(self, collection_name: str, ids: List[str]) -> None:
+        self.client.delete(
+            collection_name=collection_name,
+            points_selector=self._models.PointIdsList(points=list(ids))
+        )
+
+    def _quantization_config(self, storage: StorageProfile):
+        models = self._models
+        if storage.quantization == "scalar":
+            return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=storage.quantile,
+                always_ram=storage.always_ram
+            ))
+        if storage.quantization == "product":
+            return models.ProductQuantization(product=models.ProductQuantizationConfig(
+                compression=models.CompressionRatio(storage.compression),
+                always_ram=storage.always_ram
+            ))
+        return None
+
+    def _search_params(self, collection_name: str):
+        spec = self._specs.get(collection_name)
+        if spec is None or (spec.search_ef is None and spec.storage.quantization is None):
+            return None
+        quantization = None
+        if spec.storage.quantization is not None:
+            quantization = self._models.QuantizationSearchParams(
+                rescore=spec.storage.rescore,
+                oversampling=spec.storage.oversampling
+            )
+        return self._models.SearchParams(hnsw_ef=spec.search_ef, quantization=quantization)
+
+    def search(self, collection_name, vector, k, payload_filter=None) -> List[Dict[str, Any]]:
+        return self._to_hits(self.client.search(
+            collection_name=collection_name,
+            query_vector=list(vector),
+            query_filter=self._to_filter(payload_filter),
+            search_params=self._search_params(collection_name),
+            limit=k
+        ))
+
+    def count(self, collection_name: str) -> int:
+        return self.client.get_collection(collection_name=collection_name).points_count or 0
+
+    def scroll(self, collection_name, batch_size=1000):
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            if points:
+                yield [str(point.id) for point in points], [point.payload for point in points]
+            if offset is None:
+                return
+
+    def _to_info(self, collection_name: str, info) -> Dict[str, Any]:
+        spec = self._specs.get(collection_name, CollectionSpec(collection_name))
+        points = info.points_count or 0
+        return {
+            "points": points,
+            "indexed_vectors": info.indexed_vectors_count or 0,
+            "segments": info.segments_count or 0,
+            **estimate_storage_bytes(points, info.config.params.vectors.size, spec),
+            "storage": asdict(spec.storage)
+        }
+
+    def collection_info(self, collection_name: str) -> Dict[str, Any]:
+        return self._to_info(collection_name, self.client.get_collection(collection_name=collection_name))
+
+    async def _with_retry(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """일시적 오류(타임아웃, 연결 끊김 등)에 대해 지수 백오프로 재시도"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await operation()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(f"Qdrant 요청 실패, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+                await asyncio.sleep(delay)
+
+    async def asearch(self, collection_name, vector, k, payload_filter=None) -> List[Dict[str, Any]]:
+        query_filter = self._to_filter(payload_filter)
+        search_params = self._search_params(collection_name)
+        points = await self._with_retry(lambda: self.async_client.search(
+            collection_name=collection_name,
+            query_vector=list(vector),
+            query_filter=query_filter,
+            search_params=search_params,
+            limit=k
+        ))
+        return self._to_hits(points)
+
+    async def acount(self, collection_name: str) -> int:
+        info = await self._with_retry(lambda: self.async_client.get_collection(collection_name=collection_name))
+        return info.points_count or 0
+
+    async def acollection_info(self, collection_name: str) -> Dict[str, Any]:
+        info = await self._with_retry(lambda: self.async_client.get_collection(collection_name=collection_name))
+        return self._to_info(collection_name, info)
+
+    async def aclose(self) -> None:
+        await self.async_client.close()
+        self.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class LocalCollection:
+    """
+    프로세스 내 벡터 컬렉션
+
+    정규화된 벡터를 float32 행렬(디렉토리 지정시 memory-mapped 파일)에 행 단위로 저장하고,
+    payload 필드별 행 집합으로 필터링하며, 후보가 많을 때만 HNSW 근사 검색을 사용
+    삭제된 행은 새 포인트에 재사용하므로 벡터 파일은 최대 동시 보관 수 이상으로 자라지 않음
+    양자화 프로필이면 RAM의 int8 코드로 후보를 고르고 원본 행만 읽어 재채점
+    """
+
+    SCAN_CHUNK_ROWS = 65536
+
+    def __init__(self,
+                 dim: int,
+                 directory: Optional[str] = None,
+                 indexed_fields: Sequence[str] = DEFAULT_INDEXED_FIELDS,
+                 hnsw_threshold: int = 20000,
+                 hnsw_m: int = 16,
+                 hnsw_ef_construct: int = 100,
+                 storage: StorageProfile = StorageProfile(),
+                 version: int = 0):
+        """
+        Args:
+            dim: 벡터 차원
+            directory: 저장 디렉토리 (None이면 메모리에만 유지)
+            indexed_fields: 필터용 역색인을 유지할 payload 필드
+            hnsw_threshold: 검색 후보가 이 수 이상이면 HNSW 사용 (hnswlib 설치시)
+            hnsw_m: HNSW 노드당 링크 수
+            hnsw_ef_construct: HNSW 구축시 탐색 폭
+            storage: 저장 프로필 (양자화/재채점)
+            version: 적용된 프로비저닝 버전
+        """
+        self.dim = dim
+        self.directory = directory
+        self.indexed_fields = tuple(indexed_fields)
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.storage = storage
+        self.version = version
+
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._field_rows: Dict[str, Dict[Any, set]] = {field: {} for field in self.indexed_fields}
+        self._capacity = 0
+        self._matrix: np.ndarray = np.zeros((0, dim), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._free_rows: List[int] = []  # 삭제되어 재사용할 행 번호 (최소 힙)
+        self._hnsw = None
+        self._codes: Optional[np.ndarray] = None  # 양자화 프로필의 int8 코드 (RAM)
+        self._code_scale = 1.0
+        self._log = None
+        self._lock = threading.RLock()
+
+        if directory:
+            self._open(directory)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------------
+
+    def _open(self, directory: str):
+        """디렉토리의 벡터 파일을 매핑하고 연산 로그를 재생"""
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            self._write_meta()
+
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._log_path = os.path.join(directory, "log.jsonl")
+        stored_rows = (
+            os.path.getsize(self._vectors_path) // (self.dim * 4) if os.path.exists(self._vectors_path) else 0
+        )
+        self._reserve(max(stored_rows, 1024))
+
+        operations = 0
+        if os.path.exists(self._log_path):
+            with open(self._log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # 마지막 줄이 기록 도중 끊긴 경우
+                    operations += 1
+                    if entry["op"] == "upsert" and entry["row"] < stored_rows:
+                        self._set_row(entry["row"], entry["id"], entry["payload"])
+                    elif entry["op"] == "delete":
+                        self._drop(entry["id"])
+        self._free_rows = [row for row in range(len(self._ids)) if not self._alive[row]]
+
+        self._log = open(self._log_path, "a", encoding="utf-8")
+        if operations > 2 * len(self) + 1000:
+            self._compact()
+
+    def _write_meta(self):
+        with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "version": self.version,
+                "keyword_fields": list(self.indexed_fields),
+                "hnsw_m": self.hnsw_m,
+                "hnsw_ef_construct": self.hnsw_ef_construct,
+                "storage": asdict(self.storage)
+            }, f)
+
+    def configure(self, spec: CollectionSpec):
+        """프로비저닝 명세 적용 (필터 역색인 재구성, HNSW는 다음 검색시 새 설정으로 재구축)"""
+        with self._lock:
+            self.indexed_fields = tuple(spec.keyword_fields)
+            self.hnsw_m = spec.hnsw_m
+            self.hnsw_ef_construct = spec.hnsw_ef_construct
+            self.storage = spec.storage
+            self.version = spec.version
+            self._hnsw = None
+            self._codes = None
+
+            self._field_rows = {field: {} for field in self.indexed_fields}
+            for row in self._rows.values():
+                payload = self._payloads[row]
+                for field in self.indexed_fields:
+                    if field in payload:
+                        self._field_rows[field].setdefault(payload[field], set()).add(row)
+
+            if self.directory:
+                self._write_meta()
+
+    def _compact(self):
+        """살아있는 행만 남기도록 연산 로그 재작성"""
+        temp_path = self._log_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for point_id, row in self._rows.items():
+                f.write(json.dumps({"op": "upsert", "id": point_id, "row": row,
+                                    "payload": self._payloads[row]}, ensure_ascii=False) + "\n")
+        self._log.close()
+        os.replace(temp_path, self._log_path)
+        self._log = open(self._log_path, "a", encoding="utf-8")
+
+    def _reserve(self, rows: int):
+        if rows <= self._capacity:
+            return
+        if self.directory:
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(rows * self.dim * 4)
+            matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+        else:
+            matrix = np.zeros((rows, self.dim), dtype=np.float32)
+            matrix[:self._capacity] = self._matrix
+        alive = np.zeros(rows, dtype=bool)
+        alive[:self._capacity] = self._alive
+        if self._codes is not None:
+            codes = np.zeros((rows, self.dim), dtype=np.int8)
+            codes[:self._capacity] = self._codes
+            self._codes = codes
+        self._matrix, self._alive, self._capacity = matrix, alive, rows
+        if self._hnsw is not None:
+            self._hnsw.resize_index(rows)
+
+    def _set_row(self, row: int, point_id: str, payload: Dict[str, Any]):
+        """행 메타데이터 기록 (벡터는 호출자가 기록)"""
+        previous = self._rows.get(point_id)
+        if previous is not None and previous != row:
+            self._drop(point_id)
+        elif previous == row:
+            self._unindex(row)
+
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._payloads.append(None)
+        self._ids[row] = point_id
+        self._payloads[row] = payload
+        self._rows[point_id] = row
+        self._alive[row] = True
+        for field in self.indexed_fields:
+            if field in payload:
+                self._field_rows[field].setdefault(payload[field], set()).add(row)
+
+    def _unindex(self, row: int):
+        payload = self._payloads[row] or {}
+        for field in self.indexed_fields:
+            rows = self._field_rows[field].get(payload.get(field))
+            if rows is not None:
+                rows.discard(row)
+
+    def _drop(self, point_id: str):
+        row = self._rows.pop(point_id, None)
+        if row is None:
+            return
+        self._unindex(row)
+        self._ids[row] = None
+        self._payloads[row] = None
+        self._alive[row] = False
+        heapq.heappush(self._free_rows, row)
+        if self._hnsw is not None:
+            self._hnsw.mark_deleted(row)
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]], flush: bool = True):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        with self._lock:
+            self._upsert_rows(ids, vectors, payloads, flush)
+
+    def _upsert_rows(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]], flush: bool):
+        rows = []
+        next_row = len(self._ids)
+        for point_id in ids:
+            row = self._rows.get(point_id)
+            if row is None and self._free_rows:
+                row = heapq.heappop(self._free_rows)
+            elif row is None:
+                row = next_row
+                next_row += 1
+            rows.append(row)
+        if next_row > self._capacity:
+            self._reserve(max(self._capacity * 2, next_row))
+
+        # 벡터를 먼저 쓰고 로그를 나중에 기록 (로그에 있는 행은 항상 벡터가 존재)
+        self._matrix[rows] = vectors
+        if isinstance(self._matrix, np.memmap) and flush:
+            self._matrix.flush()
+        if self._codes is not None:
+            self._codes[rows] = self._quantize(vectors)
+
+        for point_id, row, payload in zip(ids, rows, payloads):
+            self._set_row(row, point_id, payload)
+            if self._log is not None:
+                self._log.write(json.dumps({"op": "upsert", "id": point_id, "row": row, "payload": payload},
+                                           ensure_ascii=False) + "\n")
+        if self._log is not None:
+            self._log.flush()
+
+        if self._hnsw is not None:
+            self._hnsw.add_items(vectors, np.asarray(rows))
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for point_id in ids:
+                if point_id in self._rows:
+                    self._drop(point_id)
+                    if self._log is not None:
+                        self._log.write(json.dumps({"op": "delete", "id": point_id}) + "\n")
+            if self._log is not None:
+                self._log.flush()
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def _candidate_rows(self, payload_filter: PayloadFilter) -> np.ndarray:
+        """필터 조건을 만족하는 행 번호 (색인된 필드는 역색인, 나머지는 payload 스캔)"""
+        candidates: Optional[set] = None
+        unindexed = {}
+        for field, value in payload_filter.items():
+            if field in self._field_rows:
+                rows = self._field_rows[field].get(value, set())
+                candidates = set(rows) if candidates is None else candidates & rows
+            else:
+                unindexed[field] = value
+
+        if candidates is None:
+            candidates = set(self._rows.values())
+        if unindexed:
+            candidates = {
+                row for row in candidates
+                if all(self._payloads[row].get(field) == value for field, value in unindexed.items())
+            }
+        return np.fromiter(sorted(candidates), dtype=np.int64, count=len(candidates))
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors * self._code_scale), -127, 127).astype(np.int8)
+
+    def _ensure_codes(self) -> np.ndarray:
+        """
+        int8 scalar 코드 생성 (양자화 범위는 저장된 벡터 값의 분위수로 결정)
+
+        product 프로필도 로컬에서는 scalar 코드로 근사함 (코드북 학습 없이 동일한 재채점 경로 사용)
+        """
+        if self._codes is None:
+            rows = np.flatnonzero(self._alive[:len(self._ids)])
+            sample = rows[np.linspace(0, len(rows) - 1, min(len(rows), 10000)).astype(int)] if len(rows) else rows
+            bound = float(np.quantile(np.abs(self._matrix[sample]), self.storage.quantile)) if len(sample) else 0.0
+            self._code_scale = 127.0 / bound if bound > 0 else 127.0
+
+            codes = np.zeros((self._capacity, self.dim), dtype=np.int8)
+            for start in range(0, len(self._ids), self.SCAN_CHUNK_ROWS):
+                end = min(start + self.SCAN_CHUNK_ROWS, len(self._ids))
+                codes[start:end] = self._quantize(np.asarray(self._matrix[start:end]))
+            self._codes = codes
+        return self._codes
+
+    def _quantized_search(self, query: np.ndarray, k: int,
+                          candidates: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """int8 코드로 oversampling배 후보를 고르고 원본 벡터로 재채점"""
+        codes = self._ensure_codes()
+        if candidates is None:
+            row_ids = np.flatnonzero(self._alive[:len(self._ids)])
+        else:
+            row_ids = candidates
+
+        approx = np.empty(len(row_ids), dtype=np.float32)
+        for start in range(0, len(row_ids), self.SCAN_CHUNK_ROWS):
+            chunk = row_ids[start:start + self.SCAN_CHUNK_ROWS]
+            approx[start:start + len(chunk)] = codes[chunk].astype(np.float32) @ query
+
+        keep = min(len(row_ids), max(k, int(np.ceil(k * self.storage.oversampling))))
+        top = np.argpartition(-approx, keep - 1)[:keep] if keep < len(approx) else np.arange(len(approx))
+        rows = row_ids[top]
+        if self.storage.rescore:
+            scores = np.asarray(self._matrix[np.sort(rows)]) @ query
+            rows = np.sort(rows)
+        else:
+            scores = approx[top] / self._code_scale
+
+        best = np.argsort(-scores)[:k]
+        return rows[best], scores[best]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """실제 RAM/디스크 사용량 (payload 제외)"""
+        with self._lock:
+            ram = 0 if isinstance(self._matrix, np.memmap) else self._matrix.nbytes
+            if self._codes is not None:
+                ram += self._codes.nbytes
+            if self._hnsw is not None:
+                ram += self._hnsw.element_count * (self.dim * 4 + self.hnsw_m * 2 * 4)
+            disk = 0
+            if self.directory:
+                for name in ("vectors.f32", "log.jsonl"):
+                    path = os.path.join(self.directory, name)
+                    if os.path.exists(path):
+                        disk += os.path.getsize(path)
+            return {"ram_bytes": int(ram), "disk_bytes": disk}
+
+    def _ensure_hnsw(self):
+        if self._hnsw is None:
+            index = hnswlib.Index(space="ip", dim=self.dim)
+            index.init_index(max_elements=self._capacity, ef_construction=self.hnsw_ef_construct, M=self.hnsw_m)
+            rows = np.flatnonzero(self._alive[:len(self._ids)])
+            if len(rows):
+                index.add_items(self._matrix[rows], rows)
+            self._hnsw = index
+        return self._hnsw
+
+    def search(self, vector: Sequence[float], k: int,
+               payload_filter: Optional[PayloadFilter] = None) -> List[Dict[str, Any]]:
+        if k <= 0 or not self._rows:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        with self._lock:
+            return self._search_rows(query, k, payload_filter)
+
+    def _search_rows(self, query: np.ndarray, k: int,
+                     payload_filter: Optional[PayloadFilter]) -> List[Dict[str, Any]]:
+        candidates = self._candidate_rows(payload_filter) if payload_filter else None
+        candidate_count = len(self._rows) if candidates is None else len(candidates)
+        if candidate_count == 0:
+            return []
+        k = min(k, candidate_count)
+
+        if self.storage.quantization is not None:
+            rows, scores = self._quantized_search(query, k, candidates)
+        elif hnswlib is not None and candidate_count >= self.hnsw_threshold:
+            index = self._ensure_hnsw()
+            index.set_ef(max(64, k * 4))
+            allowed = None if candidates is None else set(candidates.tolist())
+            labels, distances = index.knn_query(
+                query, k=k, filter=None if allowed is None else (lambda label: label in allowed)
+            )
+            rows, scores = labels[0], 1.0 - distances[0]
+        else:
+            if candidates is None:
+                count = len(self._ids)
+                scores = self._matrix[:count] @ query
+                scores[~self._alive[:count]] = -np.inf
+                row_ids = np.arange(count)
+            else:
+                scores = self._matrix[candidates] @ query
+                row_ids = candidates
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+            rows, scores = row_ids[top], scores[top]
+
+        return [
+            {"id": self._ids[row], "score": float(score), "payload": self._payloads[row]}
+            for row, score in zip(rows.tolist(), scores.tolist())
+        ]
+
+    def close(self):
+        with self._lock:
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+class LocalVectorBackend(VectorBackend):
+    """프로세스 내 벡터 백엔드 (네트워크 없이 검색)"""
+
+    name = "local"
+
+    def __init__(self, directory: Optional[str] = None, hnsw_threshold: int = 20000):
+        """
+        Args:
+            directory: 컬렉션 저장 디렉토리 (None이면 메모리에만 유지)
+            hnsw_threshold: HNSW 검색으로 전환할 후보 수
+        """
+        self.directory = directory
+        self.hnsw_threshold = hnsw_threshold
+        self._collections: Dict[str, LocalCollection] = {}
+        self._lock = threading.RLock()
+
+        if directory and os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                meta_path = os.path.join(directory, name, "meta.json")
+                if os.path.exists(meta_path):
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                    self._open_collection(
+                        name,
+                        meta["dim"],
+                        indexed_fields=meta.get("keyword_fields", DEFAULT_INDEXED_FIELDS),
+                        hnsw_m=meta.get("hnsw_m", 16),
+                        hnsw_ef_construct=meta.get("hnsw_ef_construct", 100),
+                        storage=StorageProfile(**meta.get("storage", {})),
+                        version=meta.get("version", 0)
+                    )
+
+    def _open_collection(self, collection_name: str, dim: int, **options) -> LocalCollection:
+        collection = LocalCollection(
+            dim,
+            directory=os.path.join(self.directory, collection_name) if self.directory else None,
+            hnsw_threshold=self.hnsw_threshold,
+            **options
+        )
+        self._collections[collection_name] = collection
+        return collection
+
+    def _collection(self, collection_name: str) -> LocalCollection:
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            raise ValueError(f"존재하지 않는 컬렉션: {collection_name}")
+        return collection
+
+    def list_collections(self) -> List[str]:
+        return list(self._collections)
+
+    def ensure_collection(self, spec: CollectionSpec, dim: int) -> str:
+        with self._lock:
+            collection = self._collections.get(spec.name)
+            if collection is None:
+                collection = self._open_collection(spec.name, dim)
+                collection.configure(spec)
+                return "created"
+            if collection.dim != dim:
+                raise ValueError(f"{spec.name} 벡터 차원 불일치: {collection.dim} != {dim} (재색인 필요)")
+            if collection.version >= spec.version:
+                return "unchanged"
+            collection.configure(spec)
+            return "migrated"
+
+    def upsert(self, collection_name, ids, vectors, payloads, wait=True) -> None:
+        self._collection(collection_name).upsert(ids, vectors, payloads, flush=wait)
+
+    def delete(self, collection_name: str, ids: List[str]) -> None:
+        self._collection(collection_name).delete(ids)
+
+    def search(self, collection_name, vector, k, payload_filter=None) -> List[Dict[str, Any]]:
+        return self._collection(collection_name).search(vector, k, payload_filter)
+
+    def count(self, collection_name: str) -> int:
+        return len(self._collection(collection_name))
+
+    def scroll(self, collection_name, batch_size=1000):
+        collection = self._collection(collection_name)
+        with collection._lock:
+            points = [(point_id, collection._payloads[row]) for point_id, row in collection._rows.items()]
+        for start in range(0, len(points), batch_size):
+            batch = points[start:start + batch_size]
+            yield [point_id for point_id, _ in batch], [payload for _, payload in batch]
+
+    def collection_info(self, collection_name: str) -> Dict[str, Any]:
+        collection = self._collection(collection_name)
+        return {
+            "points": len(collection),
+            "indexed_vectors": collection._hnsw.element_count if collection._hnsw is not None else 0,
+            "segments": 1,
+            **collection.memory_usage(),
+            "storage": asdict(collection.storage)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+
+
+def create_vector_backend(kind: Optional[str] = None) -> VectorBackend:
+    """
+    설정에 따른 벡터 백엔드 생성
+
+    Args:
+        kind: qdrant, local 또는 auto (Qdrant에 연결할 수 없으면 로컬 인덱스 사용)
+    """
+    kind = kind or settings.VECTOR_BACKEND
+
+    def local() -> LocalVectorBackend:
+        return LocalVectorBackend(
+            directory=settings.LOCAL_VECTOR_INDEX_DIR or None,
+            hnsw_threshold=settings.LOCAL_VECTOR_HNSW_THRESHOLD
+        )
+
+    if kind == "local":
+        return local()
+    if kind == "qdrant":
+        return QdrantBackend()
+    if kind != "auto":
+        raise ValueError(f"지원되지 않는 벡터 백엔드: {kind}")
+
+    try:
+        backend = QdrantBackend()
+        backend.list_collections()
+        return backend
+    except Exception as e:
+        logger.warning(f"Qdrant 연결 실패, 로컬 벡터 인덱스 사용: {e}")
+        return local()
@@ -1,44 +1,63 @@
 """
-서울아산병원 AI 플랫폼 - Qdrant 벡터 스토어
+서울아산병원 AI 플랫폼 - 벡터 스토어 (Qdrant 또는 로컬 인덱스)
 의료 문서 임베딩 및 검색을 위한 벡터 데이터베이스 관리
 """
-import qdrant_client
-from qdrant_client.http import models
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 import os
-import uuid
+import heapq
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from backend.app.core.config import settings
+from ..core.config import settings
+from .collection_stats import CollectionStatsCache
+from .embedding_service import close_embedding_services, get_embedding_service
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+from .index_manifest import (
+    IndexManifest, chunk_point_id, document_fingerprint, document_id_of, metadata_hash, plan_document_update
+)
+from .vector_backends import (
+    STORAGE_PROFILES, CollectionSpec, PayloadFilter, create_vector_backend
+)
 
 logger = logging.getLogger(__name__)
 
+# 컬렉션 프로비저닝 명세
+# 설정을 바꿀 때는 version을 올리면 시작시 기존 컬렉션의 HNSW/payload 인덱스/저장 프로필이 마이그레이션됨
+COLLECTION_SPECS = [
+    CollectionSpec('medical_documents', payload_m=16),
+    CollectionSpec('clinical_guidelines', payload_m=16),
+    CollectionSpec('research_papers', payload_m=16),
+    # 환자 기록은 다른 컬렉션보다 훨씬 크므로 int8 양자화 벡터만 RAM에 두고 원본으로 재채점
+    CollectionSpec('patient_records', version=2, payload_m=16, hnsw_ef_construct=128, search_ef=128,
+                   storage=STORAGE_PROFILES['scalar']),
+    CollectionSpec('drug_information', payload_m=16)
+]
+
 class MedicalVectorStore:
-    """의료 데이터용 Qdrant 벡터 스토어 클래스"""
+    """의료 데이터용 벡터 스토어 클래스 (Qdrant 또는 로컬 인덱스 백엔드)"""
     
     def __init__(self, 
-                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"):
+                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 backend: Optional[str] = None):
         """
-        Qdrant 벡터 스토어 초기화
+        벡터 스토어 초기화
         
         Args:
             embedding_model: 임베딩 모델명
+            backend: 벡터 백엔드 (auto/qdrant/local, 기본값은 VECTOR_BACKEND 설정)
         """
         self.embedding_model_name = embedding_model
         
-        # Qdrant 클라이언트 설정
-        self.client = qdrant_client.QdrantClient(url=settings.QDRANT_URL)
+        # 벡터 백엔드 설정 (auto는 Qdrant 연결 실패시 프로세스 내 인덱스 사용)
+        self.backend = create_vector_backend(backend)
         
-        # 임베딩 모델 설정
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=embedding_model,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        self.embedding_size = self.embeddings.client.get_sentence_embedding_dimension()
+        # 임베딩 모델 설정 (GraphRAG와 공유하는 캐시 기반 임베딩 서비스)
+        self.upsert_batch_size = settings.VECTOR_UPSERT_BATCH_SIZE
+        self.embeddings = get_embedding_service(embedding_model)
+        self.embedding_size = self.embeddings.dimension
         
         # 텍스트 분할기 설정
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -48,107 +67,208 @@ class MedicalVectorStore:
             separators=["\n\n", "\n", " ", ""]
         )
         
+        # 문서별 색인 상태 (재색인시 변경분만 처리)
+        self.manifest = IndexManifest(settings.VECTOR_MANIFEST_PATH or None)
+        
+        # 하이브리드 검색용 BM25 색인 (벡터 컬렉션과 같은 청크를 유지)
+        self.lexical_index = LexicalIndex(settings.LEXICAL_INDEX_DIR or None)
+        
         # 컬렉션 이름 목록
-        self.collection_names = [
-            'medical_documents',
-            'clinical_guidelines',
-            'research_papers',
-            'patient_records',
-            'drug_information'
-        ]
+        self.collection_specs = {spec.name: spec for spec in COLLECTION_SPECS}
+        self.collection_names = list(self.collection_specs)
+        
+        # 컬렉션 통계 캐시 (쓰기 경로에서 증분 반영, 조회는 TTL 주기로만 백엔드 호출)
+        self.stats_cache = CollectionStatsCache(self.collection_names)
+        
+        # 컬렉션별 검색을 동시에 수행하기 위한 스레드 풀
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=len(self.collection_names),
+            thread_name_prefix="vector-search"
+        )
         
         self._initialize_collections()
     
     def _initialize_collections(self):
-        """벡터 스토어 컬렉션들 초기화"""
-        try:
-            existing_collections = [col.name for col in self.client.get_collections().collections]
-            for collection_name in self.collection_names:
-                if collection_name in existing_collections:
-                    logger.info(f"기존 컬렉션 로드됨: {collection_name}")
-                else:
-                    self.client.create_collection(
-                        collection_name=collection_name,
-                        vectors_config=models.VectorParams(
-                            size=self.embedding_size,
-                            distance=models.Distance.COSINE
-                        )
-                    )
-                    logger.info(f"새 컬렉션 생성됨: {collection_name}")
-                
-        except Exception as e:
-            logger.error(f"컬렉션 초기화 오류: {e}")
+        """벡터 스토어 컬렉션들 초기화 (명세 버전이 올라간 컬렉션은 마이그레이션하고 색인 매니페스트를 점검)"""
+        messages = {
+            'created': "새 컬렉션 생성됨",
+            'migrated': "컬렉션 설정 마이그레이션됨",
+            'unchanged': "기존 컬렉션 로드됨"
+        }
+        for spec in self.collection_specs.values():
+            try:
+                action = self.backend.ensure_collection(spec, self.embedding_size)
+                logger.info(f"{messages[action]}: {spec.name} (v{spec.version})")
+                self._check_manifest(spec.name)
+            except Exception as e:
+                logger.error(f"컬렉션 초기화 오류 ({spec.name}): {e}")
     
     def add_documents(self, 
                      documents: List[Dict[str, Any]], 
-                     collection_name: str = 'medical_documents') -> List[str]:
+                     collection_name: str = 'medical_documents',
+                     prune_missing: bool = False) -> List[str]:
         """
-        문서들을 벡터 스토어에 추가
+        문서들을 벡터 스토어에 추가 (재실행해도 같은 결과가 되는 증분 색인)
+        
+        청크 ID는 (문서 ID, 청크 순번, 청크 내용 해시)로 결정되며, 색인 매니페스트와 비교해 지문이 같은 문서는
+        건너뛰고 바뀐 청크만 임베딩/upsert한 뒤 더 이상 존재하지 않는 청크를 삭제함
+        upsert는 배치 단위로 임베딩하고 (변경 없는 청크는 캐시 적중), 중간 배치는 wait=False로
+        전송해 백엔드 색인과 다음 배치 인코딩이 겹치도록 함 (마지막 배치만 반영을 기다림)
         
         Args:
-            documents: 추가할 문서들 리스트
+            documents: 추가할 문서들 리스트 (id가 있으면 문서 ID로 사용)
             collection_name: 대상 컬렉션명
+            prune_missing: True면 이번 목록에 없는 기존 문서를 컬렉션에서 삭제 (전체 재색인용)
             
         Returns:
-            추가된 문서들의 ID 리스트
+            upsert된 청크들의 ID 리스트
         """
         try:
             if collection_name not in self.collection_names:
                 raise ValueError(f"지원되지 않는 컬렉션: {collection_name}")
+            
+            self._check_manifest(collection_name)
 
-            points_to_upsert = []
             ids = []
+            payloads = []
+            new_points = 0
+            stale_ids = set()
+            manifest_updates = []
+            seen_documents = set()
+            created_at = datetime.now().isoformat()
 
             for doc in documents:
-                doc_text = doc.get('content', '')
-                chunks = self.text_splitter.split_text(doc_text)
+                document_id = document_id_of(doc)
+                seen_documents.add(document_id)
+                fingerprint = document_fingerprint(doc)
+                entry = self.manifest.get(collection_name, document_id)
+                if entry is not None and entry['fingerprint'] == fingerprint:
+                    continue
+                
+                chunks = self.text_splitter.split_text(doc.get('content', ''))
+                chunk_ids = [chunk_point_id(document_id, i, chunk) for i, chunk in enumerate(chunks)]
+                metadata = metadata_hash(doc)
+                changed, stale = plan_document_update(entry, chunk_ids, metadata)
+                stale_ids.update(stale)
+                manifest_updates.append((document_id, fingerprint, metadata, chunk_ids))
+                previous = set(entry['chunk_ids']) if entry else set()
+                new_points += sum(1 for i in changed if chunk_ids[i] not in previous)
                 
-                for i, chunk in enumerate(chunks):
-                    doc_id = str(uuid.uuid4())
-                    ids.append(doc_id)
-                    
-                    metadata = {
+                for i in changed:
+                    ids.append(chunk_ids[i])
+                    payloads.append({
+                        'document_id': document_id,
                         'source': doc.get('source', 'unknown'),
                         'title': doc.get('title', ''),
-                        'content': chunk, # 페이로드에 원문 저장
+                        'content': chunks[i], # 페이로드에 원문 저장
                         'document_type': doc.get('type', 'general'),
                         'chunk_index': i,
                         'total_chunks': len(chunks),
-                        'created_at': datetime.now().isoformat(),
+                        'created_at': created_at,
                         'hospital_department': doc.get('department', ''),
                         'medical_specialty': doc.get('specialty', ''),
                         'confidence_level': doc.get('confidence', 1.0)
-                    }
-                    
-                    points_to_upsert.append(
-                        models.PointStruct(
-                            id=doc_id,
-                            payload=metadata,
-                            vector=self.embeddings.embed_query(chunk)
-                        )
-                    )
+                    })
 
-            if not points_to_upsert:
-                return []
+            removed_documents = []
+            if prune_missing:
+                removed_documents = [
+                    document_id for document_id in self.manifest.documents(collection_name)
+                    if document_id not in seen_documents
+                ]
+                for document_id in removed_documents:
+                    stale_ids.update(self.manifest.get(collection_name, document_id)['chunk_ids'])
 
-            self.client.upsert(
-                collection_name=collection_name,
-                points=points_to_upsert,
-                wait=True
-            )
+            batch_size = self.upsert_batch_size
+            for start in range(0, len(payloads), batch_size):
+                end = start + batch_size
+                batch_payloads = payloads[start:end]
+                vectors = self.embeddings.embed_many([payload['content'] for payload in batch_payloads])
+                
+                self.backend.upsert(
+                    collection_name,
+                    ids[start:end],
+                    vectors,
+                    batch_payloads,
+                    wait=end >= len(payloads)
+                )
+                self.lexical_index.add(collection_name, ids[start:end], batch_payloads)
             
-            logger.info(f"{len(points_to_upsert)}개 포인트를 {collection_name}에 추가함")
+            # 새 청크가 반영된 뒤에 이전 청크를 삭제해 검색 공백이 생기지 않도록 함
+            if stale_ids:
+                self.backend.delete(collection_name, sorted(stale_ids))
+                self.lexical_index.delete(collection_name, list(stale_ids))
+            self.stats_cache.record_write(collection_name, added=new_points, deleted=len(stale_ids))
+            
+            if manifest_updates or removed_documents:
+                self.lexical_index.save(collection_name)
+                for document_id, fingerprint, metadata, chunk_ids in manifest_updates:
+                    self.manifest.set(collection_name, document_id, fingerprint, metadata, chunk_ids)
+                for document_id in removed_documents:
+                    self.manifest.remove(collection_name, document_id)
+                self.manifest.save()
+            
+            logger.info(
+                f"{collection_name}: 문서 {len(manifest_updates)}개 변경, "
+                f"{len(payloads)}개 포인트 upsert, {len(stale_ids)}개 포인트 삭제"
+            )
             return ids
             
         except Exception as e:
             logger.error(f"문서 추가 오류: {e}")
             return []
     
+    def delete_documents(self, document_ids: List[str], collection_name: str = 'medical_documents') -> int:
+        """
+        문서의 모든 청크를 컬렉션에서 삭제
+        
+        Returns:
+            삭제된 포인트 수
+        """
+        try:
+            self._check_manifest(collection_name)
+            entries = [self.manifest.get(collection_name, document_id) for document_id in document_ids]
+            point_ids = [chunk_id for entry in entries if entry for chunk_id in entry['chunk_ids']]
+            if point_ids:
+                self.backend.delete(collection_name, point_ids)
+                self.lexical_index.delete(collection_name, point_ids)
+                self.lexical_index.save(collection_name)
+                self.stats_cache.record_write(collection_name, deleted=len(point_ids))
+            for document_id in document_ids:
+                self.manifest.remove(collection_name, document_id)
+            self.manifest.save()
+            return len(point_ids)
+        
+        except Exception as e:
+            logger.error(f"문서 삭제 오류: {e}")
+            return 0
+    
+    def _check_manifest(self, collection_name: str):
+        """
+        색인 매니페스트를 실제 색인 상태와 맞춤
+        
+        - 벡터 컬렉션이 비어 있으면 (메모리 인덱스 재시작 등) 매니페스트와 BM25 색인을 초기화해
+          다음 add_documents에서 전체 청크가 다시 upsert되도록 함 (임베딩은 캐시 적중)
+        - 벡터 컬렉션은 그대로인데 BM25 색인만 비어 있으면 (스냅샷 유실) 백엔드 payload로 BM25 색인만 재구성
+        """
+        if not self.manifest.documents(collection_name):
+            return
+        if self.backend.count(collection_name) == 0:
+            logger.warning(f"{collection_name} 벡터 컬렉션이 비어 있어 색인 매니페스트를 초기화함")
+            self.manifest.reset(collection_name)
+            self.lexical_index.reset(collection_name)
+        elif self.lexical_index.count(collection_name) == 0:
+            logger.warning(f"{collection_name} BM25 색인이 비어 있어 벡터 컬렉션 payload로 재구성함")
+            for ids, payloads in self.backend.scroll(collection_name):
+                self.lexical_index.add(collection_name, ids, payloads)
+            self.lexical_index.save(collection_name)
+    
     def similarity_search(self, 
                          query: str, 
                          collection_name: str = 'medical_documents',
                          k: int = 5,
-                         filter_criteria: Optional[models.Filter] = None) -> List[Dict[str, Any]]:
+                         filter_criteria: Optional[PayloadFilter] = None,
+                         mode: str = 'dense') -> List[Dict[str, Any]]:
         """
         유사도 검색 수행
         
@@ -156,35 +276,31 @@ class MedicalVectorStore:
             query: 검색 쿼리
             collection_name: 검색할 컬렉션명  
             k: 반환할 결과 수
-            filter_criteria: 메타데이터 필터링 조건
+            filter_criteria: 메타데이터 필터링 조건 (payload 필드 → 일치해야 하는 값)
+            mode: dense(벡터) / lexical(BM25) / hybrid(둘을 동시에 수행해 RRF로 결합)
             
         Returns:
-            검색 결과 리스트
+            검색 결과 리스트 (hybrid는 score가 RRF 점수이고 방식별 순위가 'ranks'에 기록됨)
         """
         try:
             if collection_name not in self.collection_names:
                 raise ValueError(f"지원되지 않는 컬렉션: {collection_name}")
             
-            query_vector = self.embeddings.embed_query(query)
-            
-            # 검색 수행
-            hits = self.client.search(
-                collection_name=collection_name,
-                query_vector=query_vector,
-                query_filter=filter_criteria,
-                limit=k
-            )
-            
-            # 결과 정리
-            search_results = [
-                {
-                    'content': hit.payload.get('content', ''),
-                    'metadata': hit.payload,
-                    'id': hit.id,
-                    'score': hit.score
-                }
-                for hit in hits
-            ]
+            if mode == 'lexical':
+                search_results = self._search_lexical(query, collection_name, k, filter_criteria)
+            elif mode == 'hybrid':
+                depth = k * settings.HYBRID_CANDIDATE_MULTIPLIER
+                # BM25는 워커 스레드에서, 쿼리 임베딩과 벡터 검색은 현재 스레드에서 동시에 수행
+                lexical = self._search_executor.submit(
+                    self._search_lexical, query, collection_name, depth, filter_criteria
+                )
+                dense = self._search_vector(self.embeddings.embed_query(query), collection_name, depth, filter_criteria)
+                search_results = reciprocal_rank_fusion({'dense': dense, 'lexical': lexical.result()}, k)
+            elif mode == 'dense':
+                query_vector = self.embeddings.embed_query(query)
+                search_results = self._search_vector(query_vector, collection_name, k, filter_criteria)
+            else:
+                raise ValueError(f"지원되지 않는 검색 방식: {mode}")
             
             logger.info(f"검색 완료: {len(search_results)}개 결과 반환")
             return search_results
@@ -193,6 +309,38 @@ class MedicalVectorStore:
             logger.error(f"검색 오류: {e}")
             return []
     
+    def _search_vector(self,
+                       query_vector: List[float],
+                       collection_name: str,
+                       k: int,
+                       filter_criteria: Optional[PayloadFilter] = None) -> List[Dict[str, Any]]:
+        """이미 임베딩된 쿼리 벡터로 컬렉션 하나를 검색"""
+        hits = self.backend.search(collection_name, query_vector, k, filter_criteria)
+        return self._to_results(hits, collection_name)
+    
+    def _search_lexical(self,
+                        query: str,
+                        collection_name: str,
+                        k: int,
+                        filter_criteria: Optional[PayloadFilter] = None) -> List[Dict[str, Any]]:
+        """BM25 색인으로 컬렉션 하나를 검색"""
+        hits = self.lexical_index.search(collection_name, query, k, filter_criteria)
+        return self._to_results(hits, collection_name)
+    
+    @staticmethod
+    def _to_results(hits: List[Dict[str, Any]], collection_name: str) -> List[Dict[str, Any]]:
+        """백엔드 검색 결과를 API 응답 형태로 정리"""
+        return [
+            {
+                'content': hit['payload'].get('content', ''),
+                'metadata': hit['payload'],
+                'id': hit['id'],
+                'score': hit['score'],
+                'collection': collection_name
+            }
+            for hit in hits
+        ]
+    
     def add_medical_knowledge(self, knowledge_base: List[Dict[str, Any]]):
         """
         의료 지식베이스 데이터 추가
@@ -226,21 +374,41 @@ class MedicalVectorStore:
         except Exception as e:
             logger.error(f"의료 지식베이스 추가 오류: {e}")
     
-    def get_collection_stats(self) -> Dict[str, int]:
-        """각 컬렉션의 문서 수 반환"""
-        stats = {}
-        try:
+    def get_collection_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        각 컬렉션의 포인트/색인 벡터/세그먼트 수, RAM/디스크 사용량, 저장 프로필과 적재 속도 반환
+        
+        캐시가 TTL 안이면 백엔드를 호출하지 않음
+        """
+        if not self.stats_cache.refreshing and self.stats_cache.is_stale():
             for name in self.collection_names:
                 try:
-                    count = self.client.get_collection(collection_name=name).points_count
-                    stats[name] = count
-                except Exception:
-                     stats[name] = 0
-        except Exception as e:
-            logger.error(f"통계 조회 오류: {e}")
-            stats = {name: 0 for name in self.collection_names}
+                    self.stats_cache.update(name, self.backend.collection_info(name))
+                except Exception as e:
+                    logger.error(f"통계 조회 오류 ({name}): {e}")
+        
+        return self.stats_cache.snapshot()
+    
+    @staticmethod
+    def _collections_for_user(user_type: str) -> List[str]:
+        """사용자 유형별 컬렉션 우선순위"""
+        if user_type == 'doctor':
+            return ['clinical_guidelines', 'medical_documents', 'drug_information']
+        elif user_type == 'researcher':
+            return ['research_papers', 'medical_documents', 'clinical_guidelines']
+        else:  # patient
+            return ['medical_documents', 'drug_information']
+    
+    @staticmethod
+    def _context_filter(department: Optional[str], specialty: Optional[str]) -> Optional[PayloadFilter]:
+        """진료과/전문 분야 필터 조건"""
+        filter_conditions = {}
+        if department:
+            filter_conditions['hospital_department'] = department
+        if specialty:
+            filter_conditions['medical_specialty'] = specialty
         
-        return stats
+        return filter_conditions or None
     
     def search_by_medical_context(self, 
                                  query: str, 
@@ -260,52 +428,156 @@ class MedicalVectorStore:
             컨텍스트를 고려한 검색 결과
         """
         try:
-            # 사용자 유형별 컬렉션 우선순위 설정
-            if user_type == 'doctor':
-                collections_to_search = ['clinical_guidelines', 'medical_documents', 'drug_information']
-            elif user_type == 'researcher':
-                collections_to_search = ['research_papers', 'medical_documents', 'clinical_guidelines']
-            else:  # patient
-                collections_to_search = ['medical_documents', 'drug_information']
+            collections_to_search = self._collections_for_user(user_type)
+            payload_filter = self._context_filter(department, specialty)
+            
+            # 쿼리는 한 번만 임베딩하고 컬렉션별 검색은 동시에 수행
+            query_vector = self.embeddings.embed_query(query)
+            
+            def search(collection_name: str) -> List[Dict[str, Any]]:
+                try:
+                    return self._search_vector(query_vector, collection_name, 3, payload_filter)
+                except Exception as e:
+                    logger.error(f"{collection_name} 검색 오류: {e}")
+                    return []
             
-            all_results = []
+            per_collection = self._search_executor.map(search, collections_to_search)
             
-            for collection_name in collections_to_search:
-                # 필터 조건 설정
-                filter_conditions = []
-                if department:
-                    filter_conditions.append(models.FieldCondition(key="hospital_department", match=models.MatchValue(value=department)))
-                if specialty:
-                    filter_conditions.append(models.FieldCondition(key="medical_specialty", match=models.MatchValue(value=specialty)))
+            # 점수(유사도) 기준 상위 결과만 반환 (점수가 높을수록 유사)
+            return heapq.nlargest(
+                10,
+                (result for results in per_collection for result in results),
+                key=lambda x: x.get('score', 0)
+            )
+            
+        except Exception as e:
+            logger.error(f"의료 컨텍스트 검색 오류: {e}")
+            return []
+
+class AsyncMedicalVectorStore:
+    """
+    비동기 벡터 검색 파사드
+    
+    Qdrant 백엔드는 keep-alive 커넥션 풀(또는 gRPC) 기반 비동기 클라이언트로, 로컬 백엔드는
+    프로세스 내에서 바로 검색해 FastAPI 이벤트 루프를 블로킹하지 않으며,
+    임베딩/컬렉션 구성은 동기 스토어와 공유
+    """
+    
+    def __init__(self, store: MedicalVectorStore):
+        """
+        Args:
+            store: 임베딩 서비스, 백엔드와 컬렉션 구성을 제공하는 동기 벡터 스토어
+        """
+        self.store = store
+        self.backend = store.backend
+    
+    async def _embed_query(self, query: str) -> List[float]:
+        # 모델 추론이 필요할 수 있으므로 워커 스레드에서 수행
+        return await asyncio.to_thread(self.store.embeddings.embed_query, query)
+    
+    async def _search_vector(self,
+                             query_vector: List[float],
+                             collection_name: str,
+                             k: int,
+                             filter_criteria: Optional[PayloadFilter] = None) -> List[Dict[str, Any]]:
+        hits = await self.backend.asearch(collection_name, query_vector, k, filter_criteria)
+        return self.store._to_results(hits, collection_name)
+    
+    async def similarity_search(self, 
+                                query: str, 
+                                collection_name: str = 'medical_documents',
+                                k: int = 5,
+                                filter_criteria: Optional[PayloadFilter] = None,
+                                mode: str = 'dense') -> List[Dict[str, Any]]:
+        """유사도 검색 (MedicalVectorStore.similarity_search의 비동기 버전)"""
+        try:
+            if collection_name not in self.store.collection_names:
+                raise ValueError(f"지원되지 않는 컬렉션: {collection_name}")
+            
+            if mode == 'lexical':
+                return await asyncio.to_thread(self.store._search_lexical, query, collection_name, k, filter_criteria)
+            if mode == 'hybrid':
+                depth = k * settings.HYBRID_CANDIDATE_MULTIPLIER
                 
-                qdrant_filter = models.Filter(must=filter_conditions) if filter_conditions else None
+                async def dense() -> List[Dict[str, Any]]:
+                    return await self._search_vector(await self._embed_query(query), collection_name, depth, filter_criteria)
                 
-                # 검색 수행
-                results = self.similarity_search(
-                    query=query,
-                    collection_name=collection_name,
-                    k=3,
-                    filter_criteria=qdrant_filter
+                dense_results, lexical_results = await asyncio.gather(
+                    dense(),
+                    asyncio.to_thread(self.store._search_lexical, query, collection_name, depth, filter_criteria)
                 )
-                
-                # 컬렉션 정보 추가
-                for result in results:
-                    result['collection'] = collection_name
-                
-                all_results.extend(results)
+                return reciprocal_rank_fusion({'dense': dense_results, 'lexical': lexical_results}, k)
+            if mode != 'dense':
+                raise ValueError(f"지원되지 않는 검색 방식: {mode}")
+            
+            query_vector = await self._embed_query(query)
+            return await self._search_vector(query_vector, collection_name, k, filter_criteria)
+            
+        except Exception as e:
+            logger.error(f"검색 오류: {e}")
+            return []
+    
+    async def search_by_medical_context(self, 
+                                        query: str, 
+                                        user_type: str = 'patient',
+                                        department: Optional[str] = None,
+                                        specialty: Optional[str] = None) -> List[Dict[str, Any]]:
+        """의료 컨텍스트를 고려한 검색 (컬렉션별 검색을 동시에 수행)"""
+        try:
+            collections_to_search = self.store._collections_for_user(user_type)
+            payload_filter = self.store._context_filter(department, specialty)
+            query_vector = await self._embed_query(query)
+            
+            per_collection = await asyncio.gather(
+                *(self._search_vector(query_vector, name, 3, payload_filter) for name in collections_to_search),
+                return_exceptions=True
+            )
             
-            # 점수(유사도) 기준으로 정렬 (Qdrant는 점수가 높을수록 유사)
-            all_results.sort(key=lambda x: x.get('score', 0), reverse=True)
+            merged = []
+            for collection_name, results in zip(collections_to_search, per_collection):
+                if isinstance(results, Exception):
+                    logger.error(f"{collection_name} 검색 오류: {results}")
+                    continue
+                merged.extend(results)
             
-            # 상위 결과만 반환
-            return all_results[:10]
+            return heapq.nlargest(10, merged, key=lambda x: x.get('score', 0))
             
         except Exception as e:
             logger.error(f"의료 컨텍스트 검색 오류: {e}")
             return []
+    
+    def start_stats_refresh(self):
+        """컬렉션 통계를 TTL 주기로 백그라운드 갱신 (이벤트 루프 안에서 호출)"""
+        self.store.stats_cache.start(self.backend.acollection_info)
+    
+    async def get_collection_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        캐시된 컬렉션 통계 반환
+        
+        백그라운드 갱신이 동작 중이면 백엔드를 호출하지 않고, 아니면 TTL이 지난 경우에만 조회
+        """
+        cache = self.store.stats_cache
+        if not cache.refreshing and cache.is_stale():
+            await cache.refresh(self.backend.acollection_info)
+        return cache.snapshot()
+    
+    async def close(self):
+        """통계 갱신 중지 및 백엔드 자원(커넥션 풀, 로컬 인덱스 파일) 정리"""
+        await self.store.stats_cache.stop()
+        await self.backend.aclose()
 
 # 전역 벡터 스토어 인스턴스
 medical_vector_store = MedicalVectorStore()
+async_medical_vector_store = AsyncMedicalVectorStore(medical_vector_store)
+
+async def close_vector_store():
+    """
+    서버 종료시 정리: 통계 갱신/백엔드 자원과 임베딩 서비스(인코딩 풀, 디스크 캐시)
+    
+    임베딩 서비스는 이 모듈이 서비스를 받아온 레지스트리에서 닫으므로 스토어가 쓰던 서비스가 확실히 정리됨
+    """
+    await async_medical_vector_store.close()
+    close_embedding_services()
 
 # 샘플 의료 지식베이스 데이터
 SAMPLE_MEDICAL_KNOWLEDGE = [
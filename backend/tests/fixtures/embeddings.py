@@ -0,0 +1,27 @@
+"""
+Embedding Test Fixtures
+모델 없이 쓰는 결정적 임베더 (문자 bigram 해시)
+"""
+import zlib
+
+import numpy as np
+
+# MedicalVectorStore/MedicalGraphRAG 기본 임베딩 모델 (임베딩 서비스 레지스트리 키)
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class BigramEncoder:
+    """문자 bigram 해시 벡터를 반환하고 인코딩한 텍스트를 기록하는 임베더"""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for i in range(len(text) - 1):
+                vectors[row, zlib.crc32(text[i:i + 2].encode("utf-8")) % self.dim] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
@@ -0,0 +1,99 @@
+"""
+Integration Tests for Neo4j Graph Store
+로컬 Neo4j(docker-compose neo4j 서비스)에 배치 적재 후 벡터 인덱스 검색 테스트
+Neo4j 드라이버가 없거나 서버에 연결할 수 없으면 건너뜀
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.services.compact_graph import CompactGraph
+from app.services.graph_builder import PartialGraph
+from app.services.neo4j_graph_store import Neo4jGraphStore
+
+pytest.importorskip("neo4j")
+
+
+@pytest.fixture
+def store():
+    store = Neo4jGraphStore(
+        url=os.getenv("NEO4J_TEST_URL", "neo4j://localhost:7687"),
+        username=os.getenv("NEO4J_TEST_USERNAME", "neo4j"),
+        password=os.getenv("NEO4J_TEST_PASSWORD", "secure_password"),
+        label="TestEntity",
+        index_name="test_entity_embedding",
+        batch_size=2
+    )
+    try:
+        store.connect()
+    except Exception as e:
+        pytest.skip(f"Neo4j에 연결할 수 없음: {e}")
+    store.clear()
+    yield store
+    store.clear()
+    store.close()
+
+
+@pytest.fixture
+def graph():
+    partial = PartialGraph()
+    for key, confidence in (('Drug:메트포르민', 0.8), ('Disease:당뇨병', 0.8),
+                            ('Symptom:다뇨', 0.8), ('Disease:고혈압', 0.5)):
+        partial.nodes[key] = {'type': key.split(':')[0], 'name': key.split(':')[1], 'context': '',
+                              'confidence': confidence, 'count': 1, 'mentions': []}
+    partial.edges[('Drug:메트포르민', 'Disease:당뇨병', 'TREATS')] = {'confidence': 0.7, 'count': 3, 'mentions': []}
+    partial.edges[('Drug:메트포르민', 'Disease:당뇨병', 'PRESCRIBED_FOR')] = {'confidence': 0.9, 'count': 1, 'mentions': []}
+    partial.edges[('Drug:메트포르민', 'Disease:고혈압', 'TREATS')] = {'confidence': 0.7, 'count': 1, 'mentions': []}
+    partial.edges[('Disease:당뇨병', 'Symptom:다뇨', 'SYMPTOMS_OF')] = {'confidence': 0.8, 'count': 1, 'mentions': []}
+    return CompactGraph.from_partial(partial)
+
+
+def wait_for_index(store, embedding, expected, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        results = store.search(embedding, expected)
+        if len(results) == expected:
+            return results
+        time.sleep(0.5)
+    pytest.fail("벡터 인덱스가 시간 내에 채워지지 않음")
+
+
+class TestNeo4jGraphStore:
+    """Neo4j 그래프 저장소 통합 테스트 클래스"""
+
+    @pytest.mark.integration
+    def test_should_bulk_load_and_search_in_one_query(self, store, graph, tdd_case):
+        tdd_case.given("배치 크기 2로 Neo4j에 적재한 압축 그래프")
+        embeddings = np.eye(4, 8, dtype=np.float32)
+        store.ensure_schema(8)
+        written = store.write_graph(graph, embeddings)
+        store.write_graph(graph, embeddings)  # 다시 적재해도 MERGE라 중복 없음
+
+        tdd_case.when("메트포르민 임베딩으로 검색함")
+        drug = graph.index_of('Drug:메트포르민')
+        wait_for_index(store, embeddings[drug], 4)
+        results = store.search(embeddings[drug], 1)
+
+        tdd_case.then("유사 엔티티와 이웃별 최다 언급 관계가 메모리 그래프와 같은 형식으로 반환됨")
+        assert written == {'nodes': 4, 'edges': 4}
+        assert store.counts() == {'nodes': 4, 'edges': 4}
+        assert results[0]['entity_id'] == 'Drug:메트포르민'
+        assert results[0]['similarity'] == pytest.approx(1.0, abs=1e-4)
+        assert [(n['entity']['name'], n['relation']['type'], n['relation']['count'])
+                for n in results[0]['neighbors']] == [('당뇨병', 'TREATS', 3), ('고혈압', 'TREATS', 1)]
+
+    @pytest.mark.integration
+    def test_should_filter_by_type_and_confidence(self, store, graph, tdd_case):
+        tdd_case.given("적재된 그래프")
+        embeddings = np.ones((4, 8), dtype=np.float32) + np.eye(4, 8, dtype=np.float32)
+        store.ensure_schema(8)
+        store.write_graph(graph, embeddings)
+        wait_for_index(store, embeddings[0], 4)
+
+        tdd_case.when("Disease 유형, 신뢰도 0.6 초과로 검색함")
+        results = store.search(embeddings[0], 4, types=['Disease'], min_confidence=0.6)
+
+        tdd_case.then("조건을 만족하는 엔티티만 반환됨")
+        assert [result['entity_id'] for result in results] == ['Disease:당뇨병']
@@ -0,0 +1,85 @@
+"""
+Unit Tests for Collection Stats Cache
+컬렉션 통계 캐시 테스트
+"""
+import asyncio
+
+import pytest
+
+from app.services.collection_stats import CollectionStatsCache
+
+
+class CountingFetcher:
+    """호출 횟수를 기록하는 통계 조회 함수"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, name):
+        self.calls.append(name)
+        if name == "broken":
+            raise ConnectionError("timeout")
+        return {"points": 100, "indexed_vectors": 90, "segments": 2,
+                "ram_bytes": 1000, "disk_bytes": 4000, "storage": None}
+
+
+class TestCollectionStatsCache:
+    """컬렉션 통계 캐시 테스트 클래스"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_apply_writes_incrementally(self, tdd_case):
+        tdd_case.given("한 번 갱신된 통계 캐시")
+        fetch = CountingFetcher()
+        cache = CollectionStatsCache(["medical_documents"], ttl=60, rate_window=10)
+        await cache.refresh(fetch)
+
+        tdd_case.when("포인트 20개 추가, 10개 삭제를 기록함")
+        cache.record_write("medical_documents", added=20, deleted=10)
+        stats = cache.snapshot()["medical_documents"]
+
+        tdd_case.then("백엔드 재조회 없이 포인트 수와 추정 사용량, 적재 속도가 반영됨")
+        assert fetch.calls == ["medical_documents"]
+        assert stats["points"] == 110
+        assert stats["ram_bytes"] == 1100
+        assert stats["disk_bytes"] == 4400
+        assert stats["indexed_vectors"] == 90
+        assert stats["ingest_rate"] == pytest.approx(2.0)
+        assert stats["delete_rate"] == pytest.approx(1.0)
+        assert not cache.is_stale()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_keep_previous_stats_on_fetch_failure(self, tdd_case):
+        tdd_case.given("조회가 실패하는 컬렉션이 포함된 캐시")
+        fetch = CountingFetcher()
+        cache = CollectionStatsCache(["medical_documents", "broken"], ttl=60)
+
+        tdd_case.when("갱신함")
+        await cache.refresh(fetch)
+        snapshot = cache.snapshot()
+
+        tdd_case.then("성공한 컬렉션만 교체되고 실패한 컬렉션은 기본값과 함께 stale로 남음")
+        assert snapshot["medical_documents"]["points"] == 100
+        assert snapshot["broken"]["points"] == 0
+        assert snapshot["broken"]["refreshed_at"] is None
+        assert cache.is_stale()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_refresh_in_background_on_ttl(self, tdd_case):
+        tdd_case.given("TTL이 짧은 캐시")
+        fetch = CountingFetcher()
+        cache = CollectionStatsCache(["medical_documents"], ttl=0.01)
+
+        tdd_case.when("백그라운드 갱신을 시작하고 잠시 기다린 뒤 중지함")
+        cache.start(fetch)
+        await asyncio.sleep(0.05)
+        await cache.stop()
+        calls = len(fetch.calls)
+        await asyncio.sleep(0.03)
+
+        tdd_case.then("주기적으로 갱신되다가 중지 후에는 더 이상 조회하지 않음")
+        assert calls >= 2
+        assert len(fetch.calls) == calls
+        assert not cache.refreshing
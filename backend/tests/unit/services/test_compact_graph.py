@@ -0,0 +1,106 @@
+"""
+Unit Tests for Compact Graph
+CSR 인접 배열 기반 압축 그래프 테스트
+"""
+import pytest
+
+from app.services.compact_graph import CompactGraph
+from app.services.graph_builder import PartialGraph
+
+
+def node(entity_type, name, context, count, mentions):
+    return {'type': entity_type, 'name': name, 'context': context, 'confidence': 0.8,
+            'count': count, 'mentions': mentions}
+
+
+def edge(count, confidence, mentions):
+    return {'confidence': confidence, 'count': count, 'mentions': mentions}
+
+
+@pytest.fixture
+def partial():
+    graph = PartialGraph()
+    shared_context = "메트포르민은 당뇨병 치료의 1차 약물입니다."
+    graph.nodes['Drug:메트포르민'] = node('Drug', '메트포르민', shared_context, 2, [('doc_a', 0), ('doc_b', 3)])
+    graph.nodes['Disease:당뇨병'] = node('Disease', '당뇨병', shared_context, 1, [('doc_a', 0)])
+    graph.nodes['Disease:고혈압'] = node('Disease', '고혈압', "고혈압은 위험 인자입니다.", 1, [('doc_b', 1)])
+    graph.nodes['Symptom:다뇨'] = node('Symptom', '다뇨', "다뇨는 증상입니다.", 1, [('doc_c', 0)])
+    graph.edges[('Drug:메트포르민', 'Disease:고혈압', 'TREATS')] = edge(1, 0.7, [('doc_b', 1)])
+    graph.edges[('Drug:메트포르민', 'Disease:당뇨병', 'TREATS')] = edge(4, 0.7, [('doc_a', 0)] * 4)
+    graph.edges[('Drug:메트포르민', 'Disease:당뇨병', 'PRESCRIBED_FOR')] = edge(2, 0.9, [('doc_a', 0)] * 2)
+    graph.edges[('Disease:당뇨병', 'Symptom:다뇨', 'SYMPTOMS_OF')] = edge(1, 0.8, [('doc_c', 0)])
+    return graph
+
+
+class TestCompactGraph:
+    """압축 그래프 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_expand_neighbors_by_mention_count(self, partial, tdd_case):
+        tdd_case.given("여러 관계로 연결된 이웃이 있는 압축 그래프")
+        graph = CompactGraph.from_partial(partial)
+
+        tdd_case.when("메트포르민의 이웃을 조회함")
+        neighbors = graph.neighbors(graph.index_of('Drug:메트포르민'))
+
+        tdd_case.then("이웃별로 가장 많이 언급된 관계 하나씩, 언급 횟수 순으로 반환됨")
+        assert [(n['entity']['name'], n['relation']['type'], n['relation']['count']) for n in neighbors] == [
+            ('당뇨병', 'TREATS', 4),
+            ('고혈압', 'TREATS', 1)
+        ]
+        assert graph.neighbors(graph.index_of('Drug:메트포르민'), limit=1)[0]['entity']['name'] == '당뇨병'
+        assert graph.neighbors(graph.index_of('Symptom:다뇨')) == []
+
+    @pytest.mark.unit
+    def test_should_store_columns_with_interned_codes(self, partial, tdd_case):
+        tdd_case.given("부분 그래프")
+
+        tdd_case.when("압축 그래프로 고정함")
+        graph = CompactGraph.from_partial(partial)
+
+        tdd_case.then("유형/관계는 코드로, 같은 컨텍스트는 풀에서 공유되고 통계가 배열에서 계산됨")
+        assert graph.number_of_nodes() == 4
+        assert graph.number_of_edges() == 4
+        assert graph.type_counts() == {'Disease': 2, 'Drug': 1, 'Symptom': 1}
+        assert graph.relation_counts() == {'PRESCRIBED_FOR': 1, 'SYMPTOMS_OF': 1, 'TREATS': 2}
+        assert len(graph.pools['contexts']) == 3
+        assert graph.node(graph.index_of('Disease:당뇨병')) == {
+            'type': 'Disease', 'name': '당뇨병', 'context': "메트포르민은 당뇨병 치료의 1차 약물입니다.",
+            'confidence': 0.8, 'mention_count': 1
+        }
+        assert graph.mentions(graph.index_of('Drug:메트포르민')) == [('doc_a', 0), ('doc_b', 3)]
+        assert 'Disease:없음' not in graph
+
+    @pytest.mark.unit
+    def test_should_round_trip_through_partial_graph(self, partial, tdd_case):
+        tdd_case.given("압축 그래프")
+        graph = CompactGraph.from_partial(partial)
+
+        tdd_case.when("가변 부분 그래프로 되돌려 새 언급을 합친 뒤 다시 고정함")
+        thawed = graph.to_partial()
+        update = PartialGraph()
+        update.nodes['Disease:당뇨병'] = node('Disease', '당뇨병', "새 컨텍스트", 1, [('doc_d', 2)])
+        thawed.merge(update)
+        rebuilt = CompactGraph.from_partial(thawed)
+
+        tdd_case.then("기존 간선과 언급 출처/컨텍스트가 보존되고 새 언급만 누적됨")
+        assert graph.to_partial().edges == partial.edges
+        diabetes = rebuilt.index_of('Disease:당뇨병')
+        assert rebuilt.node(diabetes)['mention_count'] == 2
+        assert rebuilt.node(diabetes)['context'] == "메트포르민은 당뇨병 치료의 1차 약물입니다."
+        assert rebuilt.mentions(diabetes) == [('doc_a', 0), ('doc_d', 2)]
+        assert rebuilt.mention_contexts(diabetes) == ["메트포르민은 당뇨병 치료의 1차 약물입니다.", "새 컨텍스트"]
+        assert rebuilt.number_of_edges() == 4
+
+    @pytest.mark.unit
+    def test_should_build_empty_graph(self, tdd_case):
+        tdd_case.given("빈 부분 그래프")
+
+        tdd_case.when("빈 압축 그래프를 만듦")
+        graph = CompactGraph.empty()
+
+        tdd_case.then("노드/간선 없이 조회가 동작함")
+        assert graph.number_of_nodes() == 0
+        assert graph.number_of_edges() == 0
+        assert graph.type_counts() == {}
+        assert graph.index_of('Drug:약') is None
@@ -0,0 +1,110 @@
+"""
+Unit Tests for Embedding Service
+내용 해시 기반 임베딩 캐시 테스트
+"""
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service import EmbeddingService
+
+
+class CountingEncoder:
+    """호출된 텍스트를 기록하는 결정적 인코더"""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        vectors = np.array(
+            [[(hash(text) >> shift) % 97 + 1 for shift in range(self.dim)] for text in texts],
+            dtype=np.float32
+        )
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestEmbeddingService:
+    """임베딩 서비스 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_encode_only_unseen_texts(self, tdd_case):
+        tdd_case.given("메모리 캐시만 사용하는 임베딩 서비스")
+        encoder = CountingEncoder()
+        service = EmbeddingService(encoder=encoder)
+
+        tdd_case.when("중복이 포함된 텍스트를 두 번 임베딩함")
+        first = service.embed_many(["고혈압", "당뇨병", "고혈압"])
+        second = service.embed_many(["당뇨병", "심전도"])
+
+        tdd_case.then("처음 보는 텍스트만 한 번씩 인코딩되고 같은 텍스트는 같은 벡터를 반환함")
+        assert encoder.calls == [["고혈압", "당뇨병"], ["심전도"]]
+        assert first.shape == (3, 8)
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(first[1], second[0])
+        assert service.stats()["memory_hits"] == 1
+
+    @pytest.mark.unit
+    def test_should_evict_least_recently_used(self, tdd_case):
+        tdd_case.given("메모리 캐시 크기가 2인 임베딩 서비스")
+        encoder = CountingEncoder()
+        service = EmbeddingService(encoder=encoder, memory_cache_size=2)
+
+        tdd_case.when("세 개의 텍스트를 차례로 임베딩한 뒤 첫 텍스트를 다시 요청함")
+        for text in ["a", "b", "c"]:
+            service.embed_query(text)
+        service.embed_query("a")
+
+        tdd_case.then("가장 오래된 항목이 제거되어 다시 인코딩됨")
+        assert encoder.calls[-1] == ["a"]
+        assert service.stats()["memory_entries"] == 2
+
+    @pytest.mark.unit
+    def test_should_reuse_disk_cache_without_encoder(self, tmp_path, tdd_case):
+        tdd_case.given("디스크 캐시에 임베딩을 저장한 서비스")
+        encoder = CountingEncoder()
+        service = EmbeddingService(model_name="test/model", cache_dir=str(tmp_path), encoder=encoder)
+        expected = service.embed_many([f"문서 {i}" for i in range(1500)])
+        service.close()
+
+        tdd_case.when("같은 디렉토리로 서비스를 다시 열어 임베딩을 요청함")
+        reopened_encoder = CountingEncoder()
+        reopened = EmbeddingService(model_name="test/model", cache_dir=str(tmp_path), encoder=reopened_encoder)
+        vectors = reopened.embed_many([f"문서 {i}" for i in range(1500)])
+
+        tdd_case.then("모델 호출 없이 동일한 float16 벡터가 반환됨")
+        assert reopened_encoder.calls == []
+        assert reopened.dimension == 8
+        assert reopened.stats()["disk_hits"] == 1500
+        np.testing.assert_array_equal(vectors, expected)
+        reopened.close()
+
+    @pytest.mark.unit
+    def test_should_load_model_once_under_concurrent_requests(self, monkeypatch, tdd_case):
+        tdd_case.given("로드에 시간이 걸리는 모델과 캐시가 빈 임베딩 서비스")
+        loaded = []
+
+        class SlowEmbeddings:
+            def __init__(self, **kwargs):
+                loaded.append(kwargs["model_name"])
+                time.sleep(0.05)
+
+            def embed_documents(self, texts):
+                return CountingEncoder()(texts)
+
+        monkeypatch.setitem(sys.modules, "langchain_community.embeddings",
+                            types.SimpleNamespace(HuggingFaceEmbeddings=SlowEmbeddings))
+        service = EmbeddingService()
+
+        tdd_case.when("여러 요청이 동시에 처음 임베딩함")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            vectors = list(pool.map(service.embed_query, ["고혈압", "당뇨병", "심전도", "메트포르민"]))
+
+        tdd_case.then("모델은 한 번만 로드되고 모든 요청이 임베딩을 받음")
+        assert len(loaded) == 1
+        assert all(len(vector) == 8 for vector in vectors)
@@ -0,0 +1,78 @@
+"""
+Unit Tests for Entity Embedding Index
+엔티티 임베딩 행렬 검색 테스트
+"""
+import numpy as np
+import pytest
+
+from app.services.entity_index import EntityEmbeddingIndex
+
+
+def random_vectors(count, dim=16, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestEntityEmbeddingIndex:
+    """엔티티 임베딩 인덱스 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_match_brute_force_top_k(self, tdd_case):
+        tdd_case.given("초기 용량보다 많은 엔티티를 여러 번에 나누어 추가한 인덱스")
+        vectors = random_vectors(300)
+        ids = [f"Disease_{i}" for i in range(300)]
+        index = EntityEmbeddingIndex(initial_capacity=8)
+        for start in range(0, 300, 70):
+            index.add_many(ids[start:start + 70], vectors[start:start + 70])
+
+        tdd_case.when("질의 벡터로 상위 5개를 검색함")
+        query = vectors[42] + 0.1 * vectors[7]
+        results = index.search(query, 5)
+
+        tdd_case.then("전수 계산한 코사인 유사도 순위와 같고 용량은 2배씩 늘어남")
+        expected = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:5]
+        assert [entity_id for entity_id, _ in results] == [ids[i] for i in expected]
+        assert results[0][0] == "Disease_42"
+        assert len(index) == 300
+        assert 300 <= index.capacity < 600
+
+    @pytest.mark.unit
+    def test_should_overwrite_and_remove_rows(self, tdd_case):
+        tdd_case.given("엔티티 세 개가 있는 인덱스")
+        vectors = random_vectors(3, dim=4, seed=1)
+        index = EntityEmbeddingIndex()
+        index.add_many(["a", "b", "c"], vectors)
+
+        tdd_case.when("a의 임베딩을 c와 같게 바꾸고 b를 제거함")
+        index.add_many(["a"], [vectors[2] * 3])
+        index.remove_many(["b"])
+
+        tdd_case.then("기존 행이 덮어써지고 제거된 자리는 마지막 행으로 채워짐")
+        assert len(index) == 2
+        assert "b" not in index
+        assert sorted(index.ids) == ["a", "c"]
+        np.testing.assert_allclose(index.get("a"), vectors[2], rtol=1e-6)
+        scores = dict(index.search(vectors[2], 10))
+        assert scores["a"] == pytest.approx(1.0)
+        assert scores["c"] == pytest.approx(1.0)
+
+    @pytest.mark.unit
+    def test_should_return_k_results_from_allowed_partitions(self, tdd_case):
+        tdd_case.given("유형 파티션 라벨이 붙은 엔티티 100개 (Drug는 10개뿐)")
+        vectors = random_vectors(100, seed=2)
+        partitions = ["Drug" if i % 10 == 0 else "Symptom" for i in range(100)]
+        index = EntityEmbeddingIndex(initial_capacity=8)
+        index.add_many([f"e{i}" for i in range(100)], vectors, partitions)
+        index.remove_many(["e5"])
+        index.set_partitions(["e99"], ["Drug"])
+
+        tdd_case.when("Drug 파티션만 허용해 상위 5개를 검색함")
+        results = index.search(vectors[1], 5, partitions={"Drug"})
+
+        tdd_case.then("과다 조회 없이 허용된 엔티티만 정확히 5개, 유사도 순으로 반환됨")
+        drug_rows = [i for i in range(100) if i % 10 == 0 or i == 99]
+        expected = sorted(drug_rows, key=lambda i: -float(vectors[i] @ vectors[1]))[:5]
+        assert [entity_id for entity_id, _ in results] == [f"e{i}" for i in expected]
+        assert len(index.search(vectors[1], 50, partitions={"Drug"})) == 11
+        assert index.search(vectors[1], 5, partitions=set()) == []
+        assert int(index.partition_mask({"Symptom"}).sum()) == 88
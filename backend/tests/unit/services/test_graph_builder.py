@@ -0,0 +1,129 @@
+"""
+Unit Tests for Knowledge Graph Builder
+샤드 병렬 추출(map)과 부분 그래프 병합(reduce) 테스트
+"""
+import pytest
+
+from app.services.graph_builder import KnowledgeGraphBuilder, MedicalEntityExtractor
+
+MEDICAL_ENTITIES = {
+    'Disease': ['질병', '질환'],
+    'Symptom': ['증상'],
+    'Drug': ['약물', '약'],
+    'Department': ['진료과', '과'],
+    'Doctor': ['의사']
+}
+
+RELATION_RULES = [
+    ('Drug', 'Disease', 'TREATS', ['치료', '처방', '사용'], 0.7),
+    ('Disease', 'Symptom', 'SYMPTOMS_OF', ['증상', '나타남', '발생'], 0.8),
+    ('Doctor', 'Department', 'WORKS_AT', ['소속', '근무', '전문'], 0.9)
+]
+
+DOCUMENTS = [
+    {
+        'id': f'doc_{i}',
+        'content': "약물은 질병 치료에 사용됩니다.\n"
+                   "두통 증상은 질환에서 발생합니다.\n"
+                   f"의사 {i}는 진료과에 근무합니다."
+    }
+    for i in range(7)
+]
+
+
+def line_splitter(chunk_size, chunk_overlap):
+    """줄 단위 분할기 (워커 프로세스에서 import 가능한 모듈 수준 함수)"""
+    return lambda text: [line for line in text.split("\n") if line.strip()]
+
+
+def build(processes, shard_size):
+    builder = KnowledgeGraphBuilder(
+        MEDICAL_ENTITIES, RELATION_RULES,
+        processes=processes, shard_size=shard_size, splitter_factory=line_splitter
+    )
+    return builder, builder.build(DOCUMENTS)
+
+
+class TestKnowledgeGraphBuilder:
+    """지식 그래프 빌더 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_extract_canonical_entities_with_offsets(self, tdd_case):
+        tdd_case.given("키워드 오토마톤 기반 추출기")
+        extractor = MedicalEntityExtractor(MEDICAL_ENTITIES, RELATION_RULES)
+        text = "약물과 약은 질병 치료에 사용"
+
+        tdd_case.when("엔티티와 관계를 추출함")
+        entities = extractor.extract_entities(text)
+        relations = extractor.extract_relations(text, entities)
+
+        tdd_case.then("정규 엔티티별로 모든 언급 위치가 모이고 규칙에 맞는 유형 쌍만 연결됨")
+        by_id = {entity['id']: entity for entity in entities}
+        assert by_id['Drug:약']['offsets'] == [(0, 1), (4, 5)]
+        assert by_id['Drug:약물']['offsets'] == [(0, 2)]
+        assert sorted((r['source'], r['target'], r['type']) for r in relations) == [
+            ('Drug:약', 'Disease:질병', 'TREATS'),
+            ('Drug:약물', 'Disease:질병', 'TREATS')
+        ]
+
+    @pytest.mark.unit
+    def test_should_merge_process_shards_like_sequential_build(self, tdd_case):
+        tdd_case.given("같은 문서 집합")
+
+        tdd_case.when("프로세스 풀(샤드 2개 문서)과 현재 프로세스에서 각각 구축함")
+        _, parallel = build(processes=2, shard_size=2)
+        _, sequential = build(processes=1, shard_size=100)
+
+        tdd_case.then("노드/간선/언급 횟수와 출처가 같음")
+        assert parallel.nodes == sequential.nodes
+        assert parallel.edges == sequential.edges
+        assert parallel.nodes['Disease:질병']['count'] == 7
+        assert parallel.edges[('Doctor:의사', 'Department:진료과', 'WORKS_AT')]['mentions'][:2] == [
+            ('doc_0', 2), ('doc_1', 2)
+        ]
+        assert (parallel.documents, parallel.chunks) == (7, 21)
+
+    @pytest.mark.unit
+    def test_should_report_build_metrics(self, tdd_case):
+        tdd_case.given("샤드 3개로 나뉘는 문서 집합")
+
+        tdd_case.when("현재 프로세스에서 구축함")
+        builder, merged = build(processes=1, shard_size=3)
+        metrics = builder.metrics.snapshot()
+
+        tdd_case.then("진행률, 처리량과 결과 크기가 기록됨")
+        assert metrics['status'] == 'completed'
+        assert metrics['shards'] == 3
+        assert metrics['progress'] == 1.0
+        assert metrics['chunks'] == 21
+        assert metrics['nodes'] == len(merged.nodes)
+        assert metrics['documents_per_second'] > 0
+
+    @pytest.mark.unit
+    def test_should_remove_document_mentions_like_rebuild(self, tdd_case):
+        tdd_case.given("문서 7개로 구축한 부분 그래프")
+        _, merged = build(processes=1, shard_size=100)
+
+        tdd_case.when("doc_0을 제거하고 수정된 doc_0을 다시 합침")
+        removed, changed = merged.remove_documents({'doc_0'})
+        updated = {'id': 'doc_0', 'content': "약은 질환 치료에 사용됩니다."}
+        builder = KnowledgeGraphBuilder(MEDICAL_ENTITIES, RELATION_RULES, processes=1,
+                                        splitter_factory=line_splitter)
+        merged.merge(builder.build([updated]))
+
+        tdd_case.then("doc_0의 언급만 바뀌고 처음부터 다시 구축한 그래프와 노드/간선/출처가 같음")
+        assert removed == set()
+        assert {'Disease:질병', 'Drug:약', 'Drug:약물'} <= changed
+        reference = builder.build(DOCUMENTS[1:] + [updated])
+
+        def normalized(graph):
+            return ({key: (node['count'], sorted(node['mentions'])) for key, node in graph.nodes.items()},
+                    {key: (edge['count'], sorted(edge['mentions'])) for key, edge in graph.edges.items()})
+
+        assert normalized(merged) == normalized(reference)
+        assert {key: node['context'] for key, node in merged.nodes.items()} == \
+            {key: node['context'] for key, node in reference.nodes.items()}
+        assert merged.nodes['Drug:약물']['count'] == 6
+        removed, _ = merged.remove_documents({doc['id'] for doc in DOCUMENTS})
+        assert removed == set(reference.nodes)
+        assert (merged.nodes, merged.edges) == ({}, {})
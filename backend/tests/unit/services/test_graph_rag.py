@@ -0,0 +1,288 @@
+"""
+Unit Tests for Medical GraphRAG
+문서 단위 증분 갱신/삭제, 사용자 타입 파티션과 그래프 문서 API 테스트
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_text_splitters")
+
+from app.core.config import settings
+from app.services import embedding_service
+from app.services.embedding_service import EmbeddingService
+from tests.fixtures.embeddings import DEFAULT_EMBEDDING_MODEL, BigramEncoder
+
+DOCUMENTS = [
+    {"id": "doc_a", "content": "이 질환의 증상은 다뇨입니다. 약물로 치료합니다."},
+    {"id": "doc_b", "content": "고혈압 진단 검사 후 약물을 처방합니다."},
+]
+
+
+class RecordingGraphStore:
+    """엔티티 ID와 리비전만 기록하는 Neo4j 저장소 대역"""
+
+    def __init__(self, entities=()):
+        self.entities = set(entities)
+        self.stored_revision = "이전 실행"
+        self.clears = 0
+
+    def clear(self):
+        self.clears += 1
+        self.entities.clear()
+
+    def delete_entities(self, entity_ids):
+        self.entities -= set(entity_ids)
+
+    def ensure_schema(self, dim):
+        pass
+
+    def write_graph(self, graph, embeddings, nodes, replace_edges=False):
+        self.entities |= {graph.key(node) for node in nodes}
+
+    def revision(self):
+        return self.stored_revision
+
+    def set_revision(self, revision):
+        self.stored_revision = revision
+
+
+@pytest.fixture
+def encoder():
+    return BigramEncoder()
+
+
+@pytest.fixture
+def graph_rag(monkeypatch, tmp_path, encoder):
+    """메모리 그래프/단일 프로세스 빌드와 결정적 임베더를 쓰는 graph_rag 모듈"""
+    monkeypatch.setattr(settings, "GRAPH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "GRAPH_BUILD_PROCESSES", 1)
+    monkeypatch.setattr(settings, "GRAPH_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    monkeypatch.setitem(
+        embedding_service._embedding_services, DEFAULT_EMBEDDING_MODEL,
+        EmbeddingService(model_name=DEFAULT_EMBEDDING_MODEL, cache_dir="", encoder=encoder)
+    )
+    from app.services import graph_rag
+
+    return graph_rag
+
+
+@pytest.fixture
+def rag(graph_rag):
+    rag = graph_rag.MedicalGraphRAG()
+    rag.update_documents(DOCUMENTS)
+    return rag
+
+
+def entity_ids(rag, text):
+    return {entity["id"] for entity in rag.extract_medical_entities(text)}
+
+
+def row_partitions(rag):
+    """임베딩 행별 파티션 {엔티티 ID: 파티션}"""
+    index = rag.entity_embeddings
+    return {entity_id: index._partition_names[index._partitions[row]] for entity_id, row in index._row_of.items()}
+
+
+def assert_user_type_filters_match_graph(rag):
+    """사용자 타입별 graph_search 결과가 그래프의 유형/신뢰도 마스크와 정확히 같은 엔티티 집합인지 확인"""
+    graph = rag.knowledge_graph
+    for user_type, (types, threshold) in rag.user_type_filters.items():
+        mask = graph.node_mask(types, threshold)
+        expected = {graph.key(node) for node in range(graph.number_of_nodes()) if mask[node]}
+        found = {result["entity_id"] for result in rag.graph_search("약물 치료", k=100, user_type=user_type)}
+        assert found == expected, user_type
+
+
+class TestMedicalGraphRAG:
+    """GraphRAG 증분 갱신 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_skip_unchanged_documents(self, rag, encoder, tdd_case):
+        tdd_case.given("문서 2개로 구축된 지식 그래프")
+        graph = rag.knowledge_graph
+        encoder.encoded.clear()
+
+        tdd_case.when("같은 문서를 다시 넣음")
+        summary = rag.update_documents(DOCUMENTS)
+
+        tdd_case.then("재추출/재임베딩 없이 같은 그래프를 유지함")
+        assert summary["documents_changed"] == 0 and summary["documents_unchanged"] == 2
+        assert summary["entities_embedded"] == 0 and encoder.encoded == []
+        assert rag.knowledge_graph is graph
+
+    @pytest.mark.unit
+    def test_should_remove_entities_mentioned_only_by_removed_document(self, rag, tdd_case):
+        tdd_case.given("한 문서에만 언급된 엔티티와 두 문서가 함께 언급한 엔티티")
+        only_a = entity_ids(rag, DOCUMENTS[0]["content"]) - entity_ids(rag, DOCUMENTS[1]["content"])
+        shared = entity_ids(rag, DOCUMENTS[0]["content"]) & entity_ids(rag, DOCUMENTS[1]["content"])
+        assert only_a and shared and rag.knowledge_graph.number_of_edges()
+
+        tdd_case.when("첫 문서를 삭제함")
+        summary = rag.remove_documents(["doc_a"])
+
+        tdd_case.then("그 문서만 언급한 엔티티는 임베딩 행과 함께 사라지고 공유 엔티티는 다른 문서의 언급만 남음")
+        graph = rag.knowledge_graph
+        keys = {graph.key(node) for node in range(graph.number_of_nodes())}
+        assert summary["entities_removed"] == len(only_a)
+        assert not keys & only_a and shared <= keys
+        assert set(rag.entity_embeddings.ids) == keys
+        partial = graph.to_partial()
+        for entity_id in shared:
+            assert {document_id for document_id, _ in partial.nodes[entity_id]["mentions"]} == {"doc_b"}
+        assert graph.number_of_edges() == 0
+        assert "doc_a" not in rag.document_fingerprints
+        assert_user_type_filters_match_graph(rag)
+
+    @pytest.mark.unit
+    def test_should_match_rebuild_after_removing_first_mention(self, graph_rag, rag, tdd_case):
+        tdd_case.given("첫 문서에서 처음 언급되고 둘째 문서도 언급한 엔티티와 둘째 문서만으로 새로 구축한 그래프")
+        shared = entity_ids(rag, DOCUMENTS[0]["content"]) & entity_ids(rag, DOCUMENTS[1]["content"])
+        rebuilt = graph_rag.MedicalGraphRAG()
+        rebuilt.update_documents([DOCUMENTS[1]])
+
+        tdd_case.when("첫 문서를 증분 삭제함")
+        rag.remove_documents(["doc_a"])
+
+        tdd_case.then("공유 엔티티의 컨텍스트와 임베딩이 새로 구축한 그래프와 같음")
+        graph, expected = rag.knowledge_graph, rebuilt.knowledge_graph
+        for entity_id in shared:
+            node = graph.node(graph.index_of(entity_id))
+            assert node == expected.node(expected.index_of(entity_id))
+            assert node["context"] and DOCUMENTS[0]["content"] not in node["context"]
+            assert np.array_equal(rag.entity_embeddings.get(entity_id), rebuilt.entity_embeddings.get(entity_id))
+
+    @pytest.mark.unit
+    def test_should_update_mutable_builder_without_thawing_compact_graph(self, graph_rag, rag, monkeypatch,
+                                                                          tdd_case):
+        tdd_case.given("압축 그래프를 가변 그래프로 되돌리는 호출을 기록하는 상태")
+        to_partial = graph_rag.CompactGraph.to_partial
+        thawed = []
+
+        def recording_to_partial(graph):
+            thawed.append(graph)
+            return to_partial(graph)
+
+        monkeypatch.setattr(graph_rag.CompactGraph, "to_partial", recording_to_partial)
+
+        tdd_case.when("문서를 수정하고 다른 문서를 삭제함")
+        rag.update_documents([{"id": "doc_b", "content": "두통 증후군 진단 검사"}])
+        rag.remove_documents(["doc_a"])
+
+        tdd_case.then("압축 그래프를 되돌리지 않고 유지 중인 가변 빌더만 고쳐 남은 문서로 새로 구축한 그래프와 같음")
+        assert thawed == []
+        rebuilt = graph_rag.MedicalGraphRAG()
+        rebuilt.update_documents([{"id": "doc_b", "content": "두통 증후군 진단 검사"}])
+        graph, expected = rag.knowledge_graph, rebuilt.knowledge_graph
+        assert graph.to_partial().nodes == expected.to_partial().nodes
+        assert graph.to_partial().edges == expected.to_partial().edges
+        assert set(rag.entity_embeddings.ids) == set(rebuilt.entity_embeddings.ids)
+
+    @pytest.mark.unit
+    def test_should_refresh_partitions_and_match_snapshot_bands(self, graph_rag, rag, tdd_case):
+        tdd_case.given("문서를 수정해 새 유형의 엔티티가 추가된 그래프")
+        rag.update_documents([{"id": "doc_b", "content": "고혈압 진단 검사 후 약물을 처방합니다. 두통 증후군 환자."}])
+        source_hash = rag.snapshot_hash(DOCUMENTS)
+        assert rag.save_snapshot(source_hash)
+
+        tdd_case.when("스냅샷을 새 인스턴스로 로드함")
+        loaded = graph_rag.MedicalGraphRAG()
+        assert loaded.load_snapshot(source_hash)
+
+        tdd_case.then("증분 갱신과 스냅샷 로드의 파티션이 같고 사용자 타입 필터가 그래프 마스크와 일치함")
+        assert row_partitions(loaded) == row_partitions(rag)
+        assert len(row_partitions(rag)) == rag.knowledge_graph.number_of_nodes()
+        assert_user_type_filters_match_graph(rag)
+        assert_user_type_filters_match_graph(loaded)
+
+    @pytest.mark.unit
+    def test_should_restore_updated_documents_on_startup(self, graph_rag, rag, monkeypatch, tdd_case):
+        tdd_case.given("샘플과 다른 문서 집합으로 갱신한 뒤 스냅샷을 저장한 그래프")
+        rag.remove_documents(["doc_a"])
+        assert rag.persist_snapshot()
+
+        tdd_case.when("새 인스턴스로 서버 시작시 초기화를 실행함")
+        restarted = graph_rag.MedicalGraphRAG()
+        monkeypatch.setattr(graph_rag, "medical_graph_rag", restarted)
+        graph_rag.initialize_graph_knowledge()
+
+        tdd_case.then("샘플 문서로 다시 구축하지 않고 갱신된 그래프와 문서 지문을 그대로 복원함")
+        assert restarted.document_fingerprints == rag.document_fingerprints == {
+            "doc_b": rag.document_fingerprints["doc_b"]
+        }
+        assert restarted.knowledge_graph.to_partial().nodes == rag.knowledge_graph.to_partial().nodes
+
+    @pytest.mark.unit
+    def test_should_reconcile_graph_store_with_memory_graph(self, graph_rag, tdd_case):
+        tdd_case.given("이전 코퍼스의 엔티티가 남아 있는 Neo4j 저장소")
+        store = RecordingGraphStore({"Disease:이전질환"})
+        rag = graph_rag.MedicalGraphRAG()
+        rag.graph_store = store
+
+        tdd_case.when("처음부터 구축하고, 스냅샷을 저장한 뒤 문서를 삭제하고, 그 스냅샷을 다시 로드함")
+        rag.update_documents(DOCUMENTS)
+        built, expected = set(store.entities), set(rag.entity_embeddings.ids)
+        source_hash = rag.snapshot_hash(DOCUMENTS)
+        assert rag.save_snapshot(source_hash)
+        rag.remove_documents(["doc_a"])
+        after_removal = set(store.entities)
+        loaded = graph_rag.MedicalGraphRAG()
+        loaded.graph_store = store
+        assert loaded.load_snapshot(source_hash)
+
+        tdd_case.then("저장소가 항상 메모리 그래프와 같은 엔티티만 가지며, 이미 같은 그래프면 다시 적재하지 않음")
+        assert built == expected and "Disease:이전질환" not in built
+        assert after_removal == set(rag.entity_embeddings.ids)
+        assert set(store.entities) == set(loaded.entity_embeddings.ids) == built
+        clears = store.clears
+        assert loaded.load_snapshot(source_hash)
+        assert store.clears == clears
+
+
+class TestGraphDocumentEndpoints:
+    """지식 그래프 문서 추가/삭제 API 테스트 클래스 (서버 모듈 의존성이 설치된 환경에서만 실행)"""
+
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path, rag):
+        backend_config = pytest.importorskip("backend.app.core.config")
+        backend_embedding_service = pytest.importorskip("backend.app.services.embedding_service")
+        # 서버 모듈 import시 만들어지는 전역 스토어가 모델/외부 서버 없이 생성되도록 설정
+        monkeypatch.setattr(backend_config.settings, "VECTOR_BACKEND", "local")
+        monkeypatch.setattr(backend_config.settings, "LOCAL_VECTOR_INDEX_DIR", "")
+        monkeypatch.setattr(backend_config.settings, "VECTOR_MANIFEST_PATH", "")
+        monkeypatch.setattr(backend_config.settings, "LEXICAL_INDEX_DIR", "")
+        monkeypatch.setattr(backend_config.settings, "GRAPH_BACKEND", "memory")
+        monkeypatch.setitem(
+            backend_embedding_service._embedding_services, DEFAULT_EMBEDDING_MODEL,
+            backend_embedding_service.EmbeddingService(
+                model_name=DEFAULT_EMBEDDING_MODEL, cache_dir=str(tmp_path / "embeddings"), encoder=BigramEncoder()
+            )
+        )
+        main = pytest.importorskip("backend.app.services.main")
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setattr(main, "medical_graph_rag", rag)
+        return TestClient(main.app)
+
+    @pytest.mark.unit
+    def test_should_upsert_and_delete_graph_documents(self, client, graph_rag, rag, tdd_case):
+        tdd_case.given("문서 2개로 구축된 지식 그래프를 쓰는 API 서버")
+        only_a = entity_ids(rag, DOCUMENTS[0]["content"]) - entity_ids(rag, DOCUMENTS[1]["content"])
+
+        tdd_case.when("문서를 추가/수정하고, 빈 요청을 보내고, 문서를 삭제함")
+        upserted = client.post("/api/v1/knowledge/graph-documents", json={"documents": [
+            DOCUMENTS[1], {"id": "doc_c", "content": "두통 증후군 진단"}
+        ]}).json()
+        empty = client.post("/api/v1/knowledge/graph-documents", json={"documents": []}).json()
+        deleted = client.delete("/api/v1/knowledge/graph-documents/doc_a").json()
+
+        tdd_case.then("변경 요약이 반환되고 삭제된 문서의 엔티티가 그래프에서 빠지며 갱신 결과가 스냅샷으로 저장됨")
+        assert upserted["status"] == "success"
+        assert upserted["update"]["documents_changed"] == 1 and upserted["update"]["documents_unchanged"] == 1
+        assert empty["status"] == "error"
+        assert deleted["status"] == "success" and deleted["update"]["entities_removed"] == len(only_a)
+        graph = rag.knowledge_graph
+        assert not {graph.key(node) for node in range(graph.number_of_nodes())} & only_a
+        restarted = graph_rag.MedicalGraphRAG()
+        assert restarted.load_snapshot(restarted.snapshot_key())
+        assert restarted.document_fingerprints == rag.document_fingerprints
@@ -0,0 +1,95 @@
+"""
+Unit Tests for Graph Retrieval
+개인화 PageRank 기반 다중 홉 서브그래프 검색 테스트
+"""
+import numpy as np
+import pytest
+
+from app.services.compact_graph import CompactGraph
+from app.services.graph_builder import PartialGraph
+from app.services.graph_retrieval import personalized_pagerank, retrieve_subgraph
+
+
+@pytest.fixture
+def graph():
+    """메트포르민 → 당뇨병 → 다뇨 → 탈수 사슬과 신뢰도가 낮은 곁가지"""
+    partial = PartialGraph()
+    for key in ('Drug:메트포르민', 'Disease:당뇨병', 'Symptom:다뇨', 'Disease:탈수', 'Disease:고혈압', 'Test:심전도'):
+        partial.nodes[key] = {'type': key.split(':')[0], 'name': key.split(':')[1], 'context': '',
+                              'confidence': 0.8, 'count': 1, 'mentions': []}
+    for source, target, relation, confidence in (
+        ('Drug:메트포르민', 'Disease:당뇨병', 'TREATS', 0.9),
+        ('Drug:메트포르민', 'Disease:고혈압', 'TREATS', 0.1),
+        ('Disease:당뇨병', 'Symptom:다뇨', 'SYMPTOMS_OF', 0.8),
+        ('Disease:탈수', 'Symptom:다뇨', 'CAUSES', 0.8),
+    ):
+        partial.edges[(source, target, relation)] = {'confidence': confidence, 'count': 1, 'mentions': []}
+    return CompactGraph.from_partial(partial)
+
+
+class TestGraphRetrieval:
+    """서브그래프 검색 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_rank_multi_hop_entities_by_confidence(self, graph, tdd_case):
+        tdd_case.given("메트포르민을 시드로 한 그래프")
+        seed = graph.index_of('Drug:메트포르민')
+
+        tdd_case.when("개인화 PageRank 서브그래프를 검색함")
+        subgraph = retrieve_subgraph(graph, {seed: 0.9}, max_nodes=5)
+
+        tdd_case.then("신뢰도 높은 경로를 따라 관계 방향과 무관하게 3홉까지 도달하고, 연결 없는 노드는 제외됨")
+        ranked = [node['entity_id'] for node in subgraph['nodes']]
+        seed_node = subgraph['nodes'][ranked.index('Drug:메트포르민')]
+        assert seed_node['seed'] and seed_node['similarity'] == 0.9
+        assert ranked.index('Disease:당뇨병') < ranked.index('Disease:고혈압')
+        assert 'Disease:탈수' in ranked
+        assert 'Test:심전도' not in ranked
+        assert {(edge['source'], edge['target']) for edge in subgraph['edges']} >= {
+            ('Drug:메트포르민', 'Disease:당뇨병'), ('Disease:당뇨병', 'Symptom:다뇨')
+        }
+        assert subgraph['truncated'] is False
+
+    @pytest.mark.unit
+    def test_should_cap_subgraph_size(self, graph, tdd_case):
+        tdd_case.given("두 시드")
+        seeds = {graph.index_of('Drug:메트포르민'): 0.9, graph.index_of('Disease:탈수'): 0.5}
+
+        tdd_case.when("노드 2개, 간선 1개로 제한해 검색함")
+        subgraph = retrieve_subgraph(graph, seeds, max_nodes=2, max_edges=1)
+
+        tdd_case.then("점수 상위 노드와 그 사이 간선만 반환됨")
+        assert len(subgraph['nodes']) == 2
+        assert len(subgraph['edges']) <= 1
+        scores = [node['score'] for node in subgraph['nodes']]
+        assert scores == sorted(scores, reverse=True)
+
+    @pytest.mark.unit
+    def test_should_rank_only_allowed_nodes(self, graph, tdd_case):
+        tdd_case.given("Disease 유형만 허용하는 노드 마스크")
+        allowed = graph.node_mask(['Disease'], 0.6)
+
+        tdd_case.when("메트포르민을 시드로 서브그래프를 검색함")
+        subgraph = retrieve_subgraph(graph, {graph.index_of('Drug:메트포르민'): 1.0}, max_nodes=3, allowed=allowed)
+
+        tdd_case.then("워크는 다른 유형을 거쳐 전파되지만 결과에는 허용된 노드만 포함됨")
+        assert [node['entity']['type'] for node in subgraph['nodes']] == ['Disease'] * 3
+        assert 'Disease:탈수' in [node['entity_id'] for node in subgraph['nodes']]
+        assert graph.node_mask(['Disease'], 0.6) is allowed
+        assert not graph.node_mask(['Disease'], 0.8).any()
+
+    @pytest.mark.unit
+    def test_should_stop_early_at_push_limit(self, graph, tdd_case):
+        tdd_case.given("무방향 신뢰도 가중 전이 확률")
+        indptr, indices, probabilities = graph.walk_adjacency()
+        row_sums = np.add.reduceat(probabilities, indptr[:-1][np.diff(indptr) > 0])
+        np.testing.assert_allclose(row_sums, 1.0, rtol=1e-6)
+
+        tdd_case.when("push 한도 1회로 계산함")
+        scores, pushes, truncated = personalized_pagerank(graph, {graph.index_of('Drug:메트포르민'): 1.0},
+                                                          max_pushes=1)
+
+        tdd_case.then("조기 종료되고 1홉 경계 노드까지의 근사 점수가 반환됨")
+        assert (pushes, truncated) == (1, True)
+        assert set(scores) == {graph.index_of(key) for key in ('Drug:메트포르민', 'Disease:당뇨병', 'Disease:고혈압')}
+        assert personalized_pagerank(graph, {}) == ({}, 0, False)
@@ -0,0 +1,90 @@
+"""
+Unit Tests for Graph Snapshot
+지식 그래프/임베딩 행렬 스냅샷 저장과 메모리 매핑 로드 테스트
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.services.compact_graph import CompactGraph
+from app.services.entity_index import EntityEmbeddingIndex
+from app.services.graph_builder import PartialGraph
+from app.services.graph_snapshot import corpus_hash, load_graph_snapshot, save_graph_snapshot
+
+DOCUMENTS = [
+    {'id': 'doc_b', 'content': "메트포르민은 당뇨병 치료에 사용됩니다."},
+    {'id': 'doc_a', 'content': "두통은 고혈압의 증상입니다."}
+]
+
+
+@pytest.fixture
+def graph():
+    partial = PartialGraph()
+    for key, name in (('Drug:메트포르민', '메트포르민'), ('Disease:당뇨병', '당뇨병'), ('Symptom:두통', '두통')):
+        partial.nodes[key] = {'type': key.split(':')[0], 'name': name, 'context': DOCUMENTS[0]['content'],
+                              'confidence': 0.8, 'count': 1, 'mentions': [('doc_b', 0)]}
+    partial.edges[('Drug:메트포르민', 'Disease:당뇨병', 'TREATS')] = {
+        'confidence': 0.7, 'count': 1, 'mentions': [('doc_b', 0)]
+    }
+    return CompactGraph.from_partial(partial)
+
+
+class TestGraphSnapshot:
+    """지식 그래프 스냅샷 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_map_saved_snapshot_read_only(self, graph, tmp_path, tdd_case):
+        tdd_case.given("저장된 그래프와 노드 순서에 맞춘 임베딩 행렬")
+        embeddings = np.eye(3, 4, dtype=np.float32)
+        source_hash = corpus_hash(DOCUMENTS, {'chunk_size': 500})
+        save_graph_snapshot(str(tmp_path), graph, embeddings, source_hash)
+
+        tdd_case.when("같은 원본 해시로 로드함")
+        loaded, matrix = load_graph_snapshot(str(tmp_path), source_hash)
+
+        tdd_case.then("배열이 읽기 전용 memmap으로 매핑되고 조회 결과가 원본과 같음")
+        assert isinstance(loaded.indices, np.memmap)
+        assert not matrix.flags.writeable
+        assert loaded.number_of_edges() == 1
+        drug = loaded.index_of('Drug:메트포르민')
+        assert loaded.node(drug) == graph.node(graph.index_of('Drug:메트포르민'))
+        assert loaded.neighbors(drug)[0]['entity']['name'] == '당뇨병'
+        assert loaded.type_counts() == graph.type_counts()
+        np.testing.assert_array_equal(matrix, embeddings)
+
+    @pytest.mark.unit
+    def test_should_skip_snapshot_when_corpus_changes(self, graph, tmp_path, tdd_case):
+        tdd_case.given("이전 코퍼스로 저장한 스냅샷 여러 버전")
+        source_hash = corpus_hash(DOCUMENTS, {'chunk_size': 500})
+        for _ in range(3):
+            save_graph_snapshot(str(tmp_path), graph, np.zeros((3, 4), dtype=np.float32), source_hash, keep=2)
+
+        tdd_case.when("문서 내용이나 설정이 바뀐 해시로 로드함")
+        changed_documents = [DOCUMENTS[0], {'id': 'doc_a', 'content': "두통은 편두통의 증상입니다."}]
+
+        tdd_case.then("문서 순서와 무관한 해시가 바뀌어 재구축 대상이 되고 최근 버전만 남음")
+        assert corpus_hash(list(reversed(DOCUMENTS)), {'chunk_size': 500}) == source_hash
+        assert load_graph_snapshot(str(tmp_path), corpus_hash(changed_documents, {'chunk_size': 500})) is None
+        assert load_graph_snapshot(str(tmp_path), corpus_hash(DOCUMENTS, {'chunk_size': 300})) is None
+        assert load_graph_snapshot(str(tmp_path / 'missing')) is None
+        assert len([name for name in os.listdir(tmp_path) if name.startswith('v')]) == 2
+
+    @pytest.mark.unit
+    def test_should_copy_mapped_embeddings_on_first_write(self, tmp_path, tdd_case):
+        tdd_case.given("읽기 전용으로 매핑한 임베딩 행렬로 만든 인덱스")
+        path = tmp_path / 'embeddings.npy'
+        np.save(path, np.eye(2, 3, dtype=np.float32))
+        mapped = np.load(path, mmap_mode='r')
+        index = EntityEmbeddingIndex.from_matrix(['a', 'b'], mapped)
+
+        tdd_case.when("엔티티를 추가하고 제거함")
+        assert index.search([1.0, 0.0, 0.0], 1)[0][0] == 'a'
+        index.add_many(['c'], [[0.0, 0.0, 2.0]])
+        index.remove_many(['a'])
+
+        tdd_case.then("매핑된 파일은 그대로이고 인덱스만 변경됨")
+        assert sorted(index.ids) == ['b', 'c']
+        assert index.search([0.0, 0.0, 1.0], 1) == [('c', 1.0)]
+        np.testing.assert_array_equal(index.matrix_for(['c', 'x']), [[0.0, 0.0, 1.0], [0.0, 0.0, 0.0]])
+        np.testing.assert_array_equal(np.load(path), np.eye(2, 3, dtype=np.float32))
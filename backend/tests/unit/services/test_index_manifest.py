@@ -0,0 +1,87 @@
+"""
+Unit Tests for Index Manifest
+결정적 청크 ID와 증분 재색인 계획 테스트
+"""
+import pytest
+
+from app.services.index_manifest import (
+    IndexManifest, chunk_point_id, document_fingerprint, metadata_hash, plan_document_update
+)
+
+
+def chunk_ids_of(document_id, chunks):
+    return [chunk_point_id(document_id, i, chunk) for i, chunk in enumerate(chunks)]
+
+
+class TestIndexManifest:
+    """색인 매니페스트 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_derive_same_chunk_ids_for_same_content(self, tdd_case):
+        tdd_case.given("같은 문서의 같은 청크")
+        first = chunk_ids_of("guideline_001", ["혈압 목표", "생활습관 교정"])
+
+        tdd_case.when("청크 ID를 다시 계산하고 내용을 바꿔 계산함")
+        second = chunk_ids_of("guideline_001", ["혈압 목표", "생활습관 교정"])
+        edited = chunk_ids_of("guideline_001", ["혈압 목표", "저염식 권장"])
+
+        tdd_case.then("같은 내용은 같은 ID, 바뀐 청크만 다른 ID를 가짐")
+        assert first == second
+        assert edited[0] == first[0]
+        assert edited[1] != first[1]
+        assert chunk_ids_of("guideline_002", ["혈압 목표"])[0] != first[0]
+
+    @pytest.mark.unit
+    def test_should_plan_only_changed_chunks(self, tdd_case):
+        tdd_case.given("세 개의 청크로 색인된 문서")
+        doc = {"id": "doc", "title": "고혈압", "content": "a"}
+        old_ids = chunk_ids_of("doc", ["a", "b", "c"])
+        entry = {"fingerprint": "old", "metadata": metadata_hash(doc), "chunk_ids": old_ids}
+
+        tdd_case.when("가운데 청크만 바뀐 문서와 청크 수가 줄어든 문서의 재색인을 계획함")
+        edited_ids = chunk_ids_of("doc", ["a", "B", "c"])
+        changed, stale = plan_document_update(entry, edited_ids, metadata_hash(doc))
+        shrunk_ids = chunk_ids_of("doc", ["a", "b"])
+        shrunk_changed, shrunk_stale = plan_document_update(entry, shrunk_ids, metadata_hash(doc))
+
+        tdd_case.then("바뀐 청크만 upsert하고, 청크 수가 바뀌면 전체 upsert 후 남는 청크를 삭제함")
+        assert changed == [1]
+        assert stale == {old_ids[1]}
+        assert shrunk_changed == [0, 1]
+        assert shrunk_stale == {old_ids[2]}
+        assert plan_document_update(None, edited_ids, metadata_hash(doc)) == ([0, 1, 2], set())
+
+    @pytest.mark.unit
+    def test_should_reupsert_all_chunks_when_metadata_changes(self, tdd_case):
+        tdd_case.given("내용은 같고 진료과만 바뀐 문서")
+        doc = {"id": "doc", "department": "내과", "content": "a"}
+        moved = {**doc, "department": "내분비내과"}
+        ids = chunk_ids_of("doc", ["a", "b"])
+        entry = {"fingerprint": document_fingerprint(doc), "metadata": metadata_hash(doc), "chunk_ids": ids}
+
+        tdd_case.when("재색인을 계획함")
+        changed, stale = plan_document_update(entry, ids, metadata_hash(moved))
+
+        tdd_case.then("payload 갱신을 위해 모든 청크를 upsert하고 삭제할 청크는 없음")
+        assert document_fingerprint(moved) != entry["fingerprint"]
+        assert changed == [0, 1]
+        assert stale == set()
+
+    @pytest.mark.unit
+    def test_should_persist_manifest_atomically(self, tmp_path, tdd_case):
+        tdd_case.given("파일 경로가 지정된 매니페스트")
+        path = str(tmp_path / "manifest" / "vector_manifest.json")
+        manifest = IndexManifest(path)
+        manifest.set("clinical_guidelines", "guideline_001", "f1", "m1", ["c1", "c2"])
+        manifest.set("clinical_guidelines", "guideline_002", "f2", "m2", ["c3"])
+
+        tdd_case.when("저장 후 문서 하나를 지우고 다시 저장한 뒤 새로 엶")
+        manifest.save()
+        manifest.remove("clinical_guidelines", "guideline_002")
+        manifest.save()
+        reopened = IndexManifest(path)
+
+        tdd_case.then("마지막 저장 상태가 복원되고 임시 파일은 남지 않음")
+        assert reopened.documents("clinical_guidelines") == ["guideline_001"]
+        assert reopened.get("clinical_guidelines", "guideline_001")["chunk_ids"] == ["c1", "c2"]
+        assert not (tmp_path / "manifest" / "vector_manifest.json.tmp").exists()
@@ -0,0 +1,55 @@
+"""
+Unit Tests for Keyword Automaton
+Aho-Corasick 다중 키워드 매칭 테스트
+"""
+import pytest
+
+from app.services.keyword_automaton import KeywordAutomaton
+
+
+class TestKeywordAutomaton:
+    """키워드 오토마톤 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_find_overlapping_mentions_with_offsets(self, tdd_case):
+        tdd_case.given("서로 겹치는 의료 키워드로 만든 오토마톤")
+        automaton = KeywordAutomaton([
+            ("약", "Drug"), ("약물", "Drug"), ("처방약", "Drug"), ("질환", "Disease"), ("진료과", "Department")
+        ])
+        text = "처방약과 약물은 질환별로 진료과에서 처방약을 정함"
+
+        tdd_case.when("텍스트를 한 번 훑어 모든 언급을 찾음")
+        matches = automaton.find_all(text)
+
+        tdd_case.then("겹치는 키워드까지 모든 위치가 정확히 반환됨")
+        found = [(match.keyword, match.start, match.end) for match in matches]
+        expected = sorted(
+            (keyword, index, index + len(keyword))
+            for keyword in ["약", "약물", "처방약", "질환", "진료과"]
+            for index in range(len(text))
+            if text.startswith(keyword, index)
+        )
+        assert sorted(found) == expected
+        assert all(text[match.start:match.end] == match.keyword for match in matches)
+
+    @pytest.mark.unit
+    def test_should_match_case_insensitively_against_brute_force(self, tdd_case):
+        tdd_case.given("실패 링크가 여러 단계로 이어지는 키워드 집합")
+        keywords = ["he", "she", "his", "hers", "ACE", "ace 억제제"]
+        automaton = KeywordAutomaton((keyword, index) for index, keyword in enumerate(keywords))
+        text = "Ushers said ACE 억제제 helps; she has his"
+
+        tdd_case.when("대소문자가 섞인 텍스트를 검색함")
+        found = sorted((match.start, match.keyword) for match in automaton.find_all(text))
+
+        tdd_case.then("소문자 기준 전수 탐색 결과와 같고 값 집합도 반환됨")
+        lowered = text.lower()
+        expected = sorted(
+            (index, keyword.lower())
+            for keyword in keywords
+            for index in range(len(lowered))
+            if lowered.startswith(keyword.lower(), index)
+        )
+        assert found == expected
+        assert automaton.values_in("HERS") == {0, 3}
+        assert automaton.values_in("무관한 문장") == set()
@@ -0,0 +1,114 @@
+"""
+Unit Tests for Lexical Index
+BM25 어휘 색인과 RRF 결합 테스트
+"""
+import pytest
+
+from app.services.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+CHUNKS = {
+    "c1": {"content": "제2형 당뇨병(E11)의 1차 약제는 메트포르민이다.", "hospital_department": "내분비내과"},
+    "c2": {"content": "고혈압(I10) 환자는 저염식과 규칙적인 운동이 권장된다.", "hospital_department": "심장내과"},
+    "c3": {"content": "당뇨병 환자의 혈당 관리를 위해 식이 조절이 중요하다.", "hospital_department": "내분비내과"},
+    "c4": {"content": "메트포르민은 신기능 저하 환자에서 용량 조절이 필요하다.", "hospital_department": "신장내과"},
+}
+
+
+def build_index(directory=None):
+    index = LexicalIndex(str(directory) if directory else None)
+    index.add("medical_documents", list(CHUNKS), list(CHUNKS.values()))
+    return index
+
+
+class TestLexicalIndex:
+    """BM25 어휘 색인 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_tokenize_codes_and_korean_terms(self, tdd_case):
+        tdd_case.given("KCD 코드와 조사가 붙은 약물명이 포함된 문장")
+        text = "E11.9 환자에게 메트포르민을 투여"
+
+        tdd_case.when("토큰화함")
+        tokens = tokenize(text)
+
+        tdd_case.then("상위 코드와 조사를 뗀 어절이 함께 생성됨")
+        assert "e11.9" in tokens
+        assert "e11" in tokens
+        assert "메트포르민" in tokens
+        assert "환자" in tokens
+
+    @pytest.mark.unit
+    def test_should_rank_exact_terms_and_apply_filter(self, tdd_case):
+        tdd_case.given("의료 청크가 색인된 BM25 색인")
+        index = build_index()
+
+        tdd_case.when("약물명과 코드로 검색하고 진료과 필터를 적용해 검색함")
+        drug = index.search("medical_documents", "메트포르민 용량", 2)
+        code = index.search("medical_documents", "I10", 3)
+        filtered = index.search("medical_documents", "메트포르민", 5, {"hospital_department": "신장내과"})
+
+        tdd_case.then("정확한 용어가 포함된 청크가 상위에 오고 필터에 맞는 청크만 반환됨")
+        assert [hit["id"] for hit in drug] == ["c4", "c1"]
+        assert [hit["id"] for hit in code] == ["c2"]
+        assert [hit["id"] for hit in filtered] == ["c4"]
+
+    @pytest.mark.unit
+    def test_should_persist_and_delete_chunks(self, tmp_path, tdd_case):
+        tdd_case.given("스냅샷을 저장한 BM25 색인")
+        index = build_index(tmp_path)
+        index.delete("medical_documents", ["c4"])
+        index.save("medical_documents")
+
+        tdd_case.when("같은 디렉토리로 색인을 다시 엶")
+        reopened = LexicalIndex(str(tmp_path))
+
+        tdd_case.then("삭제된 청크는 검색되지 않고 나머지는 복원됨")
+        assert reopened.count("medical_documents") == 3
+        assert [hit["id"] for hit in reopened.search("medical_documents", "메트포르민", 5)] == ["c1"]
+
+    @pytest.mark.unit
+    def test_should_append_changes_and_compact_periodically(self, tmp_path, tdd_case):
+        tdd_case.given("압축 임계값이 작은 디스크 BM25 색인")
+        index = LexicalIndex(str(tmp_path), compact_threshold=4)
+        index.add("medical_documents", list(CHUNKS), list(CHUNKS.values()))
+        index.save("medical_documents")
+        log_path = tmp_path / "medical_documents.log.jsonl"
+
+        tdd_case.when("청크 하나씩 바꿔 저장하다가 로그가 임계값을 넘고, 이후 컬렉션을 초기화함")
+        index.delete("medical_documents", ["c4"])
+        index.save("medical_documents")
+        appended = len(log_path.read_text(encoding="utf-8").splitlines())
+        snapshot_before_compaction = (tmp_path / "medical_documents.json").exists()
+        for _ in range(6):
+            index.add("medical_documents", ["c2"], [CHUNKS["c2"]])
+            index.save("medical_documents")
+        compacted_log = log_path.exists()
+        compacted = LexicalIndex(str(tmp_path))
+        compacted_count = compacted.count("medical_documents")
+        index.reset("medical_documents")
+        index.add("medical_documents", ["c3"], [CHUNKS["c3"]])
+        index.save("medical_documents")
+
+        tdd_case.then("저장은 변경분만 로그에 덧붙이고, 임계값을 넘으면 스냅샷으로 압축되며 초기화도 재생됨")
+        assert appended == 5 and not snapshot_before_compaction
+        assert compacted_count == 3 and not compacted_log
+        assert [hit["id"] for hit in compacted.search("medical_documents", "메트포르민", 5)] == ["c1"]
+        reopened = LexicalIndex(str(tmp_path))
+        assert log_path.read_text(encoding="utf-8").splitlines()[0] == '{"op": "reset"}'
+        assert reopened.count("medical_documents") == 1
+        assert [hit["id"] for hit in reopened.search("medical_documents", "당뇨병", 5)] == ["c3"]
+
+    @pytest.mark.unit
+    def test_should_fuse_rankings_with_rrf(self, tdd_case):
+        tdd_case.given("순위가 다른 밀집/어휘 검색 결과")
+        dense = [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.8}, {"id": "c", "score": 0.7}]
+        lexical = [{"id": "c", "score": 12.0}, {"id": "d", "score": 8.0}]
+
+        tdd_case.when("RRF로 결합함")
+        fused = reciprocal_rank_fusion({"dense": dense, "lexical": lexical}, limit=2, k=60)
+
+        tdd_case.then("두 방식 모두에서 찾은 결과가 가장 위에 오고 방식별 순위가 기록됨")
+        assert [result["id"] for result in fused] == ["c", "a"]
+        assert fused[0]["ranks"] == {"dense": 3, "lexical": 1}
+        assert fused[0]["score"] == pytest.approx(1 / 63 + 1 / 61)
@@ -0,0 +1,70 @@
+"""
+Unit Tests for Medical Prompt Rewriter
+규칙 기반 의료 프롬프트 재작성기 테스트
+"""
+import pytest
+
+from app.services.medical_prompt_rewriter import MedicalPromptRewriter
+
+
+class TestMedicalPromptRewriter:
+    """의료 프롬프트 재작성기 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_rewrite_terms_patient_and_ending_in_one_pass(self, tdd_case):
+        tdd_case.given("약어, 환자명, 반말 어미가 섞인 질의")
+        rewriter = MedicalPromptRewriter()
+        question = "홍길동 환자에 대한 당뇨 경과기록 정보와 TG 검사 결과 보여줘"
+
+        tdd_case.when("질의를 재작성함")
+        result = rewriter.rewrite(question)
+
+        tdd_case.then("용어, 환자명, 어미가 모두 강화됨")
+        assert result["enhanced_question"] == (
+            "환자이름이 홍길동인에 대한 당뇨병 입원경과기록 정보와 중성지방 검사 결과 보여주세요"
+        )
+        assert "의학용어 강화: TG → 중성지방" in result["enhancements_applied"]
+        assert "환자명 구조화: 홍길동 환자 → 환자이름이 홍길동인" in result["enhancements_applied"]
+        assert "정중한 질문 형태로 변환: 보여줘 → 보여주세요" in result["enhancements_applied"]
+        assert result["confidence"] == 0.6
+
+    @pytest.mark.unit
+    def test_should_not_rewrite_already_enhanced_terms(self, tdd_case):
+        tdd_case.given("이미 강화된 용어가 포함된 질의")
+        rewriter = MedicalPromptRewriter()
+
+        tdd_case.when("질의를 재작성함")
+        result = rewriter.rewrite("당뇨병 입원경과기록과 vital sign 혈압을 알려주세요")
+
+        tdd_case.then("중복 치환 없이 그대로 유지됨")
+        assert result["enhanced_question"] == "당뇨병 입원경과기록과 vital sign 혈압을 알려주세요"
+        assert result["enhancements_applied"] == []
+        assert result["confidence"] == 0.3
+
+    @pytest.mark.unit
+    def test_should_append_question_form_when_missing(self, tdd_case):
+        rewriter = MedicalPromptRewriter()
+        result = rewriter.rewrite("맥박 추이.")
+
+        assert result["enhanced_question"] == "vital sign 맥박 추이을 조회해주세요"
+        assert "질문 형태로 변환" in result["enhancements_applied"]
+
+    @pytest.mark.unit
+    def test_should_rewrite_batches(self, tdd_case):
+        rewriter = MedicalPromptRewriter()
+        results = rewriter.rewrite_many(["TG 알려줘", "혈압 보여줘"])
+
+        assert [r["enhanced_question"] for r in results] == [
+            "중성지방 알려주세요", "vital sign 혈압 보여주세요"
+        ]
+
+    @pytest.mark.unit
+    def test_should_analyze_llm_enhancements(self, tdd_case):
+        rewriter = MedicalPromptRewriter()
+        enhancements, confidence = rewriter.analyze(
+            "홍길동 TG", "환자이름이 홍길동인 환자의 검사명이 중성지방인 검사 결과를 조회해주세요"
+        )
+
+        assert enhancements[0] == "질의 구체화"
+        assert "의학용어 추가: 중성지방" in enhancements
+        assert confidence == pytest.approx(0.95)
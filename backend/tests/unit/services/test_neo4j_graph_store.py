@@ -0,0 +1,142 @@
+"""
+Unit Tests for Neo4j Graph Store
+배치 UNWIND 적재와 검색 결과 변환 테스트 (쿼리를 기록하는 드라이버 사용, 실제 서버 테스트는 integration)
+"""
+import numpy as np
+import pytest
+
+from app.services.compact_graph import CompactGraph
+from app.services.graph_builder import PartialGraph
+from app.services.neo4j_graph_store import Neo4jGraphStore
+
+
+class RecordingTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **parameters):
+        self.driver.queries.append((query, parameters))
+        return self
+
+    def consume(self):
+        return None
+
+    def data(self):
+        records = self.driver.records
+        return records(self.driver.queries[-1][1]) if callable(records) else records
+
+
+class RecordingSession(RecordingTransaction):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute_write(self, work):
+        self.driver.transactions += 1
+        return work(RecordingTransaction(self.driver))
+
+    execute_read = execute_write
+
+
+class RecordingDriver:
+    def __init__(self, records=None):
+        self.queries = []
+        self.transactions = 0
+        self.records = records or []
+
+    def session(self, database=None):
+        return RecordingSession(self)
+
+
+@pytest.fixture
+def graph():
+    partial = PartialGraph()
+    for i in range(5):
+        partial.nodes[f'Drug:약{i}'] = {'type': 'Drug', 'name': f'약{i}', 'context': '', 'confidence': 0.8,
+                                        'count': 1, 'mentions': []}
+    partial.nodes['Disease:당뇨병'] = {'type': 'Disease', 'name': '당뇨병', 'context': '', 'confidence': 0.8,
+                                     'count': 1, 'mentions': []}
+    for i in range(5):
+        partial.edges[(f'Drug:약{i}', 'Disease:당뇨병', 'TREATS')] = {'confidence': 0.7, 'count': 1, 'mentions': []}
+    partial.edges[('Drug:약0', 'Disease:당뇨병', 'PRESCRIBED_FOR')] = {'confidence': 0.9, 'count': 1, 'mentions': []}
+    return CompactGraph.from_partial(partial)
+
+
+class TestNeo4jGraphStore:
+    """Neo4j 그래프 저장소 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_write_in_unwind_batches_per_relation(self, graph, tdd_case):
+        tdd_case.given("배치 크기 2인 저장소")
+        driver = RecordingDriver()
+        store = Neo4jGraphStore(driver=driver, batch_size=2)
+
+        tdd_case.when("노드 6개, 관계 6개(유형 2가지)를 적재함")
+        written = store.write_graph(graph, np.ones((6, 4), dtype=np.float32))
+
+        tdd_case.then("노드 3배치 + TREATS 3배치 + PRESCRIBED_FOR 1배치가 각각 별도 트랜잭션으로 실행됨")
+        assert written == {'nodes': 6, 'edges': 6}
+        assert driver.transactions == 7
+        assert all(query.startswith("UNWIND $rows AS row") for query, _ in driver.queries)
+        assert sorted(len(parameters['rows']) for _, parameters in driver.queries) == [1, 1, 2, 2, 2, 2, 2]
+        assert sum('MERGE (s)-[r:TREATS]->(t)' in query for query, _ in driver.queries) == 3
+        assert driver.queries[0][1]['rows'][0]['embedding'] == [1.0] * 4
+
+    @pytest.mark.unit
+    def test_should_convert_scores_and_reject_unsafe_identifiers(self, tdd_case):
+        tdd_case.given("Neo4j 정규화 코사인 점수(0.9)를 반환하는 드라이버")
+        driver = RecordingDriver(records=[
+            {'scanned': 5, 'entity_id': 'Drug:약', 'entity': {'type': 'Drug', 'name': '약'}, 'score': 0.9,
+             'neighbors': []}
+        ])
+        store = Neo4jGraphStore(driver=driver, candidate_multiplier=4)
+
+        tdd_case.when("유형 필터를 지정해 검색함")
+        results = store.search([0.1, 0.2], 3, types=['Drug'], min_confidence=0.5)
+
+        tdd_case.then("후보를 k의 배수만큼 가져오고 인덱스를 다 훑었으므로 한 번만 읽으며 점수는 코사인 유사도로 변환됨")
+        assert driver.transactions == 1
+        assert driver.queries[0][1]['candidates'] == 12
+        assert results[0]['similarity'] == pytest.approx(0.8)
+        with pytest.raises(ValueError):
+            Neo4jGraphStore(driver=driver, label="Entity) DETACH DELETE (n")
+
+    @pytest.mark.unit
+    def test_should_widen_candidates_until_k_results_pass_filter(self, tdd_case):
+        tdd_case.given("유사도 순 100개 엔티티 중 10번째마다 Drug인 벡터 인덱스")
+        index = [{'entity_id': f'E{i}', 'entity': {'type': 'Drug' if i % 10 == 9 else 'Symptom'},
+                  'score': 1.0 - i / 200, 'neighbors': []} for i in range(100)]
+
+        def query_nodes(parameters):
+            hits = index[:parameters['candidates']]
+            passed = [hit for hit in hits if hit['entity']['type'] in parameters['types']][:parameters['k']]
+            return [{'scanned': len(hits), **hit} for hit in passed] or [{'scanned': len(hits), 'entity_id': None}]
+
+        driver = RecordingDriver(records=query_nodes)
+        store = Neo4jGraphStore(driver=driver, candidate_multiplier=2)
+
+        tdd_case.when("Drug 3개와 Disease 1개를 검색함")
+        drugs = store.search([0.1], 3, types=['Drug'])
+        driver.queries.clear()
+        diseases = store.search([0.1], 1, types=['Disease'])
+
+        tdd_case.then("k개가 통과할 때까지 후보를 늘리고, 인덱스를 다 훑으면 부족한 대로 반환함")
+        assert [result['entity_id'] for result in drugs] == ['E9', 'E19', 'E29']
+        assert diseases == []
+        assert [parameters['candidates'] for _, parameters in driver.queries] == [2, 4, 8, 16, 32, 64, 128]
+
+    @pytest.mark.unit
+    def test_should_record_graph_revision_per_label(self, tdd_case):
+        tdd_case.given("리비전 기록이 없는 저장소")
+        driver = RecordingDriver()
+        store = Neo4jGraphStore(driver=driver, label="MedicalEntity")
+
+        tdd_case.when("리비전을 기록함")
+        store.set_revision("1700000000.5")
+
+        tdd_case.then("엔티티 레이블별 리비전 노드에 MERGE로 기록됨")
+        query, parameters = driver.queries[-1]
+        assert query.startswith("MERGE (m:GraphRevision {label: $label})")
+        assert parameters == {"label": "MedicalEntity", "revision": "1700000000.5"}
@@ -0,0 +1,103 @@
+"""
+Unit Tests for Text2SQL Query History Store
+Text2SQL 질의 이력 저장소 테스트
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.query_history_store import QueryHistoryStore
+
+
+def make_record(question: str, offset_seconds: int = 0) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "question": question,
+        "sql": "SELECT 1",
+        "explanation": "",
+        "confidence": 0.85,
+        "timestamp": (datetime(2025, 11, 17) + timedelta(seconds=offset_seconds)).isoformat()
+    }
+
+
+class TestQueryHistoryStore:
+    """질의 이력 저장소 테스트 클래스"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_keep_ring_buffer_bounded(self, tdd_case):
+        tdd_case.given("버퍼 크기가 3인 이력 저장소")
+        store = QueryHistoryStore(buffer_size=3, batch_size=100)
+
+        tdd_case.when("5개의 이력을 추가함")
+        for i in range(5):
+            await store.add(make_record(f"질문 {i}", i))
+
+        tdd_case.then("메모리에는 최근 3개만 남고 전체 이력은 테이블에서 조회됨")
+        assert len(store._recent) == 3
+        recent = await store.recent(3)
+        assert [r["question"] for r in recent] == ["질문 4", "질문 3", "질문 2"]
+        assert len(await store.recent(5)) == 5
+        store.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_write_in_batches(self, tdd_case):
+        tdd_case.given("배치 크기가 2인 이력 저장소")
+        store = QueryHistoryStore(batch_size=2, flush_interval=60)
+
+        tdd_case.when("배치 크기만큼 이력을 추가함")
+        await store.add(make_record("첫 번째"))
+        assert store._pending
+
+        await store.add(make_record("두 번째", 1))
+
+        tdd_case.then("대기열이 비워지고 테이블에 기록됨")
+        assert store._pending == []
+        count = store._conn.execute("SELECT COUNT(*) FROM text2sql_query_history").fetchone()[0]
+        assert count == 2
+        store.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_survive_restart(self, tmp_path, tdd_case):
+        tdd_case.given("파일 기반 이력 저장소")
+        db_path = str(tmp_path / "history.duckdb")
+        store = QueryHistoryStore(db_path=db_path, batch_size=10)
+        await store.add(make_record("당뇨병 환자 수"))
+
+        tdd_case.when("저장소를 닫고 다시 연다")
+        store.close()
+        reopened = QueryHistoryStore(db_path=db_path)
+
+        tdd_case.then("이전 이력이 링 버퍼에 복원됨")
+        recent = await reopened.recent(1)
+        assert recent[0]["question"] == "당뇨병 환자 수"
+        reopened.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_search_by_prefix_and_fulltext(self, tdd_case):
+        tdd_case.given("여러 질문이 저장된 이력")
+        store = QueryHistoryStore()
+        await store.add(make_record("당뇨병 환자 수를 알려주세요", 0))
+        await store.add(make_record("고혈압 환자의 처방 약물", 1))
+        await store.add(make_record("100% 달성 환자", 2))
+        await store.add(make_record("HbA1c 검사 결과", 3))
+
+        tdd_case.when("접두어 및 전문 검색을 수행함")
+        prefix = await store.search("당뇨", mode="prefix")
+        fulltext = await store.search("환자 약물", mode="fulltext")
+        literal = await store.search("100%", mode="prefix")
+        prefix_case = await store.search("hba1c", mode="prefix")
+        fulltext_case = await store.search("HBA1C 결과", mode="fulltext")
+
+        tdd_case.then("조건에 맞는 질문만 대소문자와 무관하게 반환됨")
+        assert [r["question"] for r in prefix] == ["당뇨병 환자 수를 알려주세요"]
+        assert [r["question"] for r in fulltext] == ["고혈압 환자의 처방 약물"]
+        assert [r["question"] for r in literal] == ["100% 달성 환자"]
+        assert [r["question"] for r in prefix_case] == [r["question"] for r in fulltext_case] == ["HbA1c 검사 결과"]
+        with pytest.raises(ValueError):
+            await store.search("환자", mode="regex")
+        store.close()
@@ -0,0 +1,81 @@
+"""
+Unit Tests for Text2SQL Schema Catalog
+스키마 카탈로그 테스트
+"""
+import duckdb
+import pytest
+
+from app.services.schema_catalog import SchemaCatalog, estimate_tokens, is_select_query
+
+
+@pytest.fixture
+def warehouse():
+    conn = duckdb.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE dim_department AS
+        SELECT * FROM (VALUES (1, '내분비내과'), (2, '심장내과'), (3, '심장내과'))
+        AS t(dept_key, dept_name)
+    """)
+    yield conn
+    conn.close()
+
+
+class TestSchemaCatalog:
+    """스키마 카탈로그 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_introspect_types_samples_and_cardinality(self, warehouse, tdd_case):
+        tdd_case.given("진료과 테이블이 있는 웨어하우스")
+        catalog = SchemaCatalog(
+            connect=warehouse.cursor,
+            annotations=[{"name": "dim_department", "description": "진료과 차원",
+                          "columns": [{"name": "dept_name", "description": "진료과명"}]}]
+        )
+
+        tdd_case.when("카탈로그를 조회함")
+        table = catalog.tables()[0]
+
+        tdd_case.then("타입, 샘플값, 카디널리티, 설명이 캐시됨")
+        column = {c["name"]: c for c in table["columns"]}["dept_name"]
+        assert table["row_count"] == 3
+        assert column["type"] == "VARCHAR"
+        assert column["cardinality"] == 2
+        assert column["sample_values"][0] == "심장내과"
+        assert column["description"] == "진료과명"
+
+    @pytest.mark.unit
+    def test_should_reintrospect_after_ddl(self, warehouse, tdd_case):
+        tdd_case.given("한 번 조회된 카탈로그")
+        catalog = SchemaCatalog(connect=warehouse.cursor, check_interval=0)
+        catalog.tables()
+        version = catalog.version
+
+        tdd_case.when("테이블이 추가됨")
+        catalog.tables()
+        assert catalog.version == version
+        warehouse.execute("CREATE TABLE fact_visit (visit_key INTEGER)")
+
+        tdd_case.then("fingerprint 변경이 감지되어 재수집됨")
+        assert {t["name"] for t in catalog.tables()} == {"dim_department", "fact_visit"}
+        assert catalog.version == version + 1
+
+    @pytest.mark.unit
+    def test_should_render_within_token_budget(self, warehouse, tdd_case):
+        catalog = SchemaCatalog(connect=warehouse.cursor)
+        full = catalog.render()
+        compact = catalog.render(token_budget=estimate_tokens(full) - 1)
+
+        assert "e.g." in full
+        assert "e.g." not in compact
+        assert estimate_tokens(compact) < estimate_tokens(full)
+
+    @pytest.mark.unit
+    def test_should_accept_only_single_select_statements(self, warehouse):
+        assert is_select_query(warehouse, "SELECT * FROM dim_department;")
+        assert is_select_query(warehouse, "WITH d AS (SELECT 1 AS a) SELECT * FROM d WHERE 'x;y' <> ''")
+        assert not is_select_query(warehouse, "DELETE FROM dim_department")
+        assert not is_select_query(warehouse, "drop table dim_department")
+        assert not is_select_query(warehouse, "SELECT 1; DROP TABLE dim_department")
+        assert not is_select_query(warehouse, "WITH d AS (SELECT 1) DELETE FROM dim_department")
+        assert not is_select_query(warehouse, "SELEC 1")
+        assert not is_select_query(warehouse, "")
@@ -0,0 +1,100 @@
+"""
+Unit Tests for Text2SQL Retrieval Stage
+Text2SQL few-shot 검색 및 스키마 링킹 테스트
+"""
+import pytest
+
+from app.services.text2sql_retrieval import (
+    FewShotRetriever, SchemaLinker, referenced_tables
+)
+
+SCHEMA = [
+    {"name": "dim_patient", "description": "환자 차원", "columns": [
+        {"name": "patient_key", "description": "환자 고유 키"},
+        {"name": "patient_name", "description": "환자 이름"},
+    ]},
+    {"name": "dim_diagnosis", "description": "진단 차원", "columns": [
+        {"name": "diagnosis_key", "description": "진단 고유 키"},
+        {"name": "diagnosis_name", "description": "진단명 (당뇨병, 고혈압)"},
+    ]},
+    {"name": "fact_visit", "description": "진료 사실", "columns": [
+        {"name": "visit_key", "description": "방문 키"},
+        {"name": "patient_key", "description": "환자 키"},
+        {"name": "diagnosis_key", "description": "진단 키"},
+        {"name": "visit_type", "description": "진료 유형 (입원, 외래, 응급실)"},
+    ]},
+    {"name": "fact_prescription", "description": "처방 (약물)", "columns": [
+        {"name": "prescription_key", "description": "처방 키"},
+        {"name": "patient_key", "description": "환자 키"},
+        {"name": "medication_name", "description": "약물명 (메트포르민, 아스피린)"},
+    ]},
+]
+
+
+class TestFewShotRetriever:
+    """few-shot 예시 검색 테스트"""
+
+    @pytest.mark.unit
+    def test_should_return_nearest_examples_first(self, tdd_case):
+        tdd_case.given("여러 (질문, SQL) 예시가 저장됨")
+        retriever = FewShotRetriever()
+        retriever.add("당뇨병 환자 수를 알려주세요", "SELECT COUNT(*) FROM fact_visit")
+        retriever.add("아스피린 처방 내역을 보여주세요", "SELECT * FROM fact_prescription")
+
+        tdd_case.when("유사한 질문으로 검색함")
+        examples = retriever.top_k("당뇨병 환자는 몇 명인가요", k=1)
+
+        tdd_case.then("가장 유사한 예시가 반환됨")
+        assert examples[0]["sql"] == "SELECT COUNT(*) FROM fact_visit"
+
+    @pytest.mark.unit
+    def test_should_evict_oldest_when_full(self, tdd_case):
+        tdd_case.given("최대 2개 예시를 보관하는 검색기")
+        retriever = FewShotRetriever(max_examples=2)
+
+        tdd_case.when("3개의 예시를 추가함")
+        retriever.add("첫 번째 질문", "SELECT 1")
+        retriever.add("두 번째 질문", "SELECT 2")
+        retriever.add("세 번째 질문", "SELECT 3")
+
+        tdd_case.then("가장 오래된 예시가 제거됨")
+        assert len(retriever) == 2
+        sqls = {e["sql"] for e in retriever.top_k("질문", k=2, min_score=0)}
+        assert sqls == {"SELECT 2", "SELECT 3"}
+
+
+class TestSchemaLinker:
+    """스키마 링킹 테스트"""
+
+    @pytest.mark.unit
+    def test_should_select_only_relevant_tables(self, tdd_case):
+        tdd_case.given("테이블/컬럼 설명 인덱스")
+        linker = SchemaLinker(SCHEMA)
+
+        tdd_case.when("약물 관련 질문을 연결함")
+        fragments = linker.link("메트포르민 처방 내역")
+
+        tdd_case.then("처방 테이블이 포함되고 무관한 진단 테이블은 제외됨")
+        names = [t["name"] for t in fragments]
+        assert "fact_prescription" in names
+        assert "dim_diagnosis" not in names
+
+    @pytest.mark.unit
+    def test_should_add_bridge_table_for_joins(self, tdd_case):
+        tdd_case.given("두 차원 테이블에 걸친 질문")
+        linker = SchemaLinker(SCHEMA)
+
+        tdd_case.when("스키마를 연결함")
+        fragments = linker.link("당뇨병 환자 이름")
+
+        tdd_case.then("두 차원을 잇는 사실 테이블이 추가됨")
+        names = [t["name"] for t in fragments]
+        assert {"dim_patient", "dim_diagnosis", "fact_visit"} <= set(names)
+        visit = next(t for t in fragments if t["name"] == "fact_visit")
+        assert {"patient_key", "diagnosis_key"} <= {c["name"] for c in visit["columns"]}
+
+    @pytest.mark.unit
+    def test_should_extract_referenced_tables(self, tdd_case):
+        assert referenced_tables(
+            "SELECT * FROM fact_visit fv JOIN dim_patient dp ON fv.patient_key = dp.patient_key"
+        ) == ["fact_visit", "dim_patient"]
@@ -0,0 +1,108 @@
+"""
+Unit Tests for Text2SQL Service
+few-shot 예시 선별과 공유 웨어하우스 실행 테스트
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import query_history_store
+from app.services.query_history_store import QueryHistoryStore
+from app.services.text2sql_retrieval import FewShotRetriever
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(query_history_store, "_query_history_store", QueryHistoryStore())
+    from app.services import text2sql_service
+
+    monkeypatch.setattr(text2sql_service, "_few_shot_retriever", FewShotRetriever())
+    service = text2sql_service.Text2SQLService()
+    service.llm = None
+    yield service
+    query_history_store.close_query_history_store()
+
+
+def visit_count() -> int:
+    from app.services.text2sql_service import get_warehouse
+
+    cursor = get_warehouse().cursor()
+    try:
+        return cursor.execute("SELECT COUNT(*) FROM fact_visit").fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def fake_llm(sql_by_question):
+    """질문별로 정해진 SQL을 생성하는 LLM"""
+    async def ainvoke(prompt):
+        if "SQL Query:" in prompt:
+            question = prompt.split("Question: ", 1)[1].split("\n", 1)[0]
+            return MagicMock(content=sql_by_question[question])
+        if "설명해주세요" in prompt:
+            return MagicMock(content="설명")
+        return MagicMock(content=prompt.split("원본 질의: ", 1)[1].split("\n", 1)[0])
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+    return llm
+
+
+class TestText2SQLService:
+    """Text2SQL 서비스 테스트 클래스"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_keep_failed_sql_out_of_few_shot_examples(self, service, monkeypatch, tdd_case):
+        from app.services import text2sql_service
+        from app.services.text2sql_service import FEW_SHOT_MIN_CONFIDENCE, get_few_shot_retriever
+
+        tdd_case.given("없는 테이블을 참조하거나 실행 중 실패하는 SQL을 생성하는 LLM")
+        service.llm = fake_llm({
+            "입원 환자 수": "SELECT COUNT(*) FROM fact_admission",
+            "환자 이름 숫자 변환": "SELECT CAST(patient_name AS INTEGER) FROM dim_patient",
+            "전체 환자 수": "SELECT COUNT(*) AS n FROM dim_patient",
+        })
+
+        tdd_case.when("세 질문에 대해 SQL을 생성하고 실행함")
+        unbound = await service.natural_language_to_sql("입원 환자 수")
+        events = [e async for e in service.enhanced_generate_events("환자 이름 숫자 변환")]
+        valid = await service.natural_language_to_sql("전체 환자 수")
+
+        tdd_case.then("검증/실행에 실패한 SQL은 이력에만 남고 예시로 검색되지 않음")
+        execution = next(e for e in events if e["event"] == "execution")["data"]
+        assert "error" in execution
+        assert unbound["confidence"] < FEW_SHOT_MIN_CONFIDENCE <= valid["confidence"]
+        assert len(await service.get_query_history(3)) == 3
+
+        examples = get_few_shot_retriever().top_k("환자 수", k=5, min_score=0)
+        assert [example["sql"] for example in examples] == ["SELECT COUNT(*) AS n FROM dim_patient"]
+
+        # 재시작 후 이력으로 예시를 다시 채울 때도 실패한 SQL은 제외됨
+        reseeded = FewShotRetriever()
+        monkeypatch.setattr(text2sql_service, "_few_shot_retriever", reseeded)
+        prompt = await service._build_sql_prompt("환자 수")
+        assert "SELECT COUNT(*) AS n FROM dim_patient" in prompt
+        assert "fact_admission" not in prompt and "CAST(patient_name" not in prompt
+        assert len(reseeded) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sql", [
+        "DELETE FROM fact_visit",
+        "DROP TABLE fact_visit",
+        "SELECT 1; DROP TABLE fact_visit",
+        "WITH v AS (SELECT 1) DELETE FROM fact_visit",
+    ])
+    async def test_should_reject_writes_to_shared_warehouse(self, service, sql, tdd_case):
+        tdd_case.given("요청 간에 공유되는 샘플 웨어하우스")
+        before = visit_count()
+
+        tdd_case.when("데이터를 변경하는 SQL을 실행함")
+        with pytest.raises(Exception, match="SELECT/WITH"):
+            await service.execute_sql(sql)
+
+        tdd_case.then("실행이 거부되고 이후 요청의 웨어하우스는 그대로임")
+        assert visit_count() == before
+        result = await service.execute_sql("SELECT COUNT(*) AS n FROM fact_visit")
+        assert result["results"] == [{"n": before}]
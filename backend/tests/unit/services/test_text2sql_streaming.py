@@ -0,0 +1,72 @@
+"""
+Unit Tests for the pipelined Text2SQL enhanced-generate flow
+프롬프트 강화 → SQL 생성 → 실행/설명 파이프라인 테스트
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import query_history_store
+from app.services.query_history_store import QueryHistoryStore
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(query_history_store, "_query_history_store", QueryHistoryStore())
+    from app.services.text2sql_service import Text2SQLService
+
+    service = Text2SQLService()
+    yield service
+    query_history_store.close_query_history_store()
+
+
+class TestEnhancedGeneratePipeline:
+    """파이프라인 이벤트 스트림 테스트"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_emit_stage_events_in_rule_based_mode(self, service, tdd_case):
+        tdd_case.given("LLM이 없는 Text2SQL 서비스")
+        service.llm = None
+
+        tdd_case.when("파이프라인 이벤트를 수집함")
+        events = [e async for e in service.enhanced_generate_events("당뇨 환자 몇 명인지 알려줘")]
+
+        tdd_case.then("강화 → SQL → 설명/실행 → 완료 순으로 이벤트가 전달됨")
+        names = [e["event"] for e in events]
+        assert names[:2] == ["enhancement", "sql"]
+        assert set(names[2:4]) == {"explanation", "execution"}
+        assert names[-1] == "done"
+        execution = next(e for e in events if e["event"] == "execution")["data"]
+        assert execution["row_count"] == 1
+        assert (await service.get_query_history(1))[0]["question"] == "당뇨병 환자 몇 명인지 알려주세요"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_execute_while_explanation_is_generating(self, service, tdd_case):
+        tdd_case.given("설명 생성이 느린 LLM")
+        explanation_gate = asyncio.Event()
+
+        async def ainvoke(prompt):
+            if "설명해주세요" in prompt:
+                await explanation_gate.wait()
+                return MagicMock(content="환자 수를 조회합니다.")
+            if "SQL Query:" in prompt:
+                return MagicMock(content="SELECT COUNT(*) AS n FROM dim_patient")
+            return MagicMock(content="환자 수를 알려주세요")
+
+        service.llm = MagicMock()
+        service.llm.ainvoke = ainvoke
+
+        tdd_case.when("파이프라인을 실행함")
+        events = []
+        async for event in service.enhanced_generate_events("환자 수"):
+            events.append(event)
+            if event["event"] == "execution":
+                explanation_gate.set()
+
+        tdd_case.then("설명보다 실행 결과가 먼저 도착함")
+        names = [e["event"] for e in events]
+        assert names.index("execution") < names.index("explanation")
+        assert events[names.index("execution")]["data"]["results"] == [{"n": 20}]
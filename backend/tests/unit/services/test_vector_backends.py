@@ -0,0 +1,177 @@
+"""
+Unit Tests for Local Vector Backend
+프로세스 내 벡터 인덱스 테스트
+"""
+import numpy as np
+import pytest
+
+from app.services.vector_backends import STORAGE_PROFILES, CollectionSpec, LocalVectorBackend
+
+
+def random_vectors(count: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_payloads(count: int) -> list:
+    departments = ["심장내과", "내분비내과", "약제과"]
+    return [{"content": f"문서 {i}", "hospital_department": departments[i % 3]} for i in range(count)]
+
+
+class TestLocalVectorBackend:
+    """로컬 벡터 백엔드 테스트 클래스"""
+
+    @pytest.mark.unit
+    def test_should_return_exact_top_k(self, tdd_case):
+        tdd_case.given("벡터 100개가 저장된 로컬 컬렉션")
+        backend = LocalVectorBackend()
+        backend.ensure_collection(CollectionSpec("docs"), 16)
+        vectors = random_vectors(100)
+        backend.upsert("docs", [f"p{i}" for i in range(100)], vectors, make_payloads(100))
+
+        tdd_case.when("저장된 벡터 하나로 검색함")
+        hits = backend.search("docs", vectors[42], k=5)
+
+        tdd_case.then("자기 자신이 첫 번째이고 점수가 내림차순임")
+        expected = np.argsort(-(vectors @ vectors[42]))[:5]
+        assert [hit["id"] for hit in hits] == [f"p{i}" for i in expected]
+        assert hits[0]["score"] == pytest.approx(1.0, abs=1e-5)
+
+    @pytest.mark.unit
+    def test_should_filter_update_and_delete(self, tdd_case):
+        tdd_case.given("진료과 payload가 있는 로컬 컬렉션")
+        backend = LocalVectorBackend()
+        backend.ensure_collection(CollectionSpec("docs"), 16)
+        vectors = random_vectors(30)
+        backend.upsert("docs", [f"p{i}" for i in range(30)], vectors, make_payloads(30))
+
+        tdd_case.when("진료과로 필터링하고, 포인트를 갱신/삭제함")
+        filtered = backend.search("docs", vectors[0], k=50, payload_filter={"hospital_department": "약제과"})
+        backend.upsert("docs", ["p2"], vectors[:1], [{"content": "갱신", "hospital_department": "심장내과"}])
+        backend.delete("docs", ["p0"])
+
+        tdd_case.then("필터 조건과 갱신/삭제가 검색 결과에 반영됨")
+        assert len(filtered) == 10
+        assert all(hit["payload"]["hospital_department"] == "약제과" for hit in filtered)
+        assert backend.count("docs") == 29
+        top = backend.search("docs", vectors[0], k=1, payload_filter={"hospital_department": "심장내과"})
+        assert top[0]["id"] == "p2" and top[0]["payload"]["content"] == "갱신"
+        assert backend.search("docs", vectors[0], k=30, payload_filter={"hospital_department": "약제과"})[0]["id"] != "p2"
+
+    @pytest.mark.unit
+    def test_should_persist_with_memory_map(self, tmp_path, tdd_case):
+        tdd_case.given("디렉토리에 저장되는 로컬 백엔드")
+        backend = LocalVectorBackend(directory=str(tmp_path))
+        backend.ensure_collection(CollectionSpec("docs"), 16)
+        vectors = random_vectors(1500)
+        backend.upsert("docs", [f"p{i}" for i in range(1500)], vectors, make_payloads(1500))
+        backend.delete("docs", ["p7"])
+        backend.close()
+
+        tdd_case.when("같은 디렉토리로 다시 연다")
+        reopened = LocalVectorBackend(directory=str(tmp_path))
+
+        tdd_case.then("컬렉션, 삭제 내역과 검색 결과가 유지됨")
+        assert reopened.list_collections() == ["docs"]
+        assert reopened.count("docs") == 1499
+        assert reopened.search("docs", vectors[9], k=1)[0]["id"] == "p9"
+        assert all(hit["id"] != "p7" for hit in reopened.search("docs", vectors[7], k=10))
+        reopened.close()
+
+    @pytest.mark.unit
+    def test_should_use_hnsw_for_large_candidate_sets(self, tdd_case):
+        pytest.importorskip("hnswlib")
+        tdd_case.given("HNSW 전환 임계값이 낮은 로컬 백엔드")
+        backend = LocalVectorBackend(hnsw_threshold=100)
+        backend.ensure_collection(CollectionSpec("docs"), 16)
+        vectors = random_vectors(600, seed=1)
+        backend.upsert("docs", [f"p{i}" for i in range(600)], vectors, make_payloads(600))
+
+        tdd_case.when("전체 및 필터 검색을 수행함")
+        hits = backend.search("docs", vectors[5], k=3)
+        filtered = backend.search("docs", vectors[4], k=3, payload_filter={"hospital_department": "내분비내과"})
+
+        tdd_case.then("근사 검색으로도 자기 자신을 찾고 필터 조건을 지킴")
+        assert hits[0]["id"] == "p5"
+        assert filtered[0]["id"] == "p4"
+        assert all(hit["payload"]["hospital_department"] == "내분비내과" for hit in filtered)
+
+    @pytest.mark.unit
+    def test_should_migrate_when_spec_version_increases(self, tmp_path, tdd_case):
+        tdd_case.given("v1 명세로 생성되어 저장된 컬렉션")
+        backend = LocalVectorBackend(directory=str(tmp_path))
+        assert backend.ensure_collection(CollectionSpec("docs"), 16) == "created"
+        vectors = random_vectors(30)
+        payloads = [{**payload, "document_type": "drug" if i < 5 else "guideline"}
+                    for i, payload in enumerate(make_payloads(30))]
+        backend.upsert("docs", [f"p{i}" for i in range(30)], vectors, payloads)
+        backend.close()
+
+        tdd_case.when("document_type 인덱스를 추가한 v2 명세로 다시 연다")
+        reopened = LocalVectorBackend(directory=str(tmp_path))
+        unchanged = reopened.ensure_collection(CollectionSpec("docs"), 16)
+        spec = CollectionSpec("docs", version=2, keyword_fields=("hospital_department", "document_type"))
+        migrated = reopened.ensure_collection(spec, 16)
+
+        tdd_case.then("한 번만 마이그레이션되고 새 필드가 역색인으로 필터링됨")
+        assert (unchanged, migrated) == ("unchanged", "migrated")
+        assert reopened.ensure_collection(spec, 16) == "unchanged"
+        hits = reopened.search("docs", vectors[0], k=10, payload_filter={"document_type": "drug"})
+        assert sorted(hit["id"] for hit in hits) == [f"p{i}" for i in range(5)]
+        assert reopened._collections["docs"]._field_rows["document_type"]["drug"] == set(range(5))
+        with pytest.raises(ValueError):
+            reopened.ensure_collection(spec, 32)
+        reopened.close()
+
+    @pytest.mark.unit
+    def test_should_rescore_quantized_candidates(self, tmp_path, tdd_case):
+        tdd_case.given("scalar 양자화 프로필로 디스크에 저장된 컬렉션")
+        backend = LocalVectorBackend(directory=str(tmp_path))
+        backend.ensure_collection(CollectionSpec("records", storage=STORAGE_PROFILES["scalar"]), 64)
+        vectors = random_vectors(3000, dim=64, seed=2)
+        backend.upsert("records", [f"p{i}" for i in range(3000)], vectors, make_payloads(3000))
+
+        tdd_case.when("int8 코드로 후보를 고른 뒤 원본으로 재채점함")
+        queries = random_vectors(20, dim=64, seed=3)
+        exact = np.argsort(-(vectors @ queries.T), axis=0)[:5].T
+        results = [backend.search("records", query, k=5) for query in queries]
+        info = backend.collection_info("records")
+
+        tdd_case.then("정확 검색과 같은 순위/점수를 반환하고 RAM에는 int8 코드만 유지됨")
+        recall = np.mean([
+            len({hit["id"] for hit in hits} & {f"p{i}" for i in row}) / 5 for hits, row in zip(results, exact)
+        ])
+        assert recall >= 0.95
+        assert results[0][0]["score"] == pytest.approx(float(vectors[exact[0][0]] @ queries[0]), abs=1e-5)
+        assert info["points"] == 3000
+        assert info["ram_bytes"] < 3000 * 64 * 4 // 3
+        assert info["disk_bytes"] >= 3000 * 64 * 4
+        assert info["storage"]["quantization"] == "scalar"
+        backend.close()
+
+    @pytest.mark.unit
+    def test_should_reuse_deleted_rows(self, tmp_path, tdd_case):
+        tdd_case.given("포인트를 삭제하고 다시 추가하는 일이 반복되는 디스크 컬렉션")
+        backend = LocalVectorBackend(directory=str(tmp_path))
+        backend.ensure_collection(CollectionSpec("docs"), 16)
+        vectors = random_vectors(1200, seed=3)
+        backend.upsert("docs", [f"p{i}" for i in range(1200)], vectors, make_payloads(1200))
+        vectors_path = tmp_path / "docs" / "vectors.f32"
+        size = vectors_path.stat().st_size
+
+        tdd_case.when("절반을 삭제하고 새 id로 같은 수만큼 여러 번 추가한 뒤 다시 연다")
+        for round_ in range(3):
+            stale = [f"p{i}" for i in range(600)] if round_ == 0 else [f"r{round_ - 1}-{i}" for i in range(600)]
+            backend.delete("docs", stale)
+            backend.upsert("docs", [f"r{round_}-{i}" for i in range(600)], vectors[:600], make_payloads(600))
+        backend.close()
+        reopened = LocalVectorBackend(directory=str(tmp_path))
+
+        tdd_case.then("삭제된 행이 재사용되어 벡터 파일이 커지지 않고 재생 후에도 검색 결과가 맞음")
+        assert vectors_path.stat().st_size == size
+        assert reopened.count("docs") == 1200
+        assert reopened.search("docs", vectors[5], k=1)[0]["id"] == "r2-5"
+        assert reopened.search("docs", vectors[900], k=1)[0]["id"] == "p900"
+        reopened.upsert("docs", ["new"], random_vectors(1, seed=9), [{"content": "새 문서"}])
+        assert vectors_path.stat().st_size == size
+        reopened.close()
@@ -0,0 +1,156 @@
+"""
+Unit Tests for Medical Vector Store
+로컬 백엔드와 결정적 임베더로 벡터 스토어 색인/검색/종료 테스트
+"""
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_text_splitters")
+
+from app.core.config import settings
+from app.services import embedding_service
+from app.services.embedding_service import EmbeddingService
+from tests.fixtures.embeddings import DEFAULT_EMBEDDING_MODEL, BigramEncoder
+
+DOCUMENTS = [
+    {"id": "htn", "title": "고혈압", "department": "심장내과",
+     "content": "고혈압은 수축기 혈압 140mmHg 이상입니다. 1단계 치료는 생활습관 개선입니다."},
+    {"id": "dm", "title": "당뇨병", "department": "내분비내과",
+     "content": "제2형 당뇨병(E11.9)의 1차 약물은 메트포르민입니다."},
+    {"id": "asa", "title": "아스피린", "department": "약제과",
+     "content": "아스피린은 혈소판 응집 억제제로 심혈관 질환 예방에 사용됩니다."},
+]
+
+
+@pytest.fixture
+def encoder():
+    return BigramEncoder()
+
+
+@pytest.fixture
+def vector_store(monkeypatch, tmp_path, encoder):
+    """설정을 임시 디렉토리/로컬 백엔드로 바꾸고 결정적 임베더를 등록한 vector_store 모듈"""
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(settings, "LOCAL_VECTOR_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(settings, "VECTOR_MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_DIR", str(tmp_path / "lexical"))
+    monkeypatch.setitem(
+        embedding_service._embedding_services, DEFAULT_EMBEDDING_MODEL,
+        EmbeddingService(model_name=DEFAULT_EMBEDDING_MODEL, cache_dir=str(tmp_path / "embeddings"), encoder=encoder)
+    )
+    from app.services import vector_store
+
+    return vector_store
+
+
+class TestMedicalVectorStore:
+    """벡터 스토어 테스트 클래스"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_should_close_store_embedding_service_on_shutdown(self, vector_store, tmp_path, tdd_case):
+        tdd_case.given("디스크 캐시를 쓰는 임베딩 서비스로 문서를 색인한 벡터 스토어")
+        store = vector_store.MedicalVectorStore(backend="local")
+        service = store.embeddings
+        store.add_documents([{"id": "doc-1", "content": "고혈압 치료는 생활습관 개선부터 시작합니다."}])
+        assert service._store is not None
+
+        tdd_case.when("서버 종료 정리를 실행함")
+        await vector_store.close_vector_store()
+
+        tdd_case.then("스토어가 쓰던 서비스가 레지스트리에서 정리되고 디스크 캐시가 닫힘")
+        assert service._store is None
+        assert DEFAULT_EMBEDDING_MODEL not in embedding_service._embedding_services
+        reopened = EmbeddingService(model_name=DEFAULT_EMBEDDING_MODEL, cache_dir=str(tmp_path / "embeddings"),
+                                    encoder=BigramEncoder())
+        reopened.embed_query("고혈압 치료는 생활습관 개선부터 시작합니다.")
+        assert reopened.stats()["disk_hits"] == 1
+        reopened.close()
+
+    @pytest.mark.unit
+    def test_should_index_only_changed_documents_and_prune_missing(self, vector_store, encoder, tdd_case):
+        tdd_case.given("문서 3개가 색인된 벡터 스토어")
+        store = vector_store.MedicalVectorStore(backend="local")
+        assert len(store.add_documents(DOCUMENTS)) == 3
+        encoder.encoded.clear()
+
+        tdd_case.when("한 문서만 바꾸고 한 문서를 뺀 목록으로 전체 재색인함")
+        changed = {**DOCUMENTS[1], "content": DOCUMENTS[1]["content"] + " 저혈당 위험이 낮습니다."}
+        upserted = store.add_documents([DOCUMENTS[0], changed], prune_missing=True)
+
+        tdd_case.then("바뀐 청크만 임베딩/upsert되고 빠진 문서는 벡터/BM25 색인에서 모두 삭제됨")
+        assert len(upserted) == 1
+        assert encoder.encoded == [changed["content"]]
+        assert sorted(store.manifest.documents("medical_documents")) == ["dm", "htn"]
+        assert store.backend.count("medical_documents") == 2
+        assert store.lexical_index.count("medical_documents") == 2
+        assert store.similarity_search("아스피린", mode="lexical") == []
+        assert store.similarity_search("저혈당", mode="lexical")[0]["metadata"]["document_id"] == "dm"
+
+    @pytest.mark.unit
+    def test_should_reset_manifest_only_when_dense_index_is_empty(self, vector_store, monkeypatch, tmp_path,
+                                                                  encoder, tdd_case):
+        tdd_case.given("디스크 벡터 인덱스에 색인한 뒤 BM25 스냅샷만 사라진 상태")
+        store = vector_store.MedicalVectorStore(backend="local")
+        store.add_documents(DOCUMENTS)
+        store.backend.close()
+        for path in (tmp_path / "lexical").glob("medical_documents.*"):
+            path.unlink()
+        encoder.encoded.clear()
+
+        tdd_case.when("스토어를 다시 열어 같은 문서를 색인함")
+        reopened = vector_store.MedicalVectorStore(backend="local")
+        upserted = reopened.add_documents(DOCUMENTS)
+
+        tdd_case.then("매니페스트는 유지되어 재임베딩 없이 BM25 색인만 벡터 컬렉션 payload로 재구성됨")
+        assert upserted == [] and encoder.encoded == []
+        assert reopened.lexical_index.count("medical_documents") == 3
+        assert reopened.similarity_search("메트포르민", mode="lexical")[0]["metadata"]["document_id"] == "dm"
+        reopened.backend.close()
+
+        # 벡터 인덱스가 메모리에만 있어 비어 있으면 매니페스트를 초기화하고 전체를 다시 upsert
+        monkeypatch.setattr(settings, "LOCAL_VECTOR_INDEX_DIR", "")
+        in_memory = vector_store.MedicalVectorStore(backend="local")
+        assert in_memory.manifest.documents("medical_documents") == []
+        assert len(in_memory.add_documents(DOCUMENTS)) == 3
+        assert in_memory.lexical_index.count("medical_documents") == 3
+
+    @pytest.mark.unit
+    def test_should_fuse_dense_and_lexical_results_in_hybrid_mode(self, vector_store, tdd_case):
+        tdd_case.given("문서 3개가 색인된 벡터 스토어")
+        store = vector_store.MedicalVectorStore(backend="local")
+        store.add_documents(DOCUMENTS)
+
+        tdd_case.when("KCD 코드와 약물명으로 hybrid 검색함")
+        results = store.similarity_search("E11.9 메트포르민", k=2, mode="hybrid")
+        filtered = store.similarity_search("치료", k=3, mode="hybrid",
+                                           filter_criteria={"hospital_department": "심장내과"})
+
+        tdd_case.then("정확한 용어가 일치한 문서가 두 방식의 순위를 모두 가지고 1위가 되며 필터를 지킴")
+        assert results[0]["metadata"]["document_id"] == "dm"
+        assert set(results[0]["ranks"]) == {"dense", "lexical"}
+        assert [result["metadata"]["document_id"] for result in filtered] == ["htn"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_async_store_should_match_sync_store(self, vector_store, tdd_case):
+        tdd_case.given("같은 스토어를 감싼 비동기 파사드")
+        store = vector_store.MedicalVectorStore(backend="local")
+        store.add_documents(DOCUMENTS)
+        async_store = vector_store.AsyncMedicalVectorStore(store)
+
+        tdd_case.when("방식별 검색과 컨텍스트 검색을 비동기로 수행함")
+        results = {mode: await async_store.similarity_search("혈압 약물", k=3, mode=mode)
+                   for mode in ("dense", "lexical", "hybrid")}
+        context = await async_store.search_by_medical_context("혈압", user_type="doctor", department="심장내과")
+
+        tdd_case.then("동기 스토어와 같은 결과를 반환함")
+        for mode, async_results in results.items():
+            expected = store.similarity_search("혈압 약물", k=3, mode=mode)
+            assert [r["id"] for r in async_results] == [r["id"] for r in expected]
+        assert context and all(r["metadata"]["hospital_department"] == "심장내과" for r in context)
+        assert [r["id"] for r in context] == [
+            r["id"] for r in store.search_by_medical_context("혈압", user_type="doctor", department="심장내과")
+        ]
+        assert await async_store.similarity_search("혈압", mode="unknown") == []
+        await async_store.close()